@@ -72,6 +72,7 @@ server.setRequestHandler(ListToolsRequestSchema, async () => ({
           url: { type: 'string', description: 'Start URL of the documentation site (e.g., "https://docs.example.com")' },
           name: { type: 'string', description: 'Unique identifier for this doc set (e.g., "react-docs"). Use lowercase with hyphens.' },
           max_pages: { type: 'number', description: 'Maximum pages to scrape (default: 500)', default: 500 },
+          time_budget: { type: 'number', description: 'Wall-clock limit in seconds for the whole scrape; the output is built from the pages finished by then (default: unlimited)' },
         },
         required: ['url', 'name'],
       },
@@ -147,6 +148,7 @@ server.setRequestHandler(CallToolRequestSchema, async (request) => {
         const url = args?.url as string;
         const docName = args?.name as string;
         const maxPages = (args?.max_pages as number) || 500;
+        const timeBudget = (args?.time_budget as number) || 0;
 
         if (!url || !docName) {
           return { content: [{ type: 'text', text: '[ERROR] Both `url` and `name` are required.' }], isError: true };
@@ -167,7 +169,7 @@ server.setRequestHandler(CallToolRequestSchema, async (request) => {
         const storageRoot = ensureStorageRoot();
         const outputDir = path.join(storageRoot, sanitized);
 
-        const cliCommand = `cd "${scraperPath}" && python cli.py scrape --url "${url}" --name "${sanitized}" --output "${outputDir}" --max-pages ${maxPages}`;
+        const cliCommand = `cd "${scraperPath}" && python cli.py scrape --url "${url}" --name "${sanitized}" --output "${outputDir}" --max-pages ${maxPages}${timeBudget > 0 ? ` --time-budget ${timeBudget}` : ''}`;
 
         return {
           content: [{
@@ -182,6 +184,7 @@ server.setRequestHandler(CallToolRequestSchema, async (request) => {
               `**Name:** ${sanitized}`,
               `**URL:** ${url}`,
               `**Max pages:** ${maxPages}`,
+              ...(timeBudget > 0 ? [`**Time budget:** ${timeBudget}s`] : []),
               `**Output:** ${outputDir}`,
               '',
               `Once complete, use \`add_docs_to_project\` with name "${sanitized}" to inject the docs into your project.`,
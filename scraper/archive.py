@@ -0,0 +1,126 @@
+"""Raw page archive — append-only WARC of every fetched page.
+
+Written next to manifest.json as ``archive.warc.gz`` when archiving is
+enabled, so selector or cleaner fixes can be applied offline with
+``cli.py reprocess`` instead of re-crawling the site.
+
+Format: WARC/1.1 ``resource`` records (one per page, Target-URI + HTML
+payload), each compressed as its own gzip member — the standard
+``.warc.gz`` layout, readable by warcio/pywb and by iter_archive below.
+"""
+import gzip
+import threading
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+ARCHIVE_FILENAME = "archive.warc.gz"
+WARC_VERSION = "WARC/1.1"
+
+
+class WarcWriter:
+    def __init__(self, path: Path, append: bool = False):
+        """Open a new archive, or with *append* add to an existing one
+        (incremental runs: readers let later records win)."""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = open(self.path, "ab" if append else "wb")
+        self._lock = threading.Lock()
+        self.records = 0
+        self._write_record("warcinfo", None, b"software: AnyDocsMCP scraper\r\nformat: WARC File Format 1.1\r\n",
+                           "application/warc-fields")
+
+    def write_page(self, url: str, html: str):
+        """Append one fetched page. Thread-safe."""
+        self._write_record("resource", url, html.encode("utf-8"), "text/html; charset=utf-8")
+
+    def close(self):
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write_record(self, warc_type: str, url, payload: bytes, content_type: str):
+        headers = [
+            WARC_VERSION,
+            f"WARC-Type: {warc_type}",
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>",
+            f"WARC-Date: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}",
+        ]
+        if url:
+            headers.append(f"WARC-Target-URI: {url}")
+        headers.append(f"Content-Type: {content_type}")
+        headers.append(f"Content-Length: {len(payload)}")
+        record = ("\r\n".join(headers) + "\r\n\r\n").encode("utf-8") + payload + b"\r\n\r\n"
+        member = gzip.compress(record, compresslevel=6)
+        with self._lock:
+            self._fh.write(member)
+            self._fh.flush()
+            if warc_type != "warcinfo":
+                self.records += 1
+
+
+def iter_archive(path: Path) -> Iterator[Tuple[str, str]]:
+    """Yield (url, html) for every page record in a .warc.gz archive."""
+    for url, payload in _iter_records(path):
+        yield url, payload.decode("utf-8", errors="replace")
+
+
+def archive_index(path: Path) -> Dict[str, int]:
+    """{url: number of its last page record} — which record of each URL wins."""
+    return {url: i for i, (url, _) in enumerate(_iter_records(path))}
+
+
+def iter_latest(path: Path, index: Optional[Dict[str, int]] = None) -> Iterator[Tuple[str, str]]:
+    """Yield (url, html) once per URL, its last record winning, without holding pages in memory.
+
+    Two passes over the archive: archive_index (or *index*, if the caller
+    already built it) keeps only a record number per URL; the second pass
+    yields the records that survive.
+    """
+    if index is None:
+        index = archive_index(path)
+    for i, (url, payload) in enumerate(_iter_records(path)):
+        if index.get(url) == i:
+            yield url, payload.decode("utf-8", errors="replace")
+
+
+def load_archive(path: Path) -> Dict[str, str]:
+    """Read an archive into {url: html}; later records win over earlier ones."""
+    return dict(iter_archive(path))
+
+
+def _iter_records(path: Path) -> Iterator[Tuple[str, bytes]]:
+    """(url, payload bytes) for every page record, in archive order."""
+    with gzip.open(path, "rb") as fh:
+        while True:
+            version = fh.readline()
+            if not version:
+                return
+            if not version.strip():
+                continue
+            headers: Dict[str, str] = {}
+            for line in iter(fh.readline, b""):
+                line = line.strip()
+                if not line:
+                    break
+                name, _, value = line.decode("utf-8").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            payload = fh.read(int(headers.get("content-length", "0")))
+            fh.read(4)  # record terminator \r\n\r\n
+            warc_type = headers.get("warc-type")
+            url = headers.get("warc-target-uri")
+            if not url:
+                continue
+            if warc_type == "response":
+                # HTTP envelope: drop status line + headers
+                _, _, payload = payload.partition(b"\r\n\r\n")
+            elif warc_type != "resource":
+                continue
+            yield url, payload
@@ -103,7 +103,7 @@ def save_results(results):
     RESULTS_FILE.write_text(json.dumps(results, indent=2, default=str), encoding="utf-8")
 
 
-def run_site(name: str, url: str, max_pages: int = 2000) -> dict:
+def run_site(name: str, url: str, max_pages: int = 2000, resume: bool = False) -> dict:
     """Run the scraper pipeline for a single site. Returns result dict."""
     output_dir = os.path.join(STORAGE_ROOT, name)
     config = PipelineConfig(
@@ -112,6 +112,7 @@ def run_site(name: str, url: str, max_pages: int = 2000) -> dict:
         output_dir=output_dir,
         max_pages=max_pages,
         max_workers=10,
+        resume=resume,
         llm_model_analyzer="qwen/qwen3-coder-next",
     )
 
@@ -154,6 +155,7 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--start-from", type=int, default=0, help="Start from site index N (0-based)")
     parser.add_argument("--only", type=str, default=None, help="Only run a specific site by name")
+    parser.add_argument("--resume", action="store_true", help="Continue interrupted site crawls from their journal")
     args = parser.parse_args()
 
     results = load_results()
@@ -188,7 +190,7 @@ def main():
         print(f"  URL: {url}")
         print(f"{'─'*70}")
 
-        result = run_site(name, url)
+        result = run_site(name, url, resume=args.resume)
         results[name] = result
         save_results(results)
 
@@ -0,0 +1,306 @@
+"""Headless Chrome for every Selenium stage: one process-wide broker + pool.
+
+``broker`` owns a single BrowserPool for the whole process. Engine
+selection, discovery and the crawler all borrow sessions from it, so one
+run (or a whole batch of sites) starts Chrome once instead of per stage,
+and the chromedriver binary is resolved by webdriver-manager only once.
+
+The pool is a bounded set of WebDriver instances that threads check out
+and return. Drivers are started lazily; a driver that errors (or has
+served RECYCLE_AFTER pages, to cap Chrome's memory growth) is quit and
+replaced on the next checkout. The broker quits all drivers at exit.
+
+wait_until_ready() replaces fixed post-load sleeps: it returns as soon
+as the rendered page has stopped changing.
+
+Each checkout may pass URL patterns to block (images, fonts, media,
+analytics — see ResourceBlocklist); they are applied with the DevTools
+Network.setBlockedURLs command, so Chrome never downloads them.
+"""
+import atexit
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+from models import ResourceBlocklist
+
+SELENIUM_AVAILABLE = False
+try:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options as ChromeOptions
+    from selenium.webdriver.chrome.service import Service as ChromeService
+    from webdriver_manager.chrome import ChromeDriverManager
+    SELENIUM_AVAILABLE = True
+except ImportError:
+    pass
+
+RECYCLE_AFTER = 200
+MAX_AUTO_BROWSERS = 4
+
+# Resource types → URL patterns for Network.setBlockedURLs (which matches
+# URLs, not request types; "?*" variants catch cache-busting query strings)
+TYPE_EXTENSIONS = {
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+    "media": ("mp4", "webm", "ogg", "ogv", "mp3", "wav", "m4a", "mov"),
+    "stylesheet": ("css",),
+}
+
+# Readiness detection (wait_until_ready)
+READY_MAX_WAIT = 10.0     # hard cap per page
+READY_QUIET_S = 0.3       # no DOM mutations / new resources for this long
+READY_SELECTOR_GRACE = 3.0  # stop waiting for a missing content selector after this
+READY_POLL_S = 0.05
+
+# Installs a MutationObserver on first call, then reports
+# [readyState, ms since last DOM mutation, resource count, selector found]
+_READY_PROBE_JS = """
+const sel = arguments[0];
+if (!window.__anydocsQuiet) {
+  window.__anydocsQuiet = {last: performance.now()};
+  new MutationObserver(() => { window.__anydocsQuiet.last = performance.now(); })
+    .observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+}
+let found = true;
+if (sel) { try { found = document.querySelector(sel) !== null; } catch (e) { found = true; } }
+return [document.readyState, performance.now() - window.__anydocsQuiet.last,
+        performance.getEntriesByType('resource').length, found];
+"""
+
+
+def default_pool_size() -> int:
+    """Browsers to run when not configured: one per two cores, at most MAX_AUTO_BROWSERS."""
+    return max(1, min(MAX_AUTO_BROWSERS, (os.cpu_count() or 2) // 2))
+
+
+_driver_path: Optional[str] = None
+_driver_path_lock = threading.Lock()
+
+
+def chromedriver_path() -> str:
+    """Resolve (and download if needed) the chromedriver binary once per process."""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = ChromeDriverManager().install()
+        return _driver_path
+
+
+def make_chrome_driver(page_load_timeout: int = 30):
+    """Start one headless Chrome."""
+    opts = ChromeOptions()
+    opts.add_argument("--headless=new")
+    opts.add_argument("--disable-gpu")
+    opts.add_argument("--no-sandbox")
+    opts.add_argument("--disable-dev-shm-usage")
+    opts.add_argument("--window-size=1920,1080")
+    service = ChromeService(chromedriver_path())
+    driver = webdriver.Chrome(service=service, options=opts)
+    driver.set_page_load_timeout(page_load_timeout)
+    return driver
+
+
+def blocked_url_patterns(blocklist: Optional[ResourceBlocklist]) -> Tuple[str, ...]:
+    """DevTools URL patterns for *blocklist* (None → nothing blocked)."""
+    if blocklist is None:
+        return ()
+    patterns: List[str] = []
+    for rtype in blocklist.resource_types:
+        extensions = TYPE_EXTENSIONS.get(rtype.lower())
+        if extensions is None:
+            print(f"  [browser] Unknown resource type to block: {rtype}", file=sys.stderr)
+            continue
+        for ext in extensions:
+            patterns += [f"*.{ext}", f"*.{ext}?*"]
+    patterns += blocklist.url_patterns
+    return tuple(dict.fromkeys(patterns))
+
+
+def apply_blocked_urls(driver, patterns: Sequence[str]) -> bool:
+    """Set the URLs *driver* must not fetch; False if the driver has no DevTools access."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+        return True
+    except Exception as e:
+        print(f"  [browser] Resource blocking unavailable: {e}", file=sys.stderr)
+        return False
+
+
+def wait_until_ready(
+    driver, content_selector: Optional[str] = None, max_wait: float = READY_MAX_WAIT,
+) -> bool:
+    """Block until the loaded page is stable; True if it settled before *max_wait*.
+
+    Stable means: document complete, no DOM mutation and no newly loaded
+    resource (network idle) for READY_QUIET_S, and *content_selector*
+    present — or still missing after READY_SELECTOR_GRACE, so a wrong
+    selector does not cost the full max_wait on every page.
+    """
+    start = time.monotonic()
+    last_resources = -1
+    resources_since = start
+    while True:
+        now = time.monotonic()
+        elapsed = now - start
+        try:
+            state, quiet_ms, resources, found = driver.execute_script(_READY_PROBE_JS, content_selector)
+        except Exception:
+            # No JS (or page navigating): fall back to a short fixed wait
+            time.sleep(min(READY_QUIET_S, max(max_wait - elapsed, 0)))
+            return False
+        if resources != last_resources:
+            last_resources, resources_since = resources, now
+        if (state == "complete"
+                and quiet_ms >= READY_QUIET_S * 1000
+                and now - resources_since >= READY_QUIET_S
+                and (found or elapsed >= READY_SELECTOR_GRACE)):
+            return True
+        if elapsed >= max_wait:
+            return False
+        time.sleep(READY_POLL_S)
+
+
+class _Lease:
+    """A pooled driver plus its bookkeeping."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.healthy = True
+        self.blocked: Tuple[str, ...] = ()
+
+
+class BrowserPool:
+    def __init__(self, size: int, factory: Optional[Callable[[], object]] = None):
+        self.size = max(size, 1)
+        self.factory = factory or make_chrome_driver
+        self._idle: List[_Lease] = []
+        self._cond = threading.Condition()
+        self._started = 0
+        self._closed = False
+
+    @contextmanager
+    def checkout(self, blocked_urls: Sequence[str] = ()) -> Iterator[object]:
+        """Borrow a driver; blocks while all ``size`` drivers are busy.
+
+        *blocked_urls* are set on the driver unless it already blocks
+        exactly those. An exception inside the block marks the driver
+        unhealthy: it is quit on return and a fresh one is started for a
+        later checkout.
+        """
+        lease = self._acquire()
+        try:
+            blocked = tuple(blocked_urls)
+            if blocked != lease.blocked:
+                apply_blocked_urls(lease.driver, blocked)
+                lease.blocked = blocked
+            yield lease.driver
+            lease.pages += 1
+        except Exception:
+            lease.healthy = False
+            raise
+        finally:
+            self._release(lease)
+
+    def resize(self, size: int):
+        """Change the cap; surplus drivers are quit as they are returned."""
+        with self._cond:
+            self.size = max(size, 1)
+            self._cond.notify_all()
+
+    def close(self):
+        """Quit every idle driver; drivers still checked out are quit on return."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for lease in idle:
+            self._quit(lease)
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _acquire(self) -> _Lease:
+        while True:
+            with self._cond:
+                while not self._idle and self._started >= self.size:
+                    self._cond.wait()
+                lease = self._idle.pop() if self._idle else None
+                if lease is None:
+                    self._started += 1
+            if lease is None:
+                try:
+                    return _Lease(self.factory())
+                except Exception:
+                    with self._cond:
+                        self._started -= 1
+                        self._cond.notify()
+                    raise
+            if self._alive(lease.driver):
+                return lease
+            self._quit(lease)
+
+    def _release(self, lease: _Lease):
+        with self._cond:
+            keep = (not self._closed and lease.healthy and lease.pages < RECYCLE_AFTER
+                    and self._started <= self.size)
+            if keep:
+                self._idle.append(lease)
+                self._cond.notify()
+        if not keep:
+            self._quit(lease)
+
+    def _quit(self, lease: _Lease):
+        try:
+            lease.driver.quit()
+        except Exception:
+            pass
+        with self._cond:
+            self._started -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _alive(driver) -> bool:
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            print("  [browser] Recycling unresponsive driver", file=sys.stderr)
+            return False
+
+
+class BrowserBroker:
+    """Process-wide owner of the browser pool shared by all Selenium stages."""
+
+    def __init__(self):
+        self._pool: Optional[BrowserPool] = None
+        self._lock = threading.Lock()
+
+    def pool(self, size: Optional[int] = None) -> BrowserPool:
+        """The shared pool, created on first use; *size* resizes it."""
+        with self._lock:
+            if self._pool is None:
+                self._pool = BrowserPool(size or 1)
+            elif size:
+                self._pool.resize(size)
+            return self._pool
+
+    @contextmanager
+    def session(self, blocked_urls: Sequence[str] = ()) -> Iterator[object]:
+        """Borrow one driver from the shared pool."""
+        with self.pool().checkout(blocked_urls) as driver:
+            yield driver
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+
+
+broker = BrowserBroker()
+atexit.register(broker.shutdown)
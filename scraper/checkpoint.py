@@ -0,0 +1,124 @@
+"""Crawl journal — on-disk checkpoint of the full crawl (FR4c).
+
+Until Grouper writes manifest.json, crawl results only exist in memory.
+The journal makes a killed crawl (OOM, Ctrl-C, sleep) resumable:
+
+  line 1:  {"kind": "frontier", ...}   start URL, engine, selectors, frontier
+  line n:  {"kind": "entry", ...}      one ManifestEntry per finished page
+           {"kind": "url", ...}        a streamed frontier URL, journaled when
+                                       the crawler takes it (frontier_stream.py)
+           {"kind": "selectors", ...}  selectors switched mid-crawl; entries
+                                       before it are re-extracted and re-recorded
+
+Entries are appended and flushed as pages complete, so at most the
+in-flight pages are lost. A truncated last line (killed mid-write) is
+ignored on load. The journal is removed once the pipeline has written
+manifest.json.
+"""
+import json
+import sys
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+from models import CrawlCheckpoint, EngineMode, ManifestEntry, SelectorSpec, UrlRecord
+
+JOURNAL_FILENAME = "crawl-journal.jsonl"
+
+
+class CrawlJournal:
+    def __init__(self, output_dir: Path):
+        self.path = Path(output_dir) / JOURNAL_FILENAME
+        self._fh = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def begin(self, start_url: str, engine_mode: EngineMode, selector_spec: SelectorSpec,
+              frontier: List[UrlRecord], markdown_source: str = ""):
+        """Start a new journal for a crawl of *frontier* (replaces any old one)."""
+        self.close()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        header = CrawlCheckpoint(
+            start_url=start_url,
+            engine_mode=engine_mode,
+            selector_spec=selector_spec,
+            markdown_source=markdown_source,
+            frontier=frontier,
+        )
+        with self._lock:
+            self._fh = open(self.path, "w", encoding="utf-8")
+            self._write_line({"kind": "frontier", **header.model_dump(mode="json", exclude={"entries"})})
+
+    def reopen(self):
+        """Continue appending to an existing journal (resume)."""
+        with self._lock:
+            if self._fh is None:
+                self._fh = open(self.path, "a", encoding="utf-8")
+
+    def record(self, entry: ManifestEntry):
+        """Append one finished page. Thread-safe; no-op before begin()/reopen()."""
+        with self._lock:
+            if self._fh is not None:
+                self._write_line({"kind": "entry", **entry.model_dump(mode="json")})
+
+    def record_url(self, record: UrlRecord):
+        """Append one URL to the frontier (streamed crawls start with an empty one)."""
+        with self._lock:
+            if self._fh is not None:
+                self._write_line({"kind": "url", **record.model_dump(mode="json")})
+
+    def record_selectors(self, selector_spec: SelectorSpec):
+        """Note a mid-crawl selector switch; earlier entries no longer count as done."""
+        with self._lock:
+            if self._fh is not None:
+                self._write_line({"kind": "selectors", **selector_spec.model_dump(mode="json")})
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def remove(self):
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+    def _write_line(self, obj: dict):
+        self._fh.write(json.dumps(obj, ensure_ascii=False) + "\n")
+        self._fh.flush()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def load(self) -> Optional[CrawlCheckpoint]:
+        """Read the journal back; None if there is none or its header is unreadable."""
+        if not self.path.exists():
+            return None
+        checkpoint = None
+        entries = {}
+        with open(self.path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    obj = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # truncated last line
+                kind = obj.pop("kind", None)
+                if kind == "frontier":
+                    checkpoint = CrawlCheckpoint.model_validate(obj)
+                elif kind == "entry" and checkpoint is not None:
+                    entry = ManifestEntry.model_validate(obj)
+                    entries[entry.url] = entry
+                elif kind == "url" and checkpoint is not None:
+                    checkpoint.frontier.append(UrlRecord.model_validate(obj))
+                elif kind == "selectors" and checkpoint is not None:
+                    checkpoint.selector_spec = SelectorSpec.model_validate(obj)
+                    entries = {}
+        if checkpoint is None:
+            print(f"  [checkpoint] Unreadable journal {self.path}, ignoring", file=sys.stderr)
+            return None
+        checkpoint.entries = list(entries.values())
+        return checkpoint
@@ -5,14 +5,22 @@ Usage:
     python cli.py scrape --url https://docs.example.com --name example-docs
     python cli.py scrape --url https://docs.example.com --name example-docs --output ./my-output
     python cli.py scrape --url https://docs.example.com --name example-docs --max-pages 200 --workers 5
+    python cli.py scrape --url https://docs.example.com --name example-docs --async-fetch --concurrency 500
+    python cli.py scrape --url https://docs.example.com --name example-docs --archive
+    python cli.py scrape --url https://docs.example.com --name example-docs --incremental
+    python cli.py scrape --url https://docs.example.com --name example-docs --resume
+    python cli.py scrape --url https://docs.example.com --name example-docs --time-budget 600
+    python cli.py reprocess --name example-docs --content-selector "article.docs"
 """
+import json
 import os
 import sys
+from pathlib import Path
 
 import click
 from colorama import Fore, init
 
-from models import PipelineConfig
+from models import PipelineConfig, ResourceBlocklist, SelectorSpec
 from pipeline import Pipeline
 
 # Load .env from parent directory
@@ -34,21 +42,59 @@ def cli():
 @click.option("--output", default=None, help="Output directory (default: ./output/<name>)")
 @click.option("--max-pages", default=500, help="Maximum pages to crawl (default: 500)")
 @click.option("--workers", default=10, help="Concurrent workers for cURL mode (default: 10)")
+@click.option("--async-fetch", is_flag=True, help="Fetch cURL-mode pages on an asyncio engine with pooled HTTP/2 connections (requires httpx)")
+@click.option("--concurrency", default=256, help="Max in-flight requests for --async-fetch (default: 256)")
+@click.option("--extract-processes", default=0, help="Worker processes for HTML→MD extraction (default: 0 = in fetch threads)")
+@click.option("--browsers", default=0, help="Headless browsers for Selenium mode (default: 0 = one per two cores, max 4)")
+@click.option("--block-resources/--no-block-resources", default=True, help="Selenium mode: don't download images, fonts, media and analytics scripts (default: on)")
+@click.option("--block-url", multiple=True, help="Extra URL pattern for the browser not to load, * wildcards (repeatable)")
+@click.option("--no-llms-txt", is_flag=True, help="Always crawl, even when the site publishes llms-full.txt / llms.txt Markdown")
+@click.option("--no-markdown-source", is_flag=True, help="Always fetch HTML, even when pages are served as Markdown (.md alternates, Accept: text/markdown)")
+@click.option("--from-search-index", is_flag=True, help="Build pages from the site's search index (MkDocs, Docusaurus) without crawling when it holds the full text")
+@click.option("--no-site-profiles", is_flag=True, help="Always ask the LLM for scope and selectors, even for recognised generators (Sphinx, MkDocs, Docusaurus, ...)")
+@click.option("--no-selector-scoring", is_flag=True, help="Don't score candidate selectors on sample pages before the full crawl")
+@click.option("--no-quality-monitor", is_flag=True, help="Don't watch extraction quality during the crawl (no mid-crawl selector switch)")
+@click.option("--no-prefetch", is_flag=True, help="Don't fetch pages in the background while the LLM analyzes the site")
+@click.option("--stream-discovery", is_flag=True, help="Start crawling while sitemaps are still being read; URLs are crawled in discovery order")
+@click.option("--archive", is_flag=True, help="Keep every raw page in archive.warc.gz for offline `reprocess`")
+@click.option("--incremental", is_flag=True, help="Re-scrape an existing output: conditional GET, rewrite only changed pages")
+@click.option("--resume", is_flag=True, help="Continue an interrupted crawl from its journal without refetching finished pages")
+@click.option("--time-budget", default=0.0, type=float, help="Wall-clock budget in seconds for the whole run; output is built from what finished (default: 0 = unlimited)")
 @click.option("--threshold", default=0.3, type=float, help="Engine diff threshold (default: 0.3)")
 @click.option("--analyzer-model", default="qwen/qwen3-coder-next", help="LLM model for analyzer")
-def scrape(url, name, output, max_pages, workers, threshold, analyzer_model):
+def scrape(url, name, output, max_pages, workers, async_fetch, concurrency, extract_processes, browsers, block_resources, block_url, no_llms_txt, no_markdown_source, from_search_index, no_site_profiles, no_selector_scoring, no_quality_monitor, no_prefetch, stream_discovery, archive, incremental, resume, time_budget, threshold, analyzer_model):
     """Scrape a documentation site and generate AGENTS.md package."""
     if not os.getenv("OPENROUTER_API_KEY"):
         print(f"{Fore.YELLOW}Warning: OPENROUTER_API_KEY not set. LLM features will use fallback heuristics.{Fore.RESET}")
 
     output_dir = output or os.path.join(".", "output", name)
 
+    blocklist = ResourceBlocklist() if block_resources else ResourceBlocklist.disabled()
+    blocklist.url_patterns += block_url
+
     config = PipelineConfig(
         start_url=url,
         name=name,
         output_dir=output_dir,
         max_pages=max_pages,
         max_workers=workers,
+        async_fetch=async_fetch,
+        async_concurrency=concurrency,
+        extract_processes=extract_processes,
+        browsers=browsers,
+        resource_blocklist=blocklist,
+        llms_txt=not no_llms_txt,
+        markdown_source=not no_markdown_source,
+        search_index_content=from_search_index,
+        site_profiles=not no_site_profiles,
+        selector_scoring=not no_selector_scoring,
+        quality_monitor=not no_quality_monitor,
+        prefetch=not no_prefetch,
+        stream_discovery=stream_discovery,
+        archive=archive,
+        incremental=incremental,
+        resume=resume,
+        time_budget=time_budget,
         engine_diff_threshold=threshold,
         llm_model_analyzer=analyzer_model,
     )
@@ -59,6 +105,12 @@ def scrape(url, name, output, max_pages, workers, threshold, analyzer_model):
     print(f"  Output:     {output_dir}")
     print(f"  Max pages:  {max_pages}")
     print(f"  Workers:    {workers}")
+    if async_fetch:
+        print(f"  Async:      up to {concurrency} in-flight requests")
+    if extract_processes:
+        print(f"  Extractors: {extract_processes} processes")
+    if time_budget:
+        print(f"  Budget:     {time_budget:.0f}s")
     print()
 
     pipeline = Pipeline(config)
@@ -71,6 +123,51 @@ def scrape(url, name, output, max_pages, workers, threshold, analyzer_model):
     print(f"  Manifest:   {os.path.join(output_dir, 'manifest.json')}")
 
 
+@cli.command()
+@click.option("--name", required=True, help="Name of a documentation set scraped with --archive")
+@click.option("--output", default=None, help="Output directory (default: ./output/<name>)")
+@click.option("--selectors", default=None, type=click.Path(exists=True), help="JSON file with a SelectorSpec to use")
+@click.option("--content-selector", default=None, help="Override the content CSS selector")
+@click.option("--prune", multiple=True, help="Override prune CSS selectors (repeatable)")
+@click.option("--processes", default=0, help="Extraction worker processes (default: 0 = one per CPU)")
+def reprocess(name, output, selectors, content_selector, prune, processes):
+    """Rebuild raw Markdown, manifest and AGENTS.md from the raw archive — no network."""
+    output_dir = output or os.path.join(".", "output", name)
+    manifest_path = Path(output_dir) / "manifest.json"
+    start_url = ""
+    if manifest_path.exists():
+        start_url = json.loads(manifest_path.read_text(encoding="utf-8")).get("start_url", "")
+
+    config = PipelineConfig(
+        start_url=start_url,
+        name=name,
+        output_dir=output_dir,
+        extract_processes=processes,
+    )
+    pipeline = Pipeline(config)
+
+    spec = None
+    if selectors:
+        spec = SelectorSpec.model_validate_json(Path(selectors).read_text(encoding="utf-8"))
+    if content_selector or prune:
+        spec = spec or pipeline.saved_selector_spec()
+        if content_selector:
+            spec.content_selector = content_selector
+        if prune:
+            spec.prune_selectors = list(prune)
+
+    print(f"{Fore.CYAN}Reprocessing archive for {name}...{Fore.RESET}")
+    try:
+        agents_path = pipeline.reprocess(selector_spec=spec)
+    except FileNotFoundError as e:
+        print(f"{Fore.RED}Error: {e}{Fore.RESET}")
+        sys.exit(1)
+
+    print(f"\n{Fore.GREEN}Done!{Fore.RESET}")
+    print(f"  AGENTS.md:  {agents_path}")
+    print(f"  Manifest:   {manifest_path}")
+
+
 @cli.command()
 @click.option("--url", required=True, help="URL to test engine selection on")
 @click.option("--threshold", default=0.3, type=float, help="Diff threshold (default: 0.3)")
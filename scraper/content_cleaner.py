@@ -132,6 +132,12 @@ class ContentCleaner:
         content = self._normalize_whitespace(content)
         return content
 
+    def clean_source(self, content: str) -> str:
+        """Light pass for author-written Markdown (no HTML conversion residue to remove)."""
+        content = self._fix_encoding(content)
+        content = self._clean_empty_code_blocks(content)
+        return self._normalize_whitespace(content)
+
     # ------------------------------------------------------------------
 
     def _strip_nav_header(self, content: str) -> str:
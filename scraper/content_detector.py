@@ -0,0 +1,223 @@
+"""Offline content-region detection by comparing the DOMs of sample pages.
+
+No LLM: detect_selectors() works from the quick-sample HTML in a few
+milliseconds per page.
+
+  chrome   Addressable elements (id / stable classes / role / semantic
+           tag) whose text is identical on most sample pages: navigation,
+           headers, footers, feedback widgets. Selectors that only ever
+           match such blocks become prune selectors.
+  content  Per page, the tightest addressable container that holds most
+           of the page's non-chrome text at low link density. The selector
+           chosen on most pages becomes the content selector.
+
+LLMAnalyzer uses the result as its offline fallback and as a hint in the
+analysis prompt.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set
+
+from bs4 import BeautifulSoup, Tag
+
+from models import SelectorSpec
+
+CHROME_MIN_SHARE = 0.6      # same text on this share of sample pages → repeated chrome
+CONTENT_MIN_SHARE = 0.7     # container must hold this share of a page's non-chrome text
+MAX_LINK_DENSITY = 0.5
+MIN_AGREEMENT = 0.5         # content selector must win on this share of pages
+MIN_CHROME_CHARS = 2
+MAX_PRUNE_SELECTORS = 15
+
+_STRIP_TAGS = ("script", "style", "noscript", "template", "svg", "iframe")
+_CONTAINER_TAGS = frozenset({"main", "article", "section", "div"})
+_SEMANTIC_TAGS = frozenset({"main", "article", "nav", "header", "footer", "aside", "section"})
+_IDENT_RE = re.compile(r"^-?[A-Za-z_][\w-]*$")
+_GENERATED_CLASS_RE = re.compile(r"\d{3}|^(?:css|sc|jsx|svelte|emotion)-")
+_SPACE_RE = re.compile(r"\s+")
+
+
+class _Page(NamedTuple):
+    soup: BeautifulSoup
+    selectors: Dict[int, str]   # id(element) → selector, addressable elements only
+    texts: Dict[int, str]       # id(element) → normalized text
+
+
+def element_selector(el: Tag) -> Optional[str]:
+    """Stable CSS selector for *el*, or None if it has nothing reliable to address it by."""
+    el_id = el.get("id")
+    if el_id and _IDENT_RE.match(el_id) and not _GENERATED_CLASS_RE.search(el_id):
+        return f"#{el_id}"
+    classes = [c for c in el.get("class", []) if _stable_class(c)][:2]
+    if classes:
+        return el.name + "".join(f".{c}" for c in classes)
+    role = el.get("role")
+    if role and role.isalpha():
+        return f"{el.name}[role='{role}']"
+    if el.name in _SEMANTIC_TAGS:
+        return el.name
+    return None
+
+
+def detect_selectors(pages: Sequence[str]) -> Optional[SelectorSpec]:
+    """SelectorSpec from sample pages' HTML, or None if no container stands out."""
+    parsed = [_parse(html) for html in pages if html]
+    if not parsed:
+        return None
+    n = len(parsed)
+
+    chrome_keys = _repeated_blocks(parsed) if n >= 2 else set()
+    chrome_selectors = _safe_chrome_selectors(parsed, chrome_keys)
+
+    votes: Counter = Counter()
+    sizes: Dict[str, List[int]] = defaultdict(list)
+    containers: List[Optional[Tag]] = []
+    for page in parsed:
+        found = _content_container(page, chrome_keys)
+        containers.append(found)
+        if found is not None:
+            selector = page.selectors[id(found)]
+            votes[selector] += 1
+            sizes[selector].append(len(page.texts[id(found)]))
+    if not votes:
+        return None
+    content_selector, count = min(
+        votes.items(), key=lambda kv: (-kv[1], sum(sizes[kv[0]]) / len(sizes[kv[0]])))
+    if count / n < MIN_AGREEMENT:
+        return None
+
+    prune = _outermost_chrome(parsed, containers, chrome_selectors, content_selector)
+    return SelectorSpec(
+        content_selector=content_selector,
+        prune_selectors=prune,
+        notes=f"Offline detection: content container on {count}/{n} sample pages, "
+              f"{len(prune)} repeated blocks",
+    )
+
+
+# ------------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------------
+
+def _stable_class(name: str) -> bool:
+    """False for generated class names (CSS modules, CSS-in-JS hashes)."""
+    if not _IDENT_RE.match(name) or _GENERATED_CLASS_RE.search(name):
+        return False
+    # Random tokens like "kZJxXH2": mixed case and digits without separators
+    return not (re.search(r"\d", name) and re.search(r"[A-Z]", name) and "-" not in name and "_" not in name)
+
+
+def _parse(html: str) -> _Page:
+    soup = BeautifulSoup(html, "html.parser")
+    for el in soup.find_all(_STRIP_TAGS):
+        el.decompose()
+    selectors, texts = {}, {}
+    for el in soup.find_all(True):
+        selector = element_selector(el)
+        if selector is not None and el.name not in ("html", "body"):
+            selectors[id(el)] = selector
+            texts[id(el)] = _SPACE_RE.sub(" ", el.get_text(" ", strip=True))
+    return _Page(soup, selectors, texts)
+
+
+def _repeated_blocks(pages: List[_Page]) -> Set[tuple]:
+    """(selector, text) pairs found on at least CHROME_MIN_SHARE of the pages."""
+    counts: Counter = Counter()
+    for page in pages:
+        counts.update({(sel, page.texts[key]) for key, sel in page.selectors.items()
+                       if len(page.texts[key]) >= MIN_CHROME_CHARS})
+    threshold = max(2, math.ceil(CHROME_MIN_SHARE * len(pages)))
+    return {key for key, count in counts.items() if count >= threshold}
+
+
+def _safe_chrome_selectors(pages: List[_Page], chrome_keys: Set[tuple]) -> Set[str]:
+    """Chrome selectors that never match anything but repeated blocks on any page."""
+    repeated_texts: Dict[str, Set[str]] = defaultdict(set)
+    for selector, text in chrome_keys:
+        repeated_texts[selector].add(text)
+    safe = set()
+    for selector, texts in repeated_texts.items():
+        ok = True
+        for page in pages:
+            for el in page.soup.select(selector):
+                if _SPACE_RE.sub(" ", el.get_text(" ", strip=True)) not in texts:
+                    ok = False
+                    break
+            if not ok:
+                break
+        if ok:
+            safe.add(selector)
+    return safe
+
+
+def _chrome_elements(page: _Page, chrome_keys: Set[tuple]) -> List[Tag]:
+    """Outermost elements of *page* that are repeated blocks."""
+    found = []
+    for el in page.soup.find_all(True):
+        key = id(el)
+        if key in page.selectors and (page.selectors[key], page.texts[key]) in chrome_keys:
+            if not any(id(parent) in {id(f) for f in found} for parent in el.parents):
+                found.append(el)
+    return found
+
+
+def _content_container(page: _Page, chrome_keys: Set[tuple]) -> Optional[Tag]:
+    """Tightest addressable container with most non-chrome text and few links."""
+    body = page.soup.body or page.soup
+    chrome_len: Dict[int, int] = defaultdict(int)
+    chrome_ids: Set[int] = set()
+    for el in _chrome_elements(page, chrome_keys):
+        chrome_ids.add(id(el))
+        size = len(page.texts[id(el)])
+        for parent in el.parents:
+            chrome_len[id(parent)] += size
+    link_len: Dict[int, int] = defaultdict(int)
+    for link in body.find_all("a"):
+        if any(id(parent) in chrome_ids for parent in link.parents):
+            continue
+        size = len(link.get_text(" ", strip=True))
+        for parent in link.parents:
+            link_len[id(parent)] += size
+
+    total = len(_SPACE_RE.sub(" ", body.get_text(" ", strip=True))) - chrome_len[id(body)]
+    if total <= 0:
+        return None
+    best, best_size = None, None
+    for el in body.find_all(_CONTAINER_TAGS):
+        key = id(el)
+        if key not in page.selectors or key in chrome_ids:
+            continue
+        content = len(page.texts[key]) - chrome_len[key]
+        if content < CONTENT_MIN_SHARE * total or link_len[key] > MAX_LINK_DENSITY * content:
+            continue
+        # The extractor uses select_one: the selector must reach this element first
+        if page.soup.select_one(page.selectors[key]) is not el:
+            continue
+        if best_size is None or content < best_size:
+            best, best_size = el, content
+    return best
+
+
+def _outermost_chrome(
+    pages: List[_Page], containers: List[Optional[Tag]], safe: Set[str], content_selector: str,
+) -> List[str]:
+    """Prune selectors: outermost safe chrome, blocks inside the content container first."""
+    inside: Counter = Counter()
+    outside: Counter = Counter()
+    for page, container in zip(pages, containers):
+        container_id = id(container) if container is not None else None
+        seen: Set[int] = set()
+        for el in page.soup.find_all(True):
+            selector = page.selectors.get(id(el))
+            if selector not in safe or selector == content_selector:
+                continue
+            if any(id(parent) in seen for parent in el.parents):
+                continue
+            seen.add(id(el))
+            if container_id is not None and any(id(parent) == container_id for parent in el.parents):
+                inside[selector] += 1
+            else:
+                outside[selector] += 1
+    ordered = [s for s, _ in inside.most_common()] + [s for s, _ in outside.most_common() if s not in inside]
+    return ordered[:MAX_PRUNE_SELECTORS]
@@ -1,51 +1,98 @@
 """FR4: Crawler & Transform — Frontier queue, fetch, extract, clean, HTML→MD, write 1:1.
 
 Processes a filtered URL frontier:
-1. Fetch each URL (cURL or Selenium mode)
+1. Fetch each URL (cURL, async HTTP or Selenium mode)
 2. Extract main content via CSS selector
 3. Prune UI fragments
 4. Convert HTML → Markdown
 5. Write 1 file per URL path (1:1 mapping)
 6. Build manifest with path↔URL, size, headings, hash
+
+With a markdown_source strategy, step 1 asks for the page's Markdown
+source first and steps 2-4 are skipped for pages that serve it.
+
+Steps 2-5 live in extractor.py. With extract_processes > 0 they run in a
+process pool fed through a bounded queue, so fetching and extraction scale
+independently (threads/event loop for I/O, processes for CPU).
+
+With a QualityMonitor, a crawl whose running success rate drops below the
+threshold pauses extraction, asks on_poor_quality for a new SelectorSpec
+and re-extracts the pages fetched so far from memory (quality_monitor.py).
+
+The frontier may also be a FrontierStream that discovery is still filling
+(frontier_stream.py): URLs are started as they arrive, and each one is
+journaled when it is taken from the stream.
 """
-import hashlib
-import os
-import random
-import re
+import asyncio
+import heapq
+import itertools
+import queue
 import sys
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
 from urllib.parse import urlparse
 
 import requests
-from bs4 import BeautifulSoup
-from markdownify import markdownify as md
 
-from content_cleaner import ContentCleaner
+from archive import WarcWriter
+from browser import BrowserPool, blocked_url_patterns, broker, default_pool_size, wait_until_ready
+from checkpoint import CrawlJournal
+from deadline import Deadline
+from engine_selector import is_thin, page_metrics
+from extractor import PageExtractor, extract_page, init_worker
+from fetch_store import FetchStore
+from frontier_stream import STREAM_POLL_S, FrontierStream
+from hydration import attach_page_data, gatsby_page_data_url
+from markdown_source import STORE_KEY, is_markdown_response, request_headers, source_url, to_document
+from politeness import THROTTLE_STATUSES, PolitenessController, robots_crawl_delay
+from quality_monitor import QualityMonitor, QualityStats
 from models import (
     EngineMode,
     Manifest,
     ManifestEntry,
+    ResourceBlocklist,
     SelectorSpec,
     UrlRecord,
 )
 
+HTTPX_AVAILABLE = False
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    pass
+
+HTTP2_AVAILABLE = False
+try:
+    import h2  # noqa: F401 — enables httpx HTTP/2 support
+    HTTP2_AVAILABLE = True
+except ImportError:
+    pass
+
 SELENIUM_AVAILABLE = False
 try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options as ChromeOptions
-    from selenium.webdriver.chrome.service import Service as ChromeService
-    from webdriver_manager.chrome import ChromeDriverManager
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    from selenium.webdriver.common.by import By
+    from selenium.common.exceptions import TimeoutException
     SELENIUM_AVAILABLE = True
 except ImportError:
     pass
 
+USER_AGENT = "Mozilla/5.0 (compatible; AnyDocsMCP/2.0)"
+GIVE_UP_STATUSES = (404, 410, 403, 401)
+
+
+class FetchResult(NamedTuple):
+    """One fetched page plus the HTTP validators needed to revalidate it later."""
+    html: str = ""
+    etag: str = ""
+    last_modified: str = ""
+    not_modified: bool = False
+    retry: bool = False  # transient failure (network error, 429, 5xx): try again later
+    content_type: str = ""
+
 
 class Crawler:
     def __init__(
@@ -55,6 +102,22 @@ class Crawler:
         output_dir: str,
         max_workers: int = 10,
         max_retries: int = 3,
+        async_fetch: bool = False,
+        async_concurrency: int = 256,
+        per_host_connections: int = 32,
+        extract_processes: int = 0,
+        store: Optional[FetchStore] = None,
+        archive_path: Optional[str] = None,
+        archive_append: bool = False,
+        previous: Optional[Dict[str, ManifestEntry]] = None,
+        journal: Optional[CrawlJournal] = None,
+        deadline: Optional[Deadline] = None,
+        politeness: Optional[PolitenessController] = None,
+        browsers: int = 0,
+        blocklist: Optional[ResourceBlocklist] = None,
+        markdown_source: str = "",
+        monitor: Optional[QualityMonitor] = None,
+        on_poor_quality: Optional[Callable[[QualityStats, List[Tuple[str, str]]], Optional[SelectorSpec]]] = None,
     ):
         self.engine_mode = engine_mode
         self.selector_spec = selector_spec
@@ -63,50 +126,201 @@ class Crawler:
         self.raw_dir.mkdir(parents=True, exist_ok=True)
         self.max_workers = max_workers
         self.max_retries = max_retries
-        self.cleaner = ContentCleaner()
+        self.async_fetch = async_fetch
+        self.async_concurrency = async_concurrency
+        self.per_host_connections = per_host_connections
+        self.extract_processes = extract_processes
+        # Hydration mode: pages are rendered from their embedded framework payload
+        self.hydrate = engine_mode == EngineMode.HYDRATION
+        self.extractor = PageExtractor(selector_spec, str(self.raw_dir), self.hydrate)
+        self.store = store
+        self.archive_path = Path(archive_path) if archive_path else None
+        self.archive_append = archive_append
+        self._archive: Optional[WarcWriter] = None
+        # Incremental mode: entries from the last manifest, keyed by URL
+        self.previous = previous or {}
+        self.changed_paths: List[str] = []
+        self.unchanged = 0
+        # Checkpoint: every finished entry is appended here as it completes
+        self.journal = journal
+        # Time budget: once expired no new URL is started; in-flight pages finish
+        self.deadline = deadline or Deadline()
+        self.skipped = 0
+        # Hybrid mode: pages that came out thin over HTTP and were re-fetched in the browser
+        self.rendered = 0
+        # Native Markdown: pages fetched as Markdown source with this strategy ("" = HTML only)
+        self.markdown_source = markdown_source
+        self.native_markdown = 0
+        # Online quality check: on_poor_quality(stats, [(url, html)]) returns the selectors to switch to
+        self.monitor = monitor
+        self.on_poor_quality = on_poor_quality
+        self.selector_switched = False
+        self._spec_version = 0
+        self._retained: List[Tuple[UrlRecord, FetchResult]] = []  # fetched while the monitor watches
+        self._finished: set = set()  # retained URLs whose extraction has been collected
+        self._resume = threading.Event()  # cleared while selectors are being switched
+        self._resume.set()
+        self._switcher: Optional[threading.Thread] = None  # runs _switch_selectors
+        # Per-host adaptive concurrency, Retry-After and Crawl-delay; may be shared across crawls
+        self.politeness = politeness or PolitenessController()
         self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "Mozilla/5.0 (compatible; AnyDocsMCP/2.0)"
-        })
+        self.session.headers.update({"User-Agent": USER_AGENT})
         self._lock = threading.Lock()
         self._scraped = 0
         self._total = 0
-        self._driver = None
-        self._driver_lock = threading.Lock()
+        # Selenium mode: fetch threads share a pool of headless browsers (0 = auto size)
+        self.browsers = browsers if browsers > 0 else default_pool_size()
+        self._browser_pool: Optional[BrowserPool] = None
+        self._blocked_urls = blocked_url_patterns(blocklist or ResourceBlocklist())
+        self._entries: List[ManifestEntry] = []
+        self._delay_hosts: set = set()  # hosts whose robots.txt Crawl-delay is loaded
+        self._extract_pool: Optional[ProcessPoolExecutor] = None
+        self._extract_slots: Optional[threading.BoundedSemaphore] = None
+        self._extracting = 0  # pool submissions not yet collected (incl. redos, which hold no slot)
+        self._extract_idle = threading.Condition()
+
+    # Path/title helpers moved to PageExtractor; kept here for existing callers.
+    _url_to_filepath = staticmethod(PageExtractor._url_to_filepath)
+    _extract_title = staticmethod(PageExtractor._extract_title)
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
-    def crawl(self, frontier: List[UrlRecord]) -> Manifest:
+    def crawl(self, frontier: Union[List[UrlRecord], FrontierStream]) -> Manifest:
         """Crawl all URLs in frontier and write 1:1 markdown files.
 
         Returns a Manifest with all entries.
         """
-        self._total = len(frontier)
+        streaming = isinstance(frontier, FrontierStream)
+        self._total = 0 if streaming else len(frontier)
         self._scraped = 0
-        entries: List[ManifestEntry] = []
+        self._entries = []
+        self.changed_paths = []
+        self.unchanged = 0
+        self.skipped = 0
+        self.rendered = 0
+        self.native_markdown = 0
+        self.selector_switched = False
+        self._retained = []
+        self._finished = set()
+        self._switcher = None
+        self._delay_hosts = set()
 
-        print(f"  [crawler] Crawling {self._total} URLs with {self.max_workers} workers ({self.engine_mode.value} mode)", file=sys.stderr)
+        if self.archive_path:
+            self._archive = WarcWriter(self.archive_path, append=self.archive_append)
 
-        if self.engine_mode == EngineMode.SELENIUM:
-            # Selenium: single-threaded to share browser instance
-            for record in frontier:
-                entry = self._process_url(record)
-                if entry:
-                    entries.append(entry)
+        use_async = self.async_fetch and self.engine_mode in (EngineMode.CURL, EngineMode.HYDRATION)
+        if use_async and not HTTPX_AVAILABLE:
+            print("  [crawler] httpx not installed, falling back to threaded cURL fetch", file=sys.stderr)
+            use_async = False
+
+        if use_async:
+            self.politeness.set_max_per_host(self.per_host_connections)
+        elif self.engine_mode == EngineMode.SELENIUM:
+            self.politeness.set_max_per_host(self.browsers)
         else:
-            # cURL: concurrent
-            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
-                futures = {pool.submit(self._process_url, rec): rec for rec in frontier}
-                for future in as_completed(futures):
-                    entry = future.result()
-                    if entry:
-                        with self._lock:
-                            entries.append(entry)
+            self.politeness.set_max_per_host(self.max_workers)
+        if self.engine_mode != EngineMode.SELENIUM and not streaming:
+            self._load_crawl_delays(frontier)
+
+        urls = "streamed URLs" if streaming else f"{self._total} URLs"
+        self._start_extract_pool()
+        try:
+            if use_async:
+                http_version = "HTTP/2" if HTTP2_AVAILABLE else "HTTP/1.1"
+                print(f"  [crawler] Crawling {urls} with up to {self.async_concurrency} in-flight requests (async {http_version})", file=sys.stderr)
+                asyncio.run(self._crawl_async(frontier))
+            elif self.engine_mode == EngineMode.SELENIUM:
+                print(f"  [crawler] Crawling {urls} with {self.browsers} browsers ({self.engine_mode.value} mode)", file=sys.stderr)
+                # Selenium: one fetch thread per pooled browser
+                self._crawl_threaded(frontier, workers=self.browsers)
+            else:
+                print(f"  [crawler] Crawling {urls} with {self.max_workers} workers ({self.engine_mode.value} mode)", file=sys.stderr)
+                # cURL (and hybrid: browser checkouts cap rendering at self.browsers)
+                self._crawl_threaded(frontier)
+        finally:
+            # A selector switch re-extracts pages after the last fetch; let it finish first
+            if self._switcher is not None:
+                self._switcher.join()
+            # Drains the extraction queue before the manifest is built
+            self._stop_extract_pool()
+            if self._archive is not None:
+                print(f"  [crawler] Archived {self._archive.records} raw pages → {self.archive_path}", file=sys.stderr)
+                self._archive.close()
+                self._archive = None
+
+        if self.engine_mode == EngineMode.HYBRID:
+            print(f"  [crawler] Hybrid: {self.rendered} of {self._total} pages rendered in the browser", file=sys.stderr)
+        if self.markdown_source:
+            print(f"  [crawler] Native Markdown: {self.native_markdown} of {self._total} pages fetched as source ({self.markdown_source})", file=sys.stderr)
+        if self.skipped:
+            print(f"  [crawler] Time budget: {self.skipped} URLs not started", file=sys.stderr)
+        if self.previous:
+            print(f"  [crawler] Incremental: {len(self.changed_paths)} changed, {self.unchanged} unchanged", file=sys.stderr)
+        if streaming:
+            frontier = frontier.records
+        return self._build_manifest(frontier[0].url if frontier else "")
 
+    def extract_pages(self, pages: Iterable[Tuple[UrlRecord, str]], total: int = 0) -> Manifest:
+        """Run only the extraction stage over already-fetched (record, html) pages.
+
+        No network access — used to rebuild output from an archive. *pages*
+        may be a generator: with a process pool it is consumed as the pool's
+        bounded queue drains, so only a few pages are in memory at a time.
+        *total* is for progress output.
+        """
+        self._total = total
+        self._scraped = 0
+        self._entries = []
+        start_url = ""
+        self._start_extract_pool()
+        try:
+            for record, html in pages:
+                start_url = start_url or record.url
+                self._dispatch_extract(record, FetchResult(html=html))
+        finally:
+            self._stop_extract_pool()
+        return self._build_manifest(start_url)
+
+    def prefetch(
+        self, frontier: List[UrlRecord], stop: threading.Event,
+        claim: Optional[Callable[[str], bool]] = None, release: Optional[Callable[[str], None]] = None,
+    ) -> int:
+        """Fetch the raw HTML of *frontier* into the store, without extracting.
+
+        Runs before the selectors are known (prefetch.py); no new URL is
+        started once *stop* is set. One attempt per URL — the crawl retries.
+        A URL is skipped unless *claim* (if given) returns True; *release*
+        is called once its fetch is over.
+        Returns the number of frontier pages now in the store.
+        """
+        if self.store is None or self.engine_mode == EngineMode.SELENIUM:
+            return 0
+        self._load_crawl_delays(frontier)
+        stored = 0
+
+        def fetch(record: UrlRecord) -> bool:
+            if stop.is_set() or self.deadline.expired():
+                return False
+            if claim is not None and not claim(record.url):
+                return False
+            try:
+                result = self._fetch_with(record.url, EngineMode.CURL)
+            finally:
+                if release is not None:
+                    release(record.url)
+            return result is not None and bool(result.html)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for ok in pool.map(fetch, frontier):
+                stored += ok
+        return stored
+
+    def _build_manifest(self, start_url: str) -> Manifest:
+        entries = list(self._entries)
         manifest = Manifest(
-            start_url=frontier[0].url if frontier else "",
+            start_url=start_url,
             engine_mode=self.engine_mode.value,
             total_pages=len(entries),
             total_files=len(entries),
@@ -115,284 +329,726 @@ class Crawler:
         return manifest
 
     # ------------------------------------------------------------------
-    # Per-URL processing
+    # Async crawl
     # ------------------------------------------------------------------
 
-    def _process_url(self, record: UrlRecord) -> Optional[ManifestEntry]:
-        html = self._fetch(record.url)
-        if not html:
-            return None
+    async def _crawl_async(self, frontier: Union[List[UrlRecord], FrontierStream]) -> None:
+        """Fetch the frontier on one event loop with pooled keep-alive connections.
 
-        soup = BeautifulSoup(html, "html.parser")
-        markdown = self._extract_and_convert(soup)
-        if not markdown or len(markdown.strip()) < 20:
-            return None
+        Network waits cost no threads: up to ``async_concurrency`` pages are
+        in progress at once; per host the politeness controller adapts the
+        number fetching (at most ``per_host_connections``). Retries back off
+        on the event loop's timers without holding a slot.
+        Extraction is CPU-bound and runs off the event loop, in the process
+        pool when one is running, otherwise on a thread pool.
+        """
+        loop = asyncio.get_running_loop()
+        in_flight = asyncio.Semaphore(self.async_concurrency)
+        limits = httpx.Limits(
+            max_connections=self.async_concurrency,
+            max_keepalive_connections=self.async_concurrency,
+        )
 
-        # Build output path from URL path
-        rel_path = self._url_to_filepath(record.url)
-        out_path = self.raw_dir / rel_path
-        out_path.parent.mkdir(parents=True, exist_ok=True)
+        async with httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=limits,
+            timeout=30,
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+        ) as client:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as extract_threads:
 
-        # Extract title
-        title = self._extract_title(soup, record.title)
+                async def handle(record: UrlRecord) -> None:
+                    if self._lastmod_unchanged(record):
+                        self._keep_previous(record, "sitemap lastmod unchanged")
+                        return
+                    for attempt in range(self.max_retries):
+                        # in_flight stays held through extraction, bounding fetched-but-unextracted pages
+                        async with in_flight:
+                            if self._out_of_time():
+                                return
+                            result = None
+                            if self.markdown_source:
+                                result = await self._fetch_markdown_async(client, record.url)
+                            if result is None:
+                                result = self._from_store(record.url, EngineMode.CURL.value)
+                                stored = result is not None
+                                if not stored:
+                                    result = await self._fetch_async(client, record.url)
+                                # Stored pages too: discovery stores the bare Gatsby shell
+                                data_url = self._page_data_url(record.url, result)
+                                if data_url:
+                                    result = self._with_page_data(result, await self._fetch_async(client, data_url))
+                                if not stored or data_url:
+                                    self._to_store(record.url, EngineMode.CURL.value, result)
+                            if result is not None and not result.retry:
+                                if result.not_modified:
+                                    self._keep_previous(record)
+                                    return
+                                self._archive_page(record.url, result.html)
+                                previous_hash = self._previous_hash(record.url)
+                                if not self._resume.is_set():  # selectors are being switched
+                                    await loop.run_in_executor(None, self._resume.wait)
+                                version = self._retain(record, result)
+                                try:
+                                    if self._extract_pool is not None:
+                                        entry = await loop.run_in_executor(
+                                            self._extract_pool, extract_page, record, result.html, previous_hash,
+                                            self._switched_spec())
+                                    else:
+                                        entry = await loop.run_in_executor(
+                                            extract_threads, self.extractor.process, record, result.html, previous_hash)
+                                except Exception as e:
+                                    # One bad page must not end the crawl (as in _on_extracted)
+                                    print(f"  [crawler] Extraction failed for {record.url}: {e}", file=sys.stderr)
+                                    return
+                                break
+                        if result is None or attempt + 1 >= self.max_retries or self.deadline.expired():
+                            return
+                        # Back off outside in_flight: the slot goes to another URL meanwhile
+                        await asyncio.sleep(self.politeness.retry_delay(record.url, attempt))
+                    else:
+                        return
+                    try:
+                        self._collect(record, entry, result, version)
+                    except Exception as e:
+                        print(f"  [crawler] Failed to record {record.url}: {e}", file=sys.stderr)
 
-        # Write file
-        content = f"# {title}\n\n**Source:** {record.url}\n\n{markdown}\n"
-        out_path.write_text(content, encoding="utf-8")
+                if not isinstance(frontier, FrontierStream):
+                    await asyncio.gather(*(handle(rec) for rec in frontier))
+                    return
+                # Streamed frontier: take a URL whenever a slot is free, so the queue keeps its backpressure
+                slots = asyncio.Semaphore(self.async_concurrency)
+                tasks = []
+                while True:
+                    await slots.acquire()
+                    try:
+                        record = await loop.run_in_executor(None, self._take, frontier, STREAM_POLL_S)
+                    except queue.Empty:
+                        slots.release()
+                        continue
+                    if record is None:
+                        break
+                    task = asyncio.ensure_future(handle(record))
+                    task.add_done_callback(lambda _: slots.release())
+                    tasks.append(task)
+                await asyncio.gather(*tasks)
+
+    async def _fetch_async(
+        self, client: "httpx.AsyncClient", url: str,
+        fetch_url: Optional[str] = None, headers: Optional[Dict[str, str]] = None,
+    ) -> Optional[FetchResult]:
+        """One attempt; see _fetch_curl."""
+        fetch_url = fetch_url or url
+        await self.politeness.acquire_async(fetch_url)
+        start = time.monotonic()
+        status, retry_after = 0, None
+        try:
+            resp = await client.get(fetch_url, headers={**self._conditional_headers(url), **(headers or {})})
+            status, retry_after = resp.status_code, resp.headers.get("Retry-After")
+        except httpx.HTTPError:
+            return FetchResult(retry=True)
+        finally:
+            self.politeness.release(fetch_url, status, time.monotonic() - start, retry_after)
+        return self._response_result(resp)
 
-        # Build manifest entry
-        headings = re.findall(r"^(#{1,6}\s+.+)$", markdown, re.MULTILINE)
-        content_hash = hashlib.md5(content.encode("utf-8")).hexdigest()
+    async def _fetch_markdown_async(self, client: "httpx.AsyncClient", url: str) -> Optional[FetchResult]:
+        """Event-loop variant of _fetch_markdown."""
+        result = self._from_store(url, STORE_KEY)
+        if result is None:
+            strategy = self.markdown_source
+            result = self._markdown_result(await self._fetch_async(
+                client, url, source_url(url, strategy), request_headers(strategy)))
+            self._to_store(url, STORE_KEY, result)
+        return self._count_native(result)
 
+    # ------------------------------------------------------------------
+    # Threaded crawl
+    # ------------------------------------------------------------------
+
+    def _crawl_threaded(self, frontier: Union[List[UrlRecord], FrontierStream], workers: Optional[int] = None) -> None:
+        """Run _process_url on a thread pool; failed fetches go on a delay queue.
+
+        A URL that should be retried is pushed onto a heap keyed by its due
+        time and resubmitted once due — its worker moves on to the next URL
+        instead of sleeping through the backoff. A streamed frontier is
+        polled whenever a worker is free.
+        """
+        stream = frontier if isinstance(frontier, FrontierStream) else None
+        ready = deque() if stream is not None else deque((rec, 0) for rec in frontier)
+        delayed: List[Tuple[float, int, UrlRecord, int]] = []
+        order = itertools.count()
+        running: Dict[Future, Tuple[UrlRecord, int]] = {}
+        workers = workers or self.max_workers
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while ready or delayed or running or (stream is not None and not stream.done):
+                now = time.monotonic()
+                while delayed and delayed[0][0] <= now:
+                    _, _, record, attempt = heapq.heappop(delayed)
+                    ready.appendleft((record, attempt))
+                while stream is not None and len(ready) + len(running) < workers:
+                    try:
+                        # Nothing else to wait for: block briefly on the producer
+                        record = self._take(stream, 0 if ready or running or delayed else STREAM_POLL_S)
+                    except queue.Empty:
+                        break
+                    if record is None:
+                        break
+                    ready.append((record, 0))
+                while ready and len(running) < workers:
+                    record, attempt = ready.popleft()
+                    running[pool.submit(self._process_url, record, attempt)] = (record, attempt)
+
+                timeout = max(delayed[0][0] - now, 0) if delayed else None
+                if stream is not None and not stream.done:
+                    timeout = min(timeout, STREAM_POLL_S) if timeout is not None else STREAM_POLL_S
+                if not running:
+                    if delayed:  # (an idle stream was already waited on in _take)
+                        time.sleep(timeout)
+                    continue
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record, attempt = running.pop(future)
+                    delay = future.result()
+                    if delay is not None:
+                        heapq.heappush(delayed, (time.monotonic() + delay, next(order), record, attempt + 1))
+
+    def _take(self, stream: FrontierStream, timeout: Optional[float]) -> Optional[UrlRecord]:
+        """Next URL of a streamed frontier; None once it is done. Raises queue.Empty.
+
+        The URL is counted, journaled and its host's Crawl-delay loaded.
+        Past the deadline the stream is cancelled, so discovery stops too.
+        """
+        if stream.done:
+            return None
+        if self.deadline.expired():
+            stream.cancel()
+            self._out_of_time()
+            return None
+        record = stream.get(timeout)
+        if record is None:
+            return None
+        with self._lock:
+            self._total += 1
+        if self.engine_mode != EngineMode.SELENIUM:
+            self._load_crawl_delays([record])
+        if self.journal is not None:
+            self.journal.record_url(record)
+        return record
+
+    # ------------------------------------------------------------------
+    # Per-URL processing
+    # ------------------------------------------------------------------
+
+    def _process_url(self, record: UrlRecord, attempt: int = 0) -> Optional[float]:
+        """Fetch and extract one URL. Returns a delay if the fetch should be retried."""
+        if self._out_of_time():
+            return None
+        if self._lastmod_unchanged(record):
+            self._keep_previous(record, "sitemap lastmod unchanged")
+            return None
+        result = self._fetch(record.url)
+        if result is None:
+            return None
+        if result.retry:
+            if attempt + 1 < self.max_retries and not self.deadline.expired():
+                return self.politeness.retry_delay(record.url, attempt)
+            return None
+        if result.not_modified:
+            self._keep_previous(record)
+            return None
+        self._dispatch_extract(record, result)
+        return None
+
+    def _out_of_time(self) -> bool:
+        """True once the deadline has passed; the caller skips its URL."""
+        if not self.deadline.expired():
+            return False
         with self._lock:
+            self.skipped += 1
+            if self.skipped == 1:
+                print("  [crawler] Time budget reached — finishing in-flight pages", file=sys.stderr)
+        return True
+
+    def _keep_previous(self, record: UrlRecord, reason: str = "not modified"):
+        """Page unchanged since last run (304 or same sitemap lastmod): reuse its entry and file as-is."""
+        url = record.url
+        entry = self.previous[url].model_copy()
+        entry.lastmod = record.lastmod
+        with self._lock:
+            self._entries.append(entry)
             self._scraped += 1
-            print(f"  [{self._scraped}/{self._total}] {record.url} → {rel_path}", file=sys.stderr)
-
-        return ManifestEntry(
-            url=record.url,
-            md_raw_path=str(rel_path),
-            size_bytes=len(content.encode("utf-8")),
-            headings=[h.strip() for h in headings[:20]],
-            content_hash=content_hash,
-        )
+            self.unchanged += 1
+            print(f"  [{self._scraped}/{self._total}] {url} ({reason})", file=sys.stderr)
+        if self.journal is not None:
+            self.journal.record(entry)
+
+    def _lastmod_unchanged(self, record: UrlRecord) -> bool:
+        """True if the sitemap lastmod matches last run's — no request needed at all.
+
+        Requires last run's markdown file to still be on disk.
+        """
+        if not record.lastmod:
+            return False
+        prev = self.previous.get(record.url)
+        if not prev or prev.lastmod != record.lastmod:
+            return False
+        return (self.raw_dir / prev.md_raw_path).exists()
+
+    def _previous_hash(self, url: str) -> str:
+        prev = self.previous.get(url)
+        return prev.content_hash if prev else ""
 
     # ------------------------------------------------------------------
-    # Fetch
+    # Extraction stage
     # ------------------------------------------------------------------
 
-    def _fetch(self, url: str) -> Optional[str]:
-        if self.engine_mode == EngineMode.SELENIUM:
-            return self._fetch_selenium(url)
-        return self._fetch_curl(url)
+    def _start_extract_pool(self):
+        if self.extract_processes <= 0:
+            return
+        self._extract_pool = ProcessPoolExecutor(
+            max_workers=self.extract_processes,
+            initializer=init_worker,
+            initargs=(self.selector_spec, str(self.raw_dir), self.hydrate),
+        )
+        # Bounded queue: at most 2 pages waiting per worker process
+        self._extract_slots = threading.BoundedSemaphore(self.extract_processes * 2)
+        print(f"  [crawler] Extracting in {self.extract_processes} worker processes", file=sys.stderr)
 
-    def _fetch_curl(self, url: str) -> Optional[str]:
-        for attempt in range(self.max_retries):
-            try:
-                resp = self.session.get(url, timeout=30)
-                if resp.status_code in (404, 410, 403, 401):
-                    return None
-                resp.raise_for_status()
-                return resp.text
-            except requests.HTTPError:
-                if attempt < self.max_retries - 1:
-                    time.sleep((2 ** attempt) + random.uniform(0, 1))
-                else:
-                    return None
-            except requests.RequestException:
-                if attempt < self.max_retries - 1:
-                    time.sleep((2 ** attempt) + random.uniform(0, 1))
-                else:
-                    return None
-        return None
+    def _stop_extract_pool(self):
+        if self._extract_pool is not None:
+            # A result callback may still submit a redo; the pool must accept it
+            with self._extract_idle:
+                self._extract_idle.wait_for(lambda: self._extracting == 0)
+            self._extract_pool.shutdown(wait=True)
+            self._extract_pool = None
 
-    def _fetch_selenium(self, url: str) -> Optional[str]:
-        if not SELENIUM_AVAILABLE:
-            print(f"  [crawler] Selenium not available, skipping {url}", file=sys.stderr)
-            return None
-        with self._driver_lock:
-            if self._driver is None:
-                opts = ChromeOptions()
-                opts.add_argument("--headless=new")
-                opts.add_argument("--disable-gpu")
-                opts.add_argument("--no-sandbox")
-                opts.add_argument("--disable-dev-shm-usage")
-                service = ChromeService(ChromeDriverManager().install())
-                self._driver = webdriver.Chrome(service=service, options=opts)
-                self._driver.set_page_load_timeout(30)
+    def _dispatch_extract(self, record: UrlRecord, result: FetchResult):
+        """Hand a fetched page to the extraction stage.
+
+        Without a process pool the page is extracted inline in the calling
+        thread. Otherwise it is queued to the pool; the caller blocks only
+        while the queue is full, then goes back to fetching.
+        """
+        self._archive_page(record.url, result.html)
+        self._resume.wait()  # paused while selectors are switched
+        version = self._retain(record, result)
+        previous_hash = self._previous_hash(record.url)
+        if self._extract_pool is None:
+            self._collect(record, self.extractor.process(record, result.html, previous_hash), result, version)
+            return
+        self._extract_slots.acquire()
+        if not self._submit_extract(record, result, version, previous_hash):
+            self._extract_slots.release()
+
+    def _submit_extract(
+        self, record: UrlRecord, result: FetchResult, version: int, previous_hash: str,
+        redo: bool = False, stale: Optional[ManifestEntry] = None,
+    ) -> bool:
+        """Queue one page to the process pool; False if the pool refused it (e.g. a broken pool).
+
+        A *redo* (see _collect) holds no queue slot: redos only come from
+        pages that were already queued when the selectors were switched.
+        """
+        with self._extract_idle:
+            self._extracting += 1
         try:
-            self._driver.get(url)
-            WebDriverWait(self._driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            # Wait for SPA hydration: look for content selector or any anchor
-            try:
-                sel = self.selector_spec.content_selector
-                WebDriverWait(self._driver, 5).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, sel))
-                )
-            except Exception:
-                try:
-                    WebDriverWait(self._driver, 3).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, "a[href]"))
-                    )
-                except Exception:
-                    pass
-            import time
-            time.sleep(0.5)
-            return self._driver.page_source
+            future = self._extract_pool.submit(extract_page, record, result.html, previous_hash, self._switched_spec())
         except Exception as e:
-            print(f"  [crawler] Selenium error for {url}: {e}", file=sys.stderr)
-            return None
+            self._extract_done()
+            print(f"  [crawler] Extraction failed for {record.url}: {e}", file=sys.stderr)
+            return False
+        future.add_done_callback(lambda f: self._on_extracted(record, result, version, f, redo, stale))
+        return True
 
-    def close(self):
-        if self._driver:
+    def _on_extracted(
+        self, record: UrlRecord, result: FetchResult, version: int, future: Future,
+        redo: bool = False, stale: Optional[ManifestEntry] = None,
+    ):
+        if not redo:
+            self._extract_slots.release()
+        try:
             try:
-                self._driver.quit()
-            except Exception:
-                pass
-            self._driver = None
+                entry = future.result()
+            except Exception as e:
+                print(f"  [crawler] Extraction failed for {record.url}: {e}", file=sys.stderr)
+                return
+            self._collect(record, entry, result, version, stale)
+        finally:
+            self._extract_done()
+
+    def _extract_done(self):
+        with self._extract_idle:
+            self._extracting -= 1
+            self._extract_idle.notify_all()
+
+    def _collect(
+        self, record: UrlRecord, entry: Optional[ManifestEntry], result: FetchResult, version: int,
+        stale: Optional[ManifestEntry] = None,
+    ):
+        """Record an extracted page; *version* is the selector version it was extracted with.
+
+        A page extracted with the selectors in use before a switch is
+        extracted again from memory — in the process pool when one runs, so
+        the pool's result thread never extracts. *stale* is the entry the
+        redo replaces; its file goes if the redo yields nothing.
+        """
+        with self._lock:
+            current = version == self._spec_version
+            if current:
+                if entry:
+                    self._add_entry(entry, result)
+                if self._retained:
+                    self._finished.add(record.url)
+            version = self._spec_version
+        if not current:
+            self._redo_extract(record, result, version, entry or stale)
+            return
+        if stale and not entry:
+            (self.raw_dir / stale.md_raw_path).unlink(missing_ok=True)
+        if entry and self.journal is not None:
+            self.journal.record(entry)
+        if self.monitor is not None and self.monitor.record(entry.size_bytes if entry else 0):
+            self._start_switch()
+
+    def _redo_extract(self, record: UrlRecord, result: FetchResult, version: int, stale: Optional[ManifestEntry]):
+        """Extract a page again with the current selectors (see _collect)."""
+        previous_hash = self._previous_hash(record.url)
+        if self._extract_pool is None:
+            self._collect(record, self.extractor.process(record, result.html, previous_hash), result, version, stale)
+        elif not self._submit_extract(record, result, version, previous_hash, redo=True, stale=stale) and stale:
+            (self.raw_dir / stale.md_raw_path).unlink(missing_ok=True)
+
+    def _add_entry(self, entry: ManifestEntry, result: FetchResult):
+        """Append to the manifest entries; caller holds self._lock."""
+        entry.etag = result.etag
+        entry.last_modified = result.last_modified
+        changed = self._previous_hash(entry.url) != entry.content_hash
+        self._entries.append(entry)
+        self._scraped += 1
+        if changed:
+            self.changed_paths.append(entry.md_raw_path)
+        else:
+            self.unchanged += 1
+        print(f"  [{self._scraped}/{self._total}] {entry.url} → {entry.md_raw_path}", file=sys.stderr)
 
     # ------------------------------------------------------------------
-    # Extract & Convert
+    # Online quality check
     # ------------------------------------------------------------------
 
-    def _extract_and_convert(self, soup: BeautifulSoup) -> str:
-        # Find main content
-        content_el = None
-        selector = self.selector_spec.content_selector
-        try:
-            content_el = soup.select_one(selector)
-        except Exception:
-            pass
+    def _retain(self, record: UrlRecord, result: FetchResult) -> int:
+        """Keep a fetched page in memory while the monitor watches; returns the selector version."""
+        with self._lock:
+            if self.monitor is not None and (self.monitor.watching or self.monitor.pending):
+                self._retained.append((record, result))
+            elif self._retained:
+                self._retained, self._finished = [], set()  # crawl settled: no switch will need them
+            return self._spec_version
 
-        if not content_el:
-            for fallback in ["main", "article", ".content", "#content", "body"]:
-                try:
-                    content_el = soup.select_one(fallback)
-                    if content_el:
-                        break
-                except Exception:
-                    continue
+    def _switched_spec(self) -> Optional[SelectorSpec]:
+        """Selectors for extraction workers, once they differ from the ones the pool started with."""
+        return self.selector_spec if self.selector_switched else None
 
-        if not content_el:
-            return ""
+    def _start_switch(self):
+        """Run _switch_selectors on its own thread; new extractions wait on _resume meanwhile.
 
-        # Clone to avoid mutating original
-        from copy import copy
-        content_copy = copy(content_el)
+        The reporting thread may be the event loop or the process pool's
+        result thread, neither of which may block on the LLM call.
+        """
+        self._resume.clear()
+        self._switcher = threading.Thread(target=self._switch_selectors, name="selector-switch", daemon=True)
+        self._switcher.start()
 
-        # Prune unwanted elements
-        for prune_sel in self.selector_spec.prune_selectors:
-            try:
-                for el in content_copy.select(prune_sel):
-                    el.decompose()
-            except Exception:
-                continue
+    def _switch_selectors(self):
+        """Ask on_poor_quality for new selectors, re-extract retained pages, then resume extraction."""
+        stats = self.monitor.stats()
+        print(
+            f"  [quality] {stats.succeeded}/{stats.pages} pages extracted well "
+            f"({stats.thin} thin, {stats.failed} empty, median {stats.median_bytes} bytes) — pausing to re-analyze selectors",
+            file=sys.stderr,
+        )
+        try:
+            with self._lock:
+                pages = [(record.url, result.html) for record, result in self._retained]
+            spec = None
+            if self.on_poor_quality is not None:
+                try:
+                    spec = self.on_poor_quality(stats, pages)
+                except Exception as e:
+                    print(f"  [quality] Re-analysis failed: {e}", file=sys.stderr)
+            if spec is None or spec == self.selector_spec:
+                print("  [quality] No better selectors found — continuing unchanged", file=sys.stderr)
+                self.monitor.switch_done(False)
+                with self._lock:
+                    self._retained, self._finished = [], set()
+                return
 
-        # Also prune common UI elements that often leak through
-        for generic_sel in ["script", "style", "noscript", "iframe", "aside",
-                            "button[aria-label*='copy']", "button[aria-label*='Copy']",
-                            ".copy-button", ".clipboard-button"]:
-            try:
-                for el in content_copy.select(generic_sel):
-                    el.decompose()
-            except Exception:
-                continue
+            with self._lock:
+                self.selector_spec = spec
+                self.extractor = PageExtractor(spec, str(self.raw_dir), self.hydrate)
+                self._spec_version += 1  # after the extractor: a stale version never sees the old one
+                # Pages still being extracted redo themselves in _collect (their version is stale now)
+                retained = [(record, result) for record, result in self._retained if record.url in self._finished]
+                self._retained, self._finished = [], set()
+                redo = {record.url for record, _ in retained}
+                stale = {e.md_raw_path for e in self._entries if e.url in redo}
+                self._entries = [e for e in self._entries if e.url not in redo]
+                self.changed_paths = [p for p in self.changed_paths if p not in stale]
+                self._scraped -= len(stale)
+                self.selector_switched = True
+                version = self._spec_version
+            for path in stale:
+                (self.raw_dir / path).unlink(missing_ok=True)
+            if self.journal is not None:
+                self.journal.record_selectors(spec)
+            self.monitor.switch_done(True)
+            print(
+                f"  [quality] Switched to content selector '{spec.content_selector}' — "
+                f"re-extracting {len(retained)} fetched pages from memory",
+                file=sys.stderr,
+            )
+            for record, result in retained:
+                self._collect(record, self.extractor.process(record, result.html, self._previous_hash(record.url)),
+                              result, version)
+        finally:
+            self._resume.set()
 
-        # Generic sidebar detection: remove fixed/sticky elements with many links
-        self._prune_sidebar_elements(content_copy)
+    def _archive_page(self, url: str, html: str):
+        if self._archive is not None:
+            self._archive.write_page(url, html)
+
+    # ------------------------------------------------------------------
+    # Fetch
+    # ------------------------------------------------------------------
 
-        # Pre-process code blocks to preserve newlines
-        self._preprocess_code_blocks(content_copy)
+    def _fetch(self, url: str) -> Optional[FetchResult]:
+        """Fetch url, serving it from the run's fetch store when already fetched."""
+        if self.markdown_source:
+            result = self._fetch_markdown(url)
+            if result is not None:
+                return result
+        if self.engine_mode == EngineMode.HYBRID:
+            return self._fetch_hybrid(url)
+        if self.engine_mode == EngineMode.HYDRATION:
+            return self._fetch_with(url, EngineMode.CURL)
+        return self._fetch_with(url, self.engine_mode)
 
-        # Convert to markdown
-        markdown = md(
-            str(content_copy),
-            heading_style="ATX",
-            code_language_callback=lambda el: (
-                el.get("class", [""])[0].replace("language-", "")
-                if el.get("class") else ""
-            ),
-        )
+    def _fetch_with(self, url: str, mode: EngineMode) -> Optional[FetchResult]:
+        result = self._from_store(url, mode.value)
+        stored = result is not None
+        if not stored and mode == EngineMode.SELENIUM:
+            html = self._fetch_selenium(url)
+            result = FetchResult(html=html) if html else None
+        elif not stored:
+            result = self._fetch_curl(url)
+        # Stored pages too: discovery stores the bare Gatsby shell
+        data_url = self._page_data_url(url, result)
+        if data_url:
+            result = self._with_page_data(result, self._fetch_curl(data_url))
+        if not stored or data_url:
+            self._to_store(url, mode.value, result)
+        return result
 
-        # Clean
-        markdown = self.cleaner.clean(markdown)
-        return markdown.strip()
+    def _page_data_url(self, url: str, result: Optional[FetchResult]) -> Optional[str]:
+        """Hydration mode: Gatsby keeps page content in a separate page-data.json."""
+        if not self.hydrate or result is None or not result.html:
+            return None
+        return gatsby_page_data_url(result.html, url)
 
     @staticmethod
-    def _prune_sidebar_elements(soup_el):
-        """Generically detect and remove sidebar navigation inside content.
+    def _with_page_data(result: FetchResult, page_data: Optional[FetchResult]) -> FetchResult:
+        """Attach page-data to the page's HTML, so the store and archive hold both."""
+        if page_data is None or page_data.retry or not page_data.html:
+            return result
+        return result._replace(html=attach_page_data(result.html, page_data.html))
+
+    def _fetch_hybrid(self, url: str) -> Optional[FetchResult]:
+        """HTTP first; re-fetch through the browser only if the page comes out thin.
 
-        Heuristics:
-        1. Elements with fixed/sticky positioning + many links = sidebar nav
-        2. Direct children of content with nav-like classes + many links
+        The HTTP validators are kept, so an incremental run can still
+        revalidate a rendered page with a conditional GET.
         """
-        MIN_LINKS_FOR_SIDEBAR = 8
+        result = self._fetch_with(url, EngineMode.CURL)
+        if result is None or result.retry or result.not_modified or not SELENIUM_AVAILABLE:
+            return result
+        metrics = page_metrics(result.html, url)
+        if not is_thin(metrics):
+            return result
+        rendered = self._fetch_with(url, EngineMode.SELENIUM)
+        if rendered is None or page_metrics(rendered.html, url).md_length <= metrics.md_length:
+            return result
+        with self._lock:
+            self.rendered += 1
+        return result._replace(html=rendered.html)
 
-        for el in list(soup_el.find_all(recursive=False)):
-            classes = " ".join(el.get("class", []))
-            style = el.get("style", "")
+    def _fetch_markdown(self, url: str) -> Optional[FetchResult]:
+        """The page's Markdown source as an extractor document; None → fetch the HTML.
 
-            # Check for fixed/sticky positioning (via class or style)
-            is_fixed = any(kw in classes for kw in ["fixed", "sticky"]) or \
-                       any(kw in style for kw in ["position: fixed", "position: sticky"])
+        Failures of any kind (404, throttling, an HTML answer) fall back to
+        the HTML fetch, which has its own retry handling.
+        """
+        result = self._from_store(url, STORE_KEY)
+        if result is None:
+            strategy = self.markdown_source
+            result = self._markdown_result(self._fetch_curl(url, source_url(url, strategy), request_headers(strategy)))
+            self._to_store(url, STORE_KEY, result)
+        return self._count_native(result)
 
-            # Check for nav-like class names
-            is_nav_like = any(kw in classes.lower() for kw in [
-                "sidebar", "sidenav", "side-nav", "toc", "table-of-contents",
-                "navigation", "nav-menu", "menu-panel",
-            ])
+    def _count_native(self, result: Optional[FetchResult]) -> Optional[FetchResult]:
+        if result is not None and not result.not_modified:
+            with self._lock:
+                self.native_markdown += 1
+        return result
 
-            if is_fixed or is_nav_like:
-                link_count = len(el.find_all("a"))
-                if link_count >= MIN_LINKS_FOR_SIDEBAR:
-                    el.decompose()
+    def _markdown_result(self, result: Optional[FetchResult]) -> Optional[FetchResult]:
+        if result is not None and result.not_modified:
+            return result
+        if result is None or result.retry or not is_markdown_response(
+                result.html, result.content_type, self.markdown_source):
+            return None
+        return result._replace(html=to_document(result.html))
 
-    @staticmethod
-    def _preprocess_code_blocks(soup_el):
-        """Fix code blocks before markdownify conversion.
-
-        markdownify often concatenates lines inside <pre>/<code> blocks.
-        Common patterns handled:
-        - Shiki: <pre><code><span class="line">...</span></code></pre>
-        - Highlight.js: <pre><code><span>line1</span><br>...</code></pre>
-        - Generic: <pre><div>line</div>...</pre>
+    def _from_store(self, url: str, key: str) -> Optional[FetchResult]:
+        """Stored page for *key* (an EngineMode value or STORE_KEY).
+
+        Incremental mode: a URL with a previous entry is revalidated
+        against the stored copy's validators — the same ETag/Last-Modified
+        counts as not modified, a copy without validators is not trusted
+        (None → conditional GET).
         """
-        from bs4 import NavigableString, Tag
-
-        for pre in soup_el.find_all("pre"):
-            # Strategy 1: Shiki-style — span.line elements represent code lines
-            line_spans = pre.find_all("span", class_=lambda c: c and isinstance(c, list) and "line" in c)
-            if not line_spans:
-                # Also try string match for class attribute
-                line_spans = [s for s in pre.find_all("span") if s.get("class") and "line" in s.get("class", [])]
-
-            if line_spans:
-                for span in line_spans:
-                    span.append(NavigableString("\n"))
-                    span.unwrap()
-                # Unwrap remaining styling spans
-                for span in list(pre.find_all("span")):
-                    span.unwrap()
-                continue
+        if self.store is None:
+            return None
+        html = self.store.get(url, key)
+        if html is None:
+            return None
+        validators = self.store.headers(url, key)
+        result = FetchResult(
+            html=html,
+            etag=validators.get("etag", ""),
+            last_modified=validators.get("last-modified", ""),
+        )
+        conditional = self._conditional_headers(url)
+        if not conditional:
+            return result
+        if (result.etag and result.etag == conditional.get("If-None-Match")) or (
+                result.last_modified and result.last_modified == conditional.get("If-Modified-Since")):
+            return FetchResult(not_modified=True)
+        if not (result.etag or result.last_modified):
+            return None
+        return result
 
-            # Strategy 2: <br> tags as line separators
-            for br in pre.find_all("br"):
-                br.replace_with(NavigableString("\n"))
+    def _to_store(self, url: str, key: str, result: Optional[FetchResult]):
+        if self.store is None or result is None or not result.html:
+            return
+        self.store.put(url, key, result.html, headers={
+            "etag": result.etag,
+            "last-modified": result.last_modified,
+        })
 
-            # Strategy 3: Block elements inside pre (div, p)
-            for tag_name in ["div", "p", "li"]:
-                for el in pre.find_all(tag_name):
-                    el.insert_before(NavigableString("\n"))
-                    el.unwrap()
+    def _conditional_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since from the previous manifest entry.
 
-            # Unwrap remaining inline elements (spans) inside pre
-            for span in list(pre.find_all("span")):
-                span.unwrap()
+        Only sent when last run's markdown file is still on disk, since a
+        304 means that file is reused unchanged.
+        """
+        prev = self.previous.get(url)
+        if not prev or not (self.raw_dir / prev.md_raw_path).exists():
+            return {}
+        headers = {}
+        if prev.etag:
+            headers["If-None-Match"] = prev.etag
+        if prev.last_modified:
+            headers["If-Modified-Since"] = prev.last_modified
+        return headers
 
-    # ------------------------------------------------------------------
-    # Helpers
-    # ------------------------------------------------------------------
+    def _fetch_curl(
+        self, url: str, fetch_url: Optional[str] = None, headers: Optional[Dict[str, str]] = None,
+    ) -> Optional[FetchResult]:
+        """One attempt; see _response_result.
 
-    @staticmethod
-    def _url_to_filepath(url: str) -> str:
-        parsed = urlparse(url)
-        path = parsed.path.strip("/")
-        if not path:
-            path = "index"
-        # Remove file extension if present
-        if path.endswith(".html") or path.endswith(".htm"):
-            path = path.rsplit(".", 1)[0]
-        # Sanitize
-        path = re.sub(r"[^\w/\-.]", "_", path)
-        return path + ".md"
+        *fetch_url* / *headers* request another rendering of *url* (its
+        Markdown source); conditional headers still come from *url*'s entry.
+        """
+        fetch_url = fetch_url or url
+        self.politeness.acquire(fetch_url)
+        start = time.monotonic()
+        status, retry_after = 0, None
+        try:
+            resp = self.session.get(
+                fetch_url, timeout=30, headers={**self._conditional_headers(url), **(headers or {})})
+            status, retry_after = resp.status_code, resp.headers.get("Retry-After")
+        except requests.RequestException:
+            return FetchResult(retry=True)
+        finally:
+            self.politeness.release(fetch_url, status, time.monotonic() - start, retry_after)
+        return self._response_result(resp)
 
     @staticmethod
-    def _extract_title(soup: BeautifulSoup, fallback: str) -> str:
-        h1 = soup.select_one("h1")
-        if h1:
-            return h1.get_text(strip=True)[:200]
-        title_tag = soup.find("title")
-        if title_tag:
-            return title_tag.get_text(strip=True)[:200]
-        return fallback or "Untitled"
+    def _response_result(resp) -> Optional[FetchResult]:
+        """Map a requests/httpx response to a FetchResult.
+
+        None means give up on the URL; FetchResult(retry=True) means try
+        again later (throttled, server error or other 4xx).
+        """
+        if resp.status_code == 304:
+            return FetchResult(not_modified=True)
+        if resp.status_code in GIVE_UP_STATUSES:
+            return None
+        if resp.status_code in THROTTLE_STATUSES or resp.status_code >= 400:
+            return FetchResult(retry=True)
+        content_type = resp.headers.get("Content-Type", "")
+        if "charset" not in content_type.lower() and ("markdown" in content_type or "text/plain" in content_type):
+            resp.encoding = "utf-8"  # requests would guess ISO-8859-1 for text/* without a charset
+        return FetchResult(
+            html=resp.text,
+            etag=resp.headers.get("ETag", ""),
+            last_modified=resp.headers.get("Last-Modified", ""),
+            content_type=content_type,
+        )
+
+    def _load_crawl_delays(self, frontier: List[UrlRecord]):
+        """Apply robots.txt Crawl-delay for every host in the frontier not seen yet."""
+        hosts = {urlparse(r.url).netloc: urlparse(r.url).scheme for r in frontier}
+        for host, scheme in hosts.items():
+            if host in self._delay_hosts:
+                continue
+            self._delay_hosts.add(host)
+            delay = robots_crawl_delay(f"{scheme}://{host}", self.session)
+            if delay > 0:
+                self.politeness.set_crawl_delay(host, delay)
+                print(f"  [crawler] {host}: robots.txt Crawl-delay {delay:g}s", file=sys.stderr)
+
+    def _fetch_selenium(self, url: str) -> Optional[str]:
+        if not SELENIUM_AVAILABLE:
+            print(f"  [crawler] Selenium not available, skipping {url}", file=sys.stderr)
+            return None
+        with self._lock:
+            if self._browser_pool is None:
+                # Shared with engine selection and discovery: Chrome is already warm
+                self._browser_pool = broker.pool(self.browsers)
+        self.politeness.acquire(url)
+        start = time.monotonic()
+        status = 0
+        try:
+            with self._browser_pool.checkout(self._blocked_urls) as driver:
+                # A page timing out is not the browser's fault: keep the driver
+                try:
+                    driver.get(url)
+                except TimeoutException:
+                    print(f"  [crawler] Selenium timeout for {url}", file=sys.stderr)
+                    return None
+                # SPA hydration: return as soon as the DOM and network go quiet
+                wait_until_ready(driver, self.selector_spec.content_selector)
+                html = driver.page_source
+            status = 200
+            return html
+        except Exception as e:
+            print(f"  [crawler] Selenium error for {url}: {e}", file=sys.stderr)
+            return None
+        finally:
+            self.politeness.release(url, status, time.monotonic() - start)
+
+    def close(self):
+        # Browsers belong to the process-wide broker and stay up for later stages
+        self._browser_pool = None
@@ -0,0 +1,37 @@
+"""Wall-clock deadline for time-budgeted runs (--time-budget).
+
+A Deadline without a budget never expires, so callers can check it
+unconditionally.
+"""
+import math
+import time
+from typing import Optional
+
+
+class Deadline:
+    def __init__(self, seconds: Optional[float] = None):
+        self.budget = seconds if seconds and seconds > 0 else None
+        self._end = time.monotonic() + self.budget if self.budget else math.inf
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget is not None
+
+    def remaining(self) -> float:
+        """Seconds left (inf without a budget, never negative)."""
+        return max(self._end - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self._end
+
+    def reserve(self, seconds: float) -> "Deadline":
+        """A deadline *seconds* earlier — leaves time for the stages after it.
+
+        Without a budget there is nothing to reserve (and inf - inf is NaN).
+        """
+        if not self.enabled:
+            return Deadline()
+        earlier = Deadline()
+        earlier.budget = self.budget
+        earlier._end = self._end - seconds
+        return earlier
@@ -10,17 +10,24 @@ Algorithm:
 3. Count how many pages each block appears in
 4. Blocks appearing in >50% of pages are UI residue → remove from all files
 5. Re-write cleaned files
+
+Incremental runs only clean the new or changed files. The unchanged ones
+were deduplicated last time, so their repeated blocks are gone; the block
+set found by the last full run is saved (DEDUP_BLOCKS_FILENAME) and
+reused instead.
 """
+import json
 import re
 import sys
 from collections import Counter
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 
 MIN_BLOCK_LENGTH = 15
 MIN_PAGES_FOR_DEDUP = 3
 REPEAT_THRESHOLD = 0.5
+DEDUP_BLOCKS_FILENAME = "dedup-blocks.json"
 
 
 def _split_into_blocks(content: str) -> List[str]:
@@ -109,18 +116,44 @@ def remove_repeated_blocks(content: str, repeated: Set[str]) -> str:
     return "\n\n".join(kept)
 
 
-def deduplicate_crawl_output(raw_dir: Path, max_sample: int = 30) -> Tuple[int, int]:
+def load_repeated_blocks(path: Optional[Path]) -> Set[str]:
+    """Block set saved by an earlier run, or an empty set."""
+    if path is None or not path.exists():
+        return set()
+    try:
+        return set(json.loads(path.read_text(encoding="utf-8")))
+    except (OSError, ValueError, TypeError):
+        return set()
+
+
+def save_repeated_blocks(path: Optional[Path], repeated: Set[str]):
+    if path is not None:
+        path.write_text(json.dumps(sorted(repeated), indent=2), encoding="utf-8")
+
+
+def deduplicate_crawl_output(
+    raw_dir: Path, max_sample: int = 30, files: Optional[List[Path]] = None,
+    blocks_path: Optional[Path] = None,
+) -> Tuple[int, int]:
     """Run cross-page deduplication on all markdown files in raw_dir.
 
     1. Read up to max_sample files to find repeated blocks
     2. Remove repeated blocks from ALL files
     3. Re-write cleaned files
 
+    If *files* is given (incremental runs), only those files are cleaned —
+    unchanged files were already deduplicated by an earlier run. The block
+    set saved at *blocks_path* is applied to them together with any blocks
+    repeated among *files*; the union is saved back.
+
     Returns (num_files_cleaned, num_blocks_removed).
     """
-    md_files = sorted(raw_dir.rglob("*.md"))
-    if len(md_files) < MIN_PAGES_FOR_DEDUP:
+    md_files = sorted(files) if files is not None else sorted(raw_dir.rglob("*.md"))
+    saved = load_repeated_blocks(blocks_path) if files is not None else set()
+    if len(md_files) < MIN_PAGES_FOR_DEDUP and not (saved and md_files):
         print(f"  [dedup] Only {len(md_files)} files, skipping (need {MIN_PAGES_FOR_DEDUP}+)", file=sys.stderr)
+        if files is None:
+            save_repeated_blocks(blocks_path, set())
         return 0, 0
 
     # Read sample files
@@ -133,11 +166,14 @@ def deduplicate_crawl_output(raw_dir: Path, max_sample: int = 30) -> Tuple[int,
             continue
 
     # Find repeated blocks
-    repeated = find_repeated_blocks(file_contents)
+    repeated = find_repeated_blocks(file_contents) | saved
+    save_repeated_blocks(blocks_path, repeated)
     if not repeated:
         print(f"  [dedup] No repeated blocks found across {len(sample_files)} pages", file=sys.stderr)
         return 0, 0
 
+    if saved:
+        print(f"  [dedup] {len(saved)} repeated blocks saved by the last run", file=sys.stderr)
     print(f"  [dedup] Found {len(repeated)} repeated blocks across {len(sample_files)} pages", file=sys.stderr)
     for norm in sorted(repeated)[:5]:
         preview = norm[:80]
@@ -3,31 +3,79 @@
 Discovers documentation URLs from a start URL using multiple strategies:
 1. robots.txt → sitemap references
 2. Standard sitemap paths (/sitemap.xml, /sitemap-index.xml, etc.)
-3. Quick-sample: BFS crawl of ~10 pages from start URL for link extraction
-4. Canonicalize + dedupe all discovered URLs into a frontier
+3. llms.txt index links
+4. Quick-sample: BFS crawl of ~10 pages from start URL for link extraction
+5. Static-site search index (MkDocs, Docusaurus, Sphinx, VitePress):
+   complete page list with real titles
+6. Canonicalize + dedupe all discovered URLs into a frontier
+
+stream_records() is the producer variant for the streaming pipeline: the
+same sources, yielded one UrlRecord at a time as they are found
+(frontier_stream.py).
+
+probe_llms_txt() is the fast path the pipeline tries before everything
+else: when the site publishes its docs as Markdown (llms-full.txt, or an
+llms.txt index of .md files) the pages are returned ready to write.
+probe_markdown_source() checks whether single pages are served as
+Markdown (.md alternates, Accept: text/markdown).
+probe_search_index() also returns the page text where the index has it,
+for the pipeline's zero-crawl mode.
 """
 import gzip
 import re
 import sys
 import xml.etree.ElementTree as ET
-from collections import deque
-from typing import Dict, List, Optional, Set, Tuple
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 from urllib.parse import urljoin, urlparse
 
 import requests
 from bs4 import BeautifulSoup
 
-from models import EngineMode, UrlRecord
+from browser import blocked_url_patterns, broker, wait_until_ready
+from deadline import Deadline
+from markdown_source import (
+    PROBE_PAGES,
+    STRATEGIES,
+    is_markdown_response,
+    probe_result,
+    request_headers,
+    source_url,
+)
+from llms_txt import (
+    LLMS_FULL,
+    LLMS_INDEX,
+    MIN_CORPUS_CHARS,
+    LlmsPage,
+    first_heading,
+    in_scope,
+    is_markdown_url,
+    llms_locations,
+    looks_like_markdown_file,
+    page_url_for,
+    parse_index,
+    split_corpus,
+    strip_title,
+)
+from fetch_store import FetchStore
+from models import EngineMode, ResourceBlocklist, UrlRecord
+from search_index import (
+    MAX_VITEPRESS_SCRIPTS,
+    SPHINX_OPTIONS,
+    SearchPage,
+    detect_generator,
+    index_base,
+    index_locations,
+    parse_search_index,
+    vitepress_chunk_refs,
+    vitepress_script_urls,
+)
 
 SELENIUM_AVAILABLE = False
 try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options as ChromeOptions
-    from selenium.webdriver.chrome.service import Service as ChromeService
-    from webdriver_manager.chrome import ChromeDriverManager
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    from selenium.webdriver.common.by import By
+    import selenium  # noqa: F401
     SELENIUM_AVAILABLE = True
 except ImportError:
     pass
@@ -50,14 +98,30 @@ STANDARD_SITEMAP_PATHS = [
 
 
 class DiscoveryWorker:
-    def __init__(self, timeout: int = 15, engine_mode: EngineMode = EngineMode.CURL):
+    def __init__(
+        self, timeout: int = 15, engine_mode: EngineMode = EngineMode.CURL,
+        store: Optional[FetchStore] = None, deadline: Optional[Deadline] = None,
+        blocklist: Optional[ResourceBlocklist] = None,
+    ):
         self.timeout = timeout
         self.engine_mode = engine_mode
+        self.store = store
+        self.deadline = deadline or Deadline()
+        self.blocked_urls = blocked_url_patterns(blocklist or ResourceBlocklist())
         self.session = requests.Session()
         self.session.headers.update({
             "User-Agent": "Mozilla/5.0 (compatible; AnyDocsMCP/2.0)"
         })
-        self._driver = None
+        # Link graph of the quick sample (canonical URL → value), for frontier scoring
+        self.inbound_links: Counter = Counter()
+        self.link_depth: Dict[str, int] = {}
+        # llms.txt: (url it was found at, text), fetched at most once
+        self._llms_index: Optional[Tuple[str, str]] = None
+        self._llms_index_probed = False
+        # Search index pages, probed at most once
+        self._search_pages: Optional[List[SearchPage]] = None
+        # URL → HTML of the quick-sample pages, start page first (content detection, selector scoring)
+        self.sample_pages: Dict[str, str] = {}
 
     # ------------------------------------------------------------------
     # Public API
@@ -83,28 +147,35 @@ class DiscoveryWorker:
         # 1b. Pre-filter sitemap URLs by start_url path prefix
         if start_path and start_path != "/":
             before_filter = len(sitemap_urls)
-            sitemap_urls = [
-                u for u in sitemap_urls
-                if urlparse(u["url"]).path.rstrip("/").startswith(start_path)
-            ]
+            sitemap_urls = [u for u in sitemap_urls if self._under_path(u["url"], start_path)]
             if before_filter != len(sitemap_urls):
                 print(f"  [discovery] Path pre-filter ({start_path}): {before_filter} → {len(sitemap_urls)}", file=sys.stderr)
 
+        # 1c. llms.txt index: curated page list (HTML pages; .md files are handled by probe_llms_txt)
+        llms_links = self._llms_page_links(start_url)
+
         # 2. Quick-sample BFS
-        start_html, sample_links = self._quick_sample(start_url, max_pages=max_sample_pages)
-        print(f"  [discovery] Quick-sample found {len(sample_links)} unique links", file=sys.stderr)
+        start_html, sample_links = self.sample(start_url, max_pages=max_sample_pages)
+
+        # 2b. Search index: every page with its real title
+        search_pages = self.probe_search_index(start_url, start_html)
 
         # 3. Merge + canonicalize + dedupe
         frontier: Dict[str, UrlRecord] = {}
 
         for url_dict in sitemap_urls:
-            canon = self._canonicalize(url_dict["url"], base_url)
-            if canon and canon not in frontier:
-                frontier[canon] = UrlRecord(
-                    url=canon,
-                    title=url_dict.get("title", ""),
-                    source="sitemap",
-                )
+            record = self._sitemap_record(url_dict, base_url)
+            if record and record.url not in frontier:
+                frontier[record.url] = record
+
+        for page in search_pages:
+            canon = self._canonicalize(page.url, base_url)
+            if not canon:
+                continue
+            if canon not in frontier:
+                frontier[canon] = UrlRecord(url=canon, title=page.title, source="search-index")
+            elif page.title:
+                frontier[canon].title = page.title  # better than the sitemap's path-derived title
 
         for link in sample_links:
             canon = self._canonicalize(link, base_url)
@@ -115,10 +186,235 @@ class DiscoveryWorker:
                     source="quick-sample",
                 )
 
+        for link in llms_links:
+            canon = self._canonicalize(link, base_url)
+            if canon and canon not in frontier:
+                frontier[canon] = UrlRecord(url=canon, source="llms.txt")
+
+        # Sample link graph: hops from start (-1 = only seen in sitemap) + inbound links
+        for record in frontier.values():
+            self._add_link_graph(record)
+
         records = list(frontier.values())
         print(f"  [discovery] Frontier: {len(records)} unique URLs", file=sys.stderr)
         return records, start_html, sample_links
 
+    def sample(self, start_url: str, max_pages: int = 10) -> Tuple[str, Set[str]]:
+        """Quick-sample BFS from start_url; fills sample_pages and the link graph.
+
+        Returns (start_page_html, all_raw_links).
+        """
+        parsed = urlparse(start_url)
+        start_canon = self._canonicalize(start_url, f"{parsed.scheme}://{parsed.netloc}")
+        if start_canon:
+            self.link_depth[start_canon] = 0
+        start_html, sample_links = self._quick_sample(start_url, max_pages=max_pages)
+        print(f"  [discovery] Quick-sample found {len(sample_links)} unique links", file=sys.stderr)
+        return start_html, sample_links
+
+    def stream_records(self, start_url: str, start_html: str, sample_links: Set[str]) -> Iterator[UrlRecord]:
+        """Discovery as a producer: yield canonical UrlRecords as they are found.
+
+        Call sample() first. Quick-sample links come first (fewest hops,
+        most inbound links), then llms.txt links and search-index pages,
+        then sitemap entries as each sitemap file is parsed. A URL may be
+        yielded twice; the consumer (frontier_stream.FrontierStream) dedups.
+        """
+        parsed = urlparse(start_url)
+        base_url = f"{parsed.scheme}://{parsed.netloc}"
+        start_path = parsed.path.rstrip("/") or ""
+
+        sampled = {self._canonicalize(link, base_url) for link in sample_links} - {None}
+        for canon in sorted(sampled, key=lambda c: (self.link_depth.get(c, 99), -self.inbound_links.get(c, 0), c)):
+            yield self._add_link_graph(UrlRecord(url=canon, source="quick-sample"))
+
+        for link in self._llms_page_links(start_url):
+            canon = self._canonicalize(link, base_url)
+            if canon:
+                yield self._add_link_graph(UrlRecord(url=canon, source="llms.txt"))
+
+        for page in self.probe_search_index(start_url, start_html):
+            canon = self._canonicalize(page.url, base_url)
+            if canon:
+                yield self._add_link_graph(UrlRecord(url=canon, title=page.title, source="search-index"))
+
+        found = 0
+        for location in self._find_sitemap_locations(base_url):
+            for url_dict in self._iter_sitemap(location):
+                if start_path and start_path != "/" and not self._under_path(url_dict["url"], start_path):
+                    continue
+                record = self._sitemap_record(url_dict, base_url)
+                if record:
+                    found += 1
+                    yield self._add_link_graph(record)
+        print(f"  [discovery] Sitemap URLs streamed: {found}", file=sys.stderr)
+
+    def _llms_page_links(self, start_url: str) -> List[str]:
+        """HTML pages listed in llms.txt below start_url (.md files are probe_llms_txt's)."""
+        links = [
+            url for _, url in self._llms_index_links(start_url)
+            if not is_markdown_url(url) and in_scope(url, start_url)
+        ]
+        if links:
+            print(f"  [discovery] llms.txt links: {len(links)}", file=sys.stderr)
+        return links
+
+    def _sitemap_record(self, url_dict: Dict[str, str], base_url: str) -> Optional[UrlRecord]:
+        canon = self._canonicalize(url_dict["url"], base_url)
+        if not canon:
+            return None
+        return UrlRecord(
+            url=canon,
+            title=url_dict.get("title", ""),
+            source="sitemap",
+            lastmod=url_dict.get("lastmod", ""),
+            changefreq=url_dict.get("changefreq", "").lower(),
+            priority=self._parse_priority(url_dict.get("priority")),
+        )
+
+    def _add_link_graph(self, record: UrlRecord) -> UrlRecord:
+        record.depth = self.link_depth.get(record.url, -1)
+        record.inbound_links = self.inbound_links.get(record.url, 0)
+        return record
+
+    @staticmethod
+    def _under_path(url: str, start_path: str) -> bool:
+        return urlparse(url).path.rstrip("/").startswith(start_path)
+
+    # ------------------------------------------------------------------
+    # llms.txt fast path
+    # ------------------------------------------------------------------
+
+    def probe_llms_txt(self, start_url: str, max_pages: int = 500) -> List[LlmsPage]:
+        """Documentation pages published as Markdown, or [] if the site has none.
+
+        Tries llms-full.txt (split into pages), then an llms.txt index whose
+        links are mostly .md files (fetched in parallel). Only pages below
+        the start URL's directory are kept, at most *max_pages*.
+        """
+        for location in llms_locations(start_url, LLMS_FULL):
+            text = self._get_markdown(location)
+            if text is None or len(text) < MIN_CORPUS_CHARS:
+                continue
+            pages = [p for p in split_corpus(text, start_url) if in_scope(p.url, start_url)]
+            if pages:
+                print(f"  [discovery] {location}: {len(pages)} pages", file=sys.stderr)
+                return pages[:max_pages]
+
+        links = [(t, u) for t, u in self._llms_index_links(start_url) if in_scope(page_url_for(u), start_url)]
+        md_links = [(t, u) for t, u in links if is_markdown_url(u)]
+        if not md_links or len(md_links) < len(links) / 2:
+            return []
+        md_links = md_links[:max_pages]
+        print(f"  [discovery] llms.txt lists {len(md_links)} Markdown pages, fetching...", file=sys.stderr)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            texts = list(pool.map(lambda link: self._get_markdown(link[1]), md_links))
+        pages = []
+        for (title, url), text in zip(md_links, texts):
+            if not text:
+                continue
+            title = first_heading(text) or title
+            pages.append(LlmsPage(url=page_url_for(url), title=title, markdown=strip_title(text, title)))
+        return pages
+
+    def probe_markdown_source(self, urls: List[str]) -> str:
+        """Strategy serving Markdown for most sample *urls* ("accept", "suffix", "index"), or ""."""
+        sample = urls[:PROBE_PAGES]
+        for strategy in STRATEGIES:
+            served = sum(1 for url in sample if self._serves_markdown(url, strategy))
+            if probe_result(served, len(sample)):
+                print(f"  [discovery] Native Markdown: {strategy} ({served}/{len(sample)} sample pages)", file=sys.stderr)
+                return strategy
+        return ""
+
+    def _serves_markdown(self, url: str, strategy: str) -> bool:
+        if self.deadline.expired():
+            return False
+        try:
+            resp = self.session.get(source_url(url, strategy), headers=request_headers(strategy), timeout=self.timeout)
+        except requests.RequestException:
+            return False
+        content_type = resp.headers.get("Content-Type", "")
+        return resp.status_code == 200 and is_markdown_response(resp.text, content_type, strategy)
+
+    # ------------------------------------------------------------------
+    # Search index
+    # ------------------------------------------------------------------
+
+    def probe_search_index(self, start_url: str, start_html: Optional[str] = None) -> List[SearchPage]:
+        """Pages below the start URL listed in the site's search index, or [] if none is found.
+
+        The generator is detected from the start page; unknown generators
+        get the MkDocs, Sphinx and Docusaurus locations tried.
+        """
+        if self._search_pages is not None:
+            return self._search_pages
+        html = start_html if start_html is not None else (self._get_html(start_url) or "")
+        pages: List[SearchPage] = []
+        location = ""
+        for kind, location in index_locations(start_url, html):
+            text = self._get_markdown(location)
+            if not text:
+                continue
+            options = (self._get_markdown(urljoin(location, SPHINX_OPTIONS)) or "") if kind == "sphinx" else ""
+            pages = parse_search_index(kind, text, index_base(kind, location), options)
+            if pages:
+                break
+        if not pages and detect_generator(html) == "vitepress":
+            location, pages = self._vitepress_index(start_url, html)
+        self._search_pages = [p for p in pages if in_scope(p.url, start_url)]
+        if self._search_pages:
+            with_text = sum(1 for p in self._search_pages if p.markdown)
+            print(f"  [discovery] Search index {location}: {len(self._search_pages)} pages "
+                  f"({with_text} with text)", file=sys.stderr)
+        return self._search_pages
+
+    def _vitepress_index(self, start_url: str, html: str) -> Tuple[str, List[SearchPage]]:
+        """Follow the page's scripts to the local search index chunk (via the search box chunk)."""
+        scripts = deque(vitepress_script_urls(html, start_url))
+        seen: Set[str] = set()
+        while scripts and len(seen) <= MAX_VITEPRESS_SCRIPTS:
+            script = scripts.popleft()
+            if script in seen:
+                continue
+            seen.add(script)
+            index_url, box_url = vitepress_chunk_refs(self._get_markdown(script) or "", script)
+            if index_url:
+                text = self._get_markdown(index_url) or ""
+                parsed = urlparse(index_url)
+                return index_url, parse_search_index("vitepress", text, f"{parsed.scheme}://{parsed.netloc}/")
+            if box_url:
+                scripts.append(box_url)
+        return "", []
+
+    def _llms_index_links(self, start_url: str) -> List[Tuple[str, str]]:
+        if not self._llms_index_probed:
+            self._llms_index_probed = True
+            for location in llms_locations(start_url, LLMS_INDEX):
+                text = self._get_markdown(location)
+                if text:
+                    self._llms_index = (location, text)
+                    break
+        if self._llms_index is None:
+            return []
+        location, text = self._llms_index
+        return parse_index(text, location)
+
+    def _get_markdown(self, url: str) -> Optional[str]:
+        """Body of a Markdown/text file; None for errors and HTML fallbacks."""
+        if self.deadline.expired():
+            return None
+        try:
+            resp = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException:
+            return None
+        content_type = resp.headers.get("Content-Type", "")
+        if "charset" not in content_type.lower():
+            resp.encoding = "utf-8"  # requests would assume ISO-8859-1 for text/*
+        if resp.status_code != 200 or not looks_like_markdown_file(resp.text, content_type):
+            return None
+        return resp.text
+
     # ------------------------------------------------------------------
     # Sitemap discovery
     # ------------------------------------------------------------------
@@ -159,10 +455,17 @@ class DiscoveryWorker:
         return locations
 
     def _parse_sitemap(self, sitemap_url: str, depth: int = 0, _count: list = None) -> List[Dict[str, str]]:
+        return list(self._iter_sitemap(sitemap_url, depth, _count))
+
+    def _iter_sitemap(self, sitemap_url: str, depth: int = 0, _count: list = None) -> Iterator[Dict[str, str]]:
+        """Yield URL entries of a sitemap (index), each child sitemap as soon as it is parsed."""
         if _count is None:
             _count = [0]
         if depth > 3 or _count[0] >= MAX_SITEMAP_URLS:
-            return []
+            return
+        if self.deadline.expired():
+            print(f"  [discovery] Time budget reached, skipping sitemap {sitemap_url}", file=sys.stderr)
+            return
         try:
             resp = self.session.get(sitemap_url, timeout=30)
             resp.raise_for_status()
@@ -172,10 +475,9 @@ class DiscoveryWorker:
             root = ET.fromstring(content)
         except Exception as e:
             print(f"  [discovery] Failed to parse sitemap {sitemap_url}: {e}", file=sys.stderr)
-            return []
+            return
 
         ns = {"ns": "http://www.sitemaps.org/schemas/sitemap/0.9"}
-        results: List[Dict[str, str]] = []
 
         # Sitemap index?
         for sm in root.findall(".//ns:sitemap", ns):
@@ -183,22 +485,43 @@ class DiscoveryWorker:
                 break
             loc = sm.find("ns:loc", ns)
             if loc is not None and loc.text:
-                results.extend(self._parse_sitemap(loc.text.strip(), depth + 1, _count))
+                yield from self._iter_sitemap(loc.text.strip(), depth + 1, _count)
 
         # Regular URL entries
         for url_el in root.findall(".//ns:url", ns):
             if _count[0] >= MAX_SITEMAP_URLS:
                 print(f"  [discovery] Sitemap cap reached ({MAX_SITEMAP_URLS} URLs)", file=sys.stderr)
                 break
-            loc = url_el.find("ns:loc", ns)
-            if loc is not None and loc.text:
-                raw = loc.text.strip()
-                path = urlparse(raw).path.strip("/")
-                title = path.replace("/", " > ").replace("-", " ").title() if path else "Index"
-                results.append({"url": raw, "title": title})
+            entry = self._parse_url_entry(url_el, ns)
+            if entry:
                 _count[0] += 1
+                yield entry
 
-        return results
+    @staticmethod
+    def _parse_url_entry(url_el: ET.Element, ns: Dict[str, str]) -> Optional[Dict[str, str]]:
+        """Read one sitemap <url>: loc plus optional lastmod, changefreq, priority."""
+        loc = url_el.find("ns:loc", ns)
+        if loc is None or not loc.text:
+            return None
+        raw = loc.text.strip()
+        path = urlparse(raw).path.strip("/")
+        title = path.replace("/", " > ").replace("-", " ").title() if path else "Index"
+        entry = {"url": raw, "title": title}
+        for field in ("lastmod", "changefreq", "priority"):
+            el = url_el.find(f"ns:{field}", ns)
+            if el is not None and el.text and el.text.strip():
+                entry[field] = el.text.strip()
+        return entry
+
+    @staticmethod
+    def _parse_priority(value: Optional[str]) -> Optional[float]:
+        """Sitemap <priority> as a float in [0, 1]; None if missing or malformed."""
+        if not value:
+            return None
+        try:
+            return min(max(float(value), 0.0), 1.0)
+        except ValueError:
+            return None
 
     # ------------------------------------------------------------------
     # Quick-sample BFS
@@ -223,47 +546,55 @@ class DiscoveryWorker:
 
         all_links: Set[str] = set()
         visited: Set[str] = set()
-        queue: deque = deque([start_url])
+        queue: deque = deque([(start_url, 0)])
         start_html = ""
         pages_visited = 0
+        self.sample_pages = {}
 
-        while queue and pages_visited < max_pages:
-            url = queue.popleft()
+        while queue and pages_visited < max_pages and not self.deadline.expired():
+            url, depth = queue.popleft()
             canon = self._canonicalize(url, base_url)
             if not canon or canon in visited:
                 continue
             visited.add(canon)
 
-            try:
-                resp = self.session.get(url, timeout=self.timeout)
-                if resp.status_code != 200:
-                    continue
-                if "text/html" not in resp.headers.get("content-type", ""):
-                    continue
-            except Exception:
+            html = self._get_html(url)
+            if html is None:
                 continue
 
-            html = resp.text
             if pages_visited == 0:
                 start_html = html
             pages_visited += 1
+            self.sample_pages[url] = html
 
-            soup = BeautifulSoup(html, "html.parser")
-            for a in soup.find_all("a", href=True):
-                href = a.get("href", "").split("#")[0].strip()
-                if not href or href.startswith(("javascript:", "mailto:", "tel:")):
-                    continue
-                full = urljoin(url, href)
-                full_parsed = urlparse(full)
-                if full_parsed.netloc != parsed_start.netloc:
-                    continue
-                clean = f"{full_parsed.scheme}://{full_parsed.netloc}{full_parsed.path}"
+            for clean in self._page_links(html, url, parsed_start.netloc, base_url, depth):
                 all_links.add(clean)
                 if clean not in visited and self._is_navigable(clean):
-                    queue.append(clean)
+                    queue.append((clean, depth + 1))
 
         return start_html, all_links
 
+    def _get_html(self, url: str) -> Optional[str]:
+        """cURL HTML of *url*, through the fetch store; None for errors and non-HTML responses."""
+        html = self.store.get(url, EngineMode.CURL.value) if self.store else None
+        if html is not None:
+            return html
+        try:
+            resp = self.session.get(url, timeout=self.timeout)
+            if resp.status_code != 200:
+                return None
+            if "text/html" not in resp.headers.get("content-type", ""):
+                return None
+        except Exception:
+            return None
+        html = resp.text
+        if self.store is not None:
+            self.store.put(url, EngineMode.CURL.value, html, headers={
+                "etag": resp.headers.get("ETag", ""),
+                "last-modified": resp.headers.get("Last-Modified", ""),
+            })
+        return html
+
     def _quick_sample_selenium(self, start_url: str, max_pages: int = 10) -> Tuple[str, Set[str]]:
         """BFS crawl using Selenium (for SPA/client-rendered sites)."""
         parsed_start = urlparse(start_url)
@@ -271,87 +602,83 @@ class DiscoveryWorker:
 
         all_links: Set[str] = set()
         visited: Set[str] = set()
-        queue: deque = deque([start_url])
+        queue: deque = deque([(start_url, 0)])
         start_html = ""
         pages_visited = 0
+        self.sample_pages = {}
 
-        driver = self._get_driver()
-        if not driver:
-            print(f"  [discovery] Selenium driver init failed, falling back to cURL", file=sys.stderr)
-            return self._quick_sample_curl(start_url, max_pages)
+        driver = None
 
-        try:
-            while queue and pages_visited < max_pages:
-                url = queue.popleft()
+        # The browser session is borrowed from the process-wide broker and returned on exit
+        with ExitStack() as session:
+            while queue and pages_visited < max_pages and not self.deadline.expired():
+                url, depth = queue.popleft()
                 canon = self._canonicalize(url, base_url)
                 if not canon or canon in visited:
                     continue
                 visited.add(canon)
 
-                try:
-                    driver.get(url)
-                    WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located((By.TAG_NAME, "body"))
-                    )
-                    # Wait a bit for SPA hydration
-                    import time
-                    time.sleep(1)
-                except Exception:
-                    continue
+                html = self.store.get(url, EngineMode.SELENIUM.value) if self.store else None
+                if html is None:
+                    # Start the browser only once a page is not in the store
+                    if driver is None:
+                        driver = self._get_driver(session)
+                        if not driver:
+                            print(f"  [discovery] Selenium driver init failed, falling back to cURL", file=sys.stderr)
+                            return self._quick_sample_curl(start_url, max_pages)
+                    try:
+                        driver.get(url)
+                        # SPA hydration: wait for links, DOM and network to settle
+                        wait_until_ready(driver, "a[href]")
+                    except Exception:
+                        continue
+                    html = driver.page_source
+                    if self.store is not None:
+                        self.store.put(url, EngineMode.SELENIUM.value, html)
 
-                html = driver.page_source
                 if pages_visited == 0:
                     start_html = html
                 pages_visited += 1
+                self.sample_pages[url] = html
 
-                soup = BeautifulSoup(html, "html.parser")
-                for a in soup.find_all("a", href=True):
-                    href = a.get("href", "").split("#")[0].strip()
-                    if not href or href.startswith(("javascript:", "mailto:", "tel:")):
-                        continue
-                    full = urljoin(url, href)
-                    full_parsed = urlparse(full)
-                    if full_parsed.netloc != parsed_start.netloc:
-                        continue
-                    clean = f"{full_parsed.scheme}://{full_parsed.netloc}{full_parsed.path}"
+                for clean in self._page_links(html, url, parsed_start.netloc, base_url, depth):
                     all_links.add(clean)
                     if clean not in visited and self._is_navigable(clean):
-                        queue.append(clean)
-        finally:
-            self._close_driver()
+                        queue.append((clean, depth + 1))
 
         return start_html, all_links
 
-    def _get_driver(self):
-        """Create or return existing Selenium WebDriver."""
-        if self._driver:
-            return self._driver
+    def _page_links(self, html: str, page_url: str, netloc: str, base_url: str, depth: int) -> List[str]:
+        """Same-host links on a sampled page; records link depth and inbound counts."""
+        links: List[str] = []
+        soup = BeautifulSoup(html, "html.parser")
+        for a in soup.find_all("a", href=True):
+            href = a.get("href", "").split("#")[0].strip()
+            if not href or href.startswith(("javascript:", "mailto:", "tel:")):
+                continue
+            full = urljoin(page_url, href)
+            full_parsed = urlparse(full)
+            if full_parsed.netloc != netloc:
+                continue
+            links.append(f"{full_parsed.scheme}://{full_parsed.netloc}{full_parsed.path}")
+
+        # Each linking page counts once per target
+        for target in {self._canonicalize(link, base_url) for link in links} - {None}:
+            self.inbound_links[target] += 1
+            if target not in self.link_depth or self.link_depth[target] > depth + 1:
+                self.link_depth[target] = depth + 1
+        return links
+
+    def _get_driver(self, session: ExitStack):
+        """Borrow a WebDriver from the shared broker for the lifetime of *session*."""
         if not SELENIUM_AVAILABLE:
             return None
         try:
-            opts = ChromeOptions()
-            opts.add_argument("--headless=new")
-            opts.add_argument("--disable-gpu")
-            opts.add_argument("--no-sandbox")
-            opts.add_argument("--disable-dev-shm-usage")
-            opts.add_argument("--window-size=1920,1080")
-            service = ChromeService(ChromeDriverManager().install())
-            self._driver = webdriver.Chrome(service=service, options=opts)
-            self._driver.set_page_load_timeout(30)
-            return self._driver
+            return session.enter_context(broker.session(self.blocked_urls))
         except Exception as e:
             print(f"  [discovery] Failed to create Selenium driver: {e}", file=sys.stderr)
             return None
 
-    def _close_driver(self):
-        """Close Selenium WebDriver if open."""
-        if self._driver:
-            try:
-                self._driver.quit()
-            except Exception:
-                pass
-            self._driver = None
-
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
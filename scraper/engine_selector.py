@@ -2,31 +2,83 @@
 
 Fetches the start URL with both engines, converts to markdown preview,
 and compares length/headings/code blocks to decide which engine to use.
+
+When Selenium wins but the cURL start page already has real content, the
+site is treated as mixed static/JS and gets HYBRID mode: the crawler
+fetches every page over HTTP and renders only pages is_thin_page() flags.
+
+When Selenium wins and the cURL page embeds a hydration payload (Next.js,
+Nuxt, Gatsby) holding most of the rendered content, the site gets
+HYDRATION mode: HTTP speed, content rendered from the payload.
+
+With a time budget nearly used up the Selenium probe (Chrome start-up
+plus a rendered page load) is skipped and cURL is kept.
 """
 import re
 import sys
-from typing import Optional
+from typing import Callable, NamedTuple, Optional, Sequence
 
 import requests
 from bs4 import BeautifulSoup
 from markdownify import markdownify as md
 
-from models import EngineDecision, EngineMode
+from browser import blocked_url_patterns, broker, wait_until_ready
+from deadline import Deadline
+from fetch_store import FetchStore
+from hydration import attach_page_data, document_markdown, gatsby_page_data_url, hydrate
+from models import EngineDecision, EngineMode, ResourceBlocklist
 
 SELENIUM_AVAILABLE = False
 try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options as ChromeOptions
-    from selenium.webdriver.chrome.service import Service as ChromeService
-    from webdriver_manager.chrome import ChromeDriverManager
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    from selenium.webdriver.common.by import By
+    import selenium  # noqa: F401
     SELENIUM_AVAILABLE = True
 except ImportError:
     pass
 
 
+# Per-page thinness (HYBRID escalation): markdown shorter than this, or no
+# headings / code blocks and fewer internal links than this
+THIN_MIN_MD_CHARS = 400
+THIN_MIN_LINKS = 5
+# HYDRATION is chosen when the payload yields this share of the rendered markdown
+HYDRATION_MIN_SHARE = 0.5
+# Below this much time budget the Selenium probe is skipped
+MIN_SELENIUM_PROBE_SECONDS = 30
+# cURL probe timeout without a time budget
+CURL_TIMEOUT_S = 30
+
+
+class PageMetrics(NamedTuple):
+    md_length: int
+    headings: int
+    code_blocks: int
+    links: int
+
+
+def page_metrics(html: Optional[str], url: str) -> PageMetrics:
+    """Markdown-preview length, headings, code blocks and internal links of a page."""
+    if not html:
+        return PageMetrics(0, 0, 0, 0)
+    preview = _html_to_md_preview(html)
+    return PageMetrics(
+        md_length=len(preview),
+        headings=_count_headings(preview),
+        code_blocks=_count_code_blocks(preview),
+        links=_count_internal_links(html, url),
+    )
+
+
+def is_thin(metrics: PageMetrics) -> bool:
+    """True for stubs and unrendered SPA shells."""
+    if metrics.md_length < THIN_MIN_MD_CHARS:
+        return True
+    return metrics.headings == 0 and metrics.code_blocks == 0 and metrics.links < THIN_MIN_LINKS
+
+
+def is_thin_page(html: Optional[str], url: str) -> bool:
+    return is_thin(page_metrics(html, url))
+
+
 def _strip_boilerplate(html: str) -> str:
     soup = BeautifulSoup(html, "html.parser")
     for tag in soup(["script", "style", "noscript", "iframe", "svg"]):
@@ -37,6 +89,9 @@ def _strip_boilerplate(html: str) -> str:
 
 
 def _html_to_md_preview(html: str) -> str:
+    passthrough = document_markdown(html)
+    if passthrough is not None:
+        return passthrough
     clean = _strip_boilerplate(html)
     return md(clean, heading_style="ATX", code_language_callback=lambda el: "")
 
@@ -66,7 +121,7 @@ def _count_internal_links(html: str, start_url: str) -> int:
     return count
 
 
-def _fetch_curl(url: str, timeout: int = 30) -> Optional[str]:
+def _fetch_curl(url: str, timeout: float = CURL_TIMEOUT_S) -> Optional[str]:
     try:
         resp = requests.get(url, timeout=timeout, headers={
             "User-Agent": "Mozilla/5.0 (compatible; AnyDocsMCP/2.0)"
@@ -78,91 +133,103 @@ def _fetch_curl(url: str, timeout: int = 30) -> Optional[str]:
         return None
 
 
-def _fetch_selenium(url: str, timeout: int = 30) -> Optional[str]:
+def _fetch_selenium(url: str, blocked_urls: Sequence[str] = ()) -> Optional[str]:
     if not SELENIUM_AVAILABLE:
         return None
-    driver = None
     try:
-        opts = ChromeOptions()
-        opts.add_argument("--headless=new")
-        opts.add_argument("--disable-gpu")
-        opts.add_argument("--no-sandbox")
-        opts.add_argument("--disable-dev-shm-usage")
-        opts.add_argument("--window-size=1920,1080")
-        service = ChromeService(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=opts)
-        driver.set_page_load_timeout(timeout)
-        driver.get(url)
-        # Wait for body first, then give SPA time to hydrate
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.TAG_NAME, "body"))
-        )
-        # Wait up to 5s for at least one anchor link to appear (SPA hydration)
-        try:
-            WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "a[href]"))
-            )
-        except Exception:
-            pass
-        import time
-        time.sleep(1)
-        return driver.page_source
+        # Session from the process-wide browser broker: discovery and the crawl reuse it
+        with broker.session(blocked_urls) as driver:
+            driver.get(url)
+            # SPA hydration: wait for links, DOM and network to settle
+            wait_until_ready(driver, "a[href]")
+            return driver.page_source
     except Exception as e:
         print(f"  [engine-selector] Selenium fetch failed: {e}", file=sys.stderr)
         return None
-    finally:
-        if driver:
-            try:
-                driver.quit()
-            except Exception:
-                pass
 
 
-def select_engine(start_url: str, threshold: float = 0.3) -> EngineDecision:
+def _hydrated_start_page(
+    curl_html: Optional[str], start_url: str, store: Optional[FetchStore],
+) -> Optional[str]:
+    """Start page rendered from its hydration payload (fetching Gatsby page-data), or None."""
+    if not curl_html:
+        return None
+    data_url = gatsby_page_data_url(curl_html, start_url)
+    if data_url:
+        page_data = _fetch_curl(data_url)
+        if page_data:
+            curl_html = attach_page_data(curl_html, page_data)
+            if store is not None:
+                store.put(start_url, EngineMode.CURL.value, curl_html)
+    return hydrate(curl_html, start_url)
+
+
+def _fetch_stored(
+    fetch: Callable[[str], Optional[str]], url: str, mode: EngineMode,
+    store: Optional[FetchStore],
+) -> Optional[str]:
+    """Fetch url with *fetch*, reading from / writing to the run's fetch store."""
+    if store is not None:
+        html = store.get(url, mode.value)
+        if html is not None:
+            return html
+    html = fetch(url)
+    if html and store is not None:
+        store.put(url, mode.value, html)
+    return html
+
+
+def select_engine(
+    start_url: str, threshold: float = 0.3, store: Optional[FetchStore] = None,
+    blocklist: Optional[ResourceBlocklist] = None, deadline: Optional[Deadline] = None,
+) -> EngineDecision:
     """Compare cURL vs Selenium output and decide which engine to use.
 
     Decision rule (v1 heuristic):
     - If Selenium produces significantly more content (headings, code blocks, length),
       choose Selenium.
     - Otherwise default to cURL (faster, lighter).
+
+    Both fetched start pages are kept in *store* for discovery and crawling.
+    *blocklist* (default: ResourceBlocklist()) limits what Chrome downloads.
+    *deadline* caps the cURL timeout and skips Selenium when little time is left.
     """
+    deadline = deadline or Deadline()
     print(f"  [engine-selector] Testing cURL...", file=sys.stderr)
-    curl_html = _fetch_curl(start_url)
-    curl_md = _html_to_md_preview(curl_html) if curl_html else ""
-    curl_headings = _count_headings(curl_md)
-    curl_code = _count_code_blocks(curl_md)
-    curl_links = _count_internal_links(curl_html, start_url) if curl_html else 0
-
-    sel_md = ""
-    sel_headings = 0
-    sel_code = 0
-    sel_links = 0
+    timeout = max(min(CURL_TIMEOUT_S, deadline.remaining()), 1.0)
+    curl_html = _fetch_stored(lambda u: _fetch_curl(u, timeout), start_url, EngineMode.CURL, store)
+    curl = page_metrics(curl_html, start_url)
 
+    if SELENIUM_AVAILABLE and deadline.remaining() < MIN_SELENIUM_PROBE_SECONDS:
+        print(f"  [engine-selector] {deadline.remaining():.0f}s of time budget left — skipping Selenium", file=sys.stderr)
+        return EngineDecision(
+            mode=EngineMode.CURL,
+            curl_md_length=curl.md_length,
+            reason="Selenium probe skipped: time budget",
+        )
     if SELENIUM_AVAILABLE:
         print(f"  [engine-selector] Testing Selenium...", file=sys.stderr)
-        sel_html = _fetch_selenium(start_url)
-        sel_md = _html_to_md_preview(sel_html) if sel_html else ""
-        sel_headings = _count_headings(sel_md)
-        sel_code = _count_code_blocks(sel_md)
-        sel_links = _count_internal_links(sel_html, start_url) if sel_html else 0
+        blocked = blocked_url_patterns(blocklist or ResourceBlocklist())
+        sel_html = _fetch_stored(lambda u: _fetch_selenium(u, blocked), start_url, EngineMode.SELENIUM, store)
+        sel = page_metrics(sel_html, start_url)
     else:
         print(f"  [engine-selector] Selenium not available, defaulting to cURL", file=sys.stderr)
         return EngineDecision(
             mode=EngineMode.CURL,
-            curl_md_length=len(curl_md),
+            curl_md_length=curl.md_length,
             reason="Selenium not installed"
         )
 
-    max_len = max(len(curl_md), len(sel_md), 1)
-    diff_ratio = abs(len(sel_md) - len(curl_md)) / max_len
+    max_len = max(curl.md_length, sel.md_length, 1)
+    diff_ratio = abs(sel.md_length - curl.md_length) / max_len
 
-    heading_diff = sel_headings - curl_headings
-    code_diff = sel_code - curl_code
+    heading_diff = sel.headings - curl.headings
+    code_diff = sel.code_blocks - curl.code_blocks
 
     choose_selenium = False
     reasons = []
 
-    if diff_ratio > threshold and len(sel_md) > len(curl_md):
+    if diff_ratio > threshold and sel.md_length > curl.md_length:
         choose_selenium = True
         reasons.append(f"content length diff {diff_ratio:.1%} > {threshold:.0%}")
 
@@ -175,21 +242,30 @@ def select_engine(start_url: str, threshold: float = 0.3) -> EngineDecision:
         reasons.append(f"Selenium has {code_diff} more code blocks")
 
     # SPA detection: cURL has very few links but Selenium has many
-    if curl_links < 5 and sel_links > 10:
+    if curl.links < 5 and sel.links > 10:
         choose_selenium = True
-        reasons.append(f"SPA detected: cURL {curl_links} links vs Selenium {sel_links} links")
+        reasons.append(f"SPA detected: cURL {curl.links} links vs Selenium {sel.links} links")
 
     mode = EngineMode.SELENIUM if choose_selenium else EngineMode.CURL
+    hydrated = page_metrics(_hydrated_start_page(curl_html, start_url, store), start_url) if choose_selenium else None
+    if hydrated and hydrated.md_length >= max(THIN_MIN_MD_CHARS, HYDRATION_MIN_SHARE * sel.md_length):
+        # The content is already in the HTML, just not in the DOM: no browser needed
+        mode = EngineMode.HYDRATION
+        reasons.append(f"hydration payload has {hydrated.md_length} of {sel.md_length} rendered chars")
+    elif choose_selenium and not is_thin(curl) and curl.links >= THIN_MIN_LINKS:
+        # Server-rendered content and navigation exist: render only the pages that need it
+        mode = EngineMode.HYBRID
+        reasons.append("cURL start page has content, rendering thin pages only")
     reason = "; ".join(reasons) if reasons else "cURL content sufficient"
 
     decision = EngineDecision(
         mode=mode,
-        curl_md_length=len(curl_md),
-        selenium_md_length=len(sel_md),
-        curl_headings=curl_headings,
-        selenium_headings=sel_headings,
-        curl_code_blocks=curl_code,
-        selenium_code_blocks=sel_code,
+        curl_md_length=curl.md_length,
+        selenium_md_length=sel.md_length,
+        curl_headings=curl.headings,
+        selenium_headings=sel.headings,
+        curl_code_blocks=curl.code_blocks,
+        selenium_code_blocks=sel.code_blocks,
         diff_ratio=diff_ratio,
         reason=reason,
     )
@@ -0,0 +1,296 @@
+"""Page extraction — HTML → cleaned Markdown → 1:1 file + ManifestEntry.
+
+Pure CPU work (BeautifulSoup parse, selector extraction, markdownify,
+ContentCleaner), split out of the crawler so it can run in a process pool
+while fetching stays in threads or on the event loop.
+
+With ``hydrate=True`` (HYDRATION mode) a page carrying a framework
+hydration payload is first rendered from that payload (see hydration.py).
+Documents wrapping Markdown (hydration.markdown_document: native .md
+sources, Markdown payloads) skip HTML conversion and get a light clean.
+
+Process-pool usage:
+    ProcessPoolExecutor(initializer=init_worker, initargs=(spec, raw_dir, hydrate))
+    pool.submit(extract_page, record, html)
+
+Each worker process builds its PageExtractor (SelectorSpec + ContentCleaner)
+once in init_worker and reuses it for every page.
+"""
+import hashlib
+import re
+from copy import copy
+from pathlib import Path
+from typing import Optional, Tuple
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+from markdownify import markdownify as md
+
+from content_cleaner import ContentCleaner
+from hydration import document_markdown, document_title, hydrate as hydrate_payload
+from models import ManifestEntry, SelectorSpec, UrlRecord
+
+
+class PageExtractor:
+    def __init__(self, selector_spec: SelectorSpec, raw_dir: str, hydrate: bool = False):
+        self.selector_spec = selector_spec
+        self.raw_dir = Path(raw_dir)
+        self.hydrate = hydrate
+        self.cleaner = ContentCleaner()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def process(self, record: UrlRecord, html: str, previous_hash: str = "") -> Optional[ManifestEntry]:
+        """Extract, convert and write one fetched page.
+
+        Returns None when the page yields no usable content. When the result
+        hashes to *previous_hash* and the file exists, it is left untouched
+        (incremental runs keep last run's deduplicated file).
+        """
+        html, passthrough = self._prepare(html, record.url)
+        if passthrough is not None:
+            markdown = self.cleaner.clean_source(passthrough)
+            title = document_title(html)[:200] or record.title or "Untitled"
+        else:
+            soup = BeautifulSoup(html, "html.parser")
+            markdown = self._extract_and_convert(soup)
+            title = self._extract_title(soup, record.title)
+        if not markdown or len(markdown.strip()) < 20:
+            return None
+        return self.write_page(record, title, markdown, previous_hash)
+
+    def convert(self, html: str, url: str = "") -> str:
+        """Cleaned Markdown of a page without writing it (selector scoring)."""
+        html, passthrough = self._prepare(html, url)
+        if passthrough is not None:
+            return self.cleaner.clean_source(passthrough)
+        return self._extract_and_convert(BeautifulSoup(html, "html.parser"))
+
+    def write_page(self, record: UrlRecord, title: str, markdown: str, previous_hash: str = "") -> ManifestEntry:
+        """Write already-converted Markdown as the page file for *record*."""
+        # Build output path from URL path
+        rel_path = self._url_to_filepath(record.url)
+        out_path = self.raw_dir / rel_path
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write file (skipped when unchanged since the previous run)
+        content = f"# {title}\n\n**Source:** {record.url}\n\n{markdown}\n"
+        content_hash = hashlib.md5(content.encode("utf-8")).hexdigest()
+        if content_hash != previous_hash or not out_path.exists():
+            out_path.write_text(content, encoding="utf-8")
+
+        # Build manifest entry
+        headings = re.findall(r"^(#{1,6}\s+.+)$", markdown, re.MULTILINE)
+
+        return ManifestEntry(
+            url=record.url,
+            md_raw_path=str(rel_path),
+            size_bytes=len(content.encode("utf-8")),
+            headings=[h.strip() for h in headings[:20]],
+            content_hash=content_hash,
+            lastmod=record.lastmod,
+        )
+
+    # ------------------------------------------------------------------
+    # Extract & Convert
+    # ------------------------------------------------------------------
+
+    def _prepare(self, html: str, url: str) -> Tuple[str, Optional[str]]:
+        """(document, its wrapped Markdown or None), rendered from the hydration payload if enabled.
+
+        Markdown fetched as-is (native source or hydration payload) skips
+        BeautifulSoup and markdownify entirely.
+        """
+        passthrough = document_markdown(html)
+        if passthrough is None and self.hydrate:
+            html = hydrate_payload(html, url) or html
+            passthrough = document_markdown(html)
+        return html, passthrough
+
+    def _extract_and_convert(self, soup: BeautifulSoup) -> str:
+        # Find main content
+        content_el = None
+        selector = self.selector_spec.content_selector
+        try:
+            content_el = soup.select_one(selector)
+        except Exception:
+            pass
+
+        if not content_el:
+            for fallback in ["main", "article", ".content", "#content", "body"]:
+                try:
+                    content_el = soup.select_one(fallback)
+                    if content_el:
+                        break
+                except Exception:
+                    continue
+
+        if not content_el:
+            return ""
+
+        # Clone to avoid mutating original
+        content_copy = copy(content_el)
+
+        # Prune unwanted elements
+        for prune_sel in self.selector_spec.prune_selectors:
+            try:
+                for el in content_copy.select(prune_sel):
+                    el.decompose()
+            except Exception:
+                continue
+
+        # Also prune common UI elements that often leak through
+        for generic_sel in ["script", "style", "noscript", "iframe", "aside",
+                            "button[aria-label*='copy']", "button[aria-label*='Copy']",
+                            ".copy-button", ".clipboard-button"]:
+            try:
+                for el in content_copy.select(generic_sel):
+                    el.decompose()
+            except Exception:
+                continue
+
+        # Generic sidebar detection: remove fixed/sticky elements with many links
+        self._prune_sidebar_elements(content_copy)
+
+        # Pre-process code blocks to preserve newlines
+        self._preprocess_code_blocks(content_copy)
+
+        # Convert to markdown
+        markdown = md(
+            str(content_copy),
+            heading_style="ATX",
+            code_language_callback=lambda el: (
+                el.get("class", [""])[0].replace("language-", "")
+                if el.get("class") else ""
+            ),
+        )
+
+        # Clean
+        markdown = self.cleaner.clean(markdown)
+        return markdown.strip()
+
+    @staticmethod
+    def _prune_sidebar_elements(soup_el):
+        """Generically detect and remove sidebar navigation inside content.
+
+        Heuristics:
+        1. Elements with fixed/sticky positioning + many links = sidebar nav
+        2. Direct children of content with nav-like classes + many links
+        """
+        MIN_LINKS_FOR_SIDEBAR = 8
+
+        for el in list(soup_el.find_all(recursive=False)):
+            classes = " ".join(el.get("class", []))
+            style = el.get("style", "")
+
+            # Check for fixed/sticky positioning (via class or style)
+            is_fixed = any(kw in classes for kw in ["fixed", "sticky"]) or \
+                       any(kw in style for kw in ["position: fixed", "position: sticky"])
+
+            # Check for nav-like class names
+            is_nav_like = any(kw in classes.lower() for kw in [
+                "sidebar", "sidenav", "side-nav", "toc", "table-of-contents",
+                "navigation", "nav-menu", "menu-panel",
+            ])
+
+            if is_fixed or is_nav_like:
+                link_count = len(el.find_all("a"))
+                if link_count >= MIN_LINKS_FOR_SIDEBAR:
+                    el.decompose()
+
+    @staticmethod
+    def _preprocess_code_blocks(soup_el):
+        """Fix code blocks before markdownify conversion.
+
+        markdownify often concatenates lines inside <pre>/<code> blocks.
+        Common patterns handled:
+        - Shiki: <pre><code><span class="line">...</span></code></pre>
+        - Highlight.js: <pre><code><span>line1</span><br>...</code></pre>
+        - Generic: <pre><div>line</div>...</pre>
+        """
+        from bs4 import NavigableString, Tag
+
+        for pre in soup_el.find_all("pre"):
+            # Strategy 1: Shiki-style — span.line elements represent code lines
+            line_spans = pre.find_all("span", class_=lambda c: c and isinstance(c, list) and "line" in c)
+            if not line_spans:
+                # Also try string match for class attribute
+                line_spans = [s for s in pre.find_all("span") if s.get("class") and "line" in s.get("class", [])]
+
+            if line_spans:
+                for span in line_spans:
+                    span.append(NavigableString("\n"))
+                    span.unwrap()
+                # Unwrap remaining styling spans
+                for span in list(pre.find_all("span")):
+                    span.unwrap()
+                continue
+
+            # Strategy 2: <br> tags as line separators
+            for br in pre.find_all("br"):
+                br.replace_with(NavigableString("\n"))
+
+            # Strategy 3: Block elements inside pre (div, p)
+            for tag_name in ["div", "p", "li"]:
+                for el in pre.find_all(tag_name):
+                    el.insert_before(NavigableString("\n"))
+                    el.unwrap()
+
+            # Unwrap remaining inline elements (spans) inside pre
+            for span in list(pre.find_all("span")):
+                span.unwrap()
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _url_to_filepath(url: str) -> str:
+        parsed = urlparse(url)
+        path = parsed.path.strip("/")
+        if not path:
+            path = "index"
+        # Remove file extension if present
+        if path.endswith(".html") or path.endswith(".htm"):
+            path = path.rsplit(".", 1)[0]
+        # Sanitize
+        path = re.sub(r"[^\w/\-.]", "_", path)
+        return path + ".md"
+
+    @staticmethod
+    def _extract_title(soup: BeautifulSoup, fallback: str) -> str:
+        h1 = soup.select_one("h1")
+        if h1:
+            return h1.get_text(strip=True)[:200]
+        title_tag = soup.find("title")
+        if title_tag:
+            return title_tag.get_text(strip=True)[:200]
+        return fallback or "Untitled"
+
+
+# ----------------------------------------------------------------------
+# Process-pool worker entry points
+# ----------------------------------------------------------------------
+
+_worker_extractor: Optional[PageExtractor] = None
+
+
+def init_worker(selector_spec: SelectorSpec, raw_dir: str, hydrate: bool = False) -> None:
+    """ProcessPoolExecutor initializer: build the per-process extractor once."""
+    global _worker_extractor
+    _worker_extractor = PageExtractor(selector_spec, raw_dir, hydrate)
+
+
+def extract_page(
+    record: UrlRecord, html: str, previous_hash: str = "", selector_spec: Optional[SelectorSpec] = None,
+) -> Optional[ManifestEntry]:
+    """Run PageExtractor.process in a worker set up by init_worker.
+
+    *selector_spec* replaces the worker's selectors (after a mid-crawl switch).
+    """
+    global _worker_extractor
+    if selector_spec is not None and selector_spec != _worker_extractor.selector_spec:
+        _worker_extractor = PageExtractor(selector_spec, str(_worker_extractor.raw_dir), _worker_extractor.hydrate)
+    return _worker_extractor.process(record, html, previous_hash)
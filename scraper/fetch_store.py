@@ -0,0 +1,89 @@
+"""Run-scoped fetch store — every stage of one pipeline run reads fetched pages from here.
+
+The engine probe, discovery quick-sample, sample crawl, full crawl and
+quality-retry crawl all request overlapping URLs. Each fetched HTML page
+is stored once (gzip on disk, keyed by engine + canonical URL) so later
+stages only re-run extraction instead of hitting the origin again.
+
+Pages fetched by cURL and by Selenium are kept apart: rendered HTML is
+not interchangeable with the raw server response.
+"""
+import gzip
+import hashlib
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlparse, urlunparse
+
+
+class FetchStore:
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._index: Dict[str, Path] = {}
+        self._headers: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, url: str, engine: str) -> Optional[str]:
+        """Return stored HTML for url as fetched by engine, or None."""
+        key = self._key(url, engine)
+        with self._lock:
+            path = self._index.get(key)
+            if path is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        try:
+            return gzip.decompress(path.read_bytes()).decode("utf-8")
+        except OSError:
+            return None
+
+    def put(self, url: str, engine: str, html: str, headers: Optional[Dict[str, str]] = None):
+        """Store html; *headers* keeps response validators (ETag, Last-Modified)."""
+        key = self._key(url, engine)
+        path = self.cache_dir / engine / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.html.gz"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(gzip.compress(html.encode("utf-8"), compresslevel=1))
+        with self._lock:
+            self._index[key] = path
+            if headers:
+                self._headers[key] = dict(headers)
+
+    def headers(self, url: str, engine: str) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._headers.get(self._key(url, engine), {}))
+
+    def __contains__(self, item) -> bool:
+        url, engine = item
+        with self._lock:
+            return self._key(url, engine) in self._index
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._index)
+
+    def clear(self):
+        """Drop all stored pages and remove the cache directory."""
+        with self._lock:
+            self._index.clear()
+            self._headers.clear()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _key(url: str, engine: str) -> str:
+        """Canonical store key: drop fragment and trailing slash."""
+        parsed = urlparse(url)
+        path = parsed.path.rstrip("/") or "/"
+        canon = urlunparse((parsed.scheme, parsed.netloc, path, "", parsed.query, ""))
+        return f"{engine}|{canon}"
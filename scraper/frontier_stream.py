@@ -0,0 +1,126 @@
+"""Frontier stream — discovery feeds the crawler while it is still running.
+
+With stream_discovery on, DiscoveryWorker.stream_records is a producer:
+quick-sample links, llms.txt links and search-index pages come first,
+then sitemap entries as each sitemap file is parsed. A producer thread
+puts them into a FrontierStream; Crawler.crawl consumes it directly, so
+the first page is crawled before the last sitemap is read.
+
+  put()   dedup by URL; blocks while the bounded queue is full
+  get()   next record passing accept (scope rules, locale), in order;
+          None once the producer closed the stream or the limit is hit
+
+The queue bound is the backpressure: a slow crawl pauses sitemap parsing
+instead of holding every discovered URL in memory twice. Streamed URLs
+are crawled in discovery order, not scheduler.prioritize order; the
+max_pages cap keeps the first URLs accepted.
+"""
+import queue
+import re
+import threading
+from typing import Callable, List, Optional
+from urllib.parse import urlparse
+
+from models import UrlRecord
+
+STREAM_QUEUE_SIZE = 256
+STREAM_POLL_S = 0.1  # how often a waiting side re-checks for cancel / new records
+
+# Locale path prefix: /en/, /ja/, /zh-hans/, /pt-br/, /en-us/, ...
+LOCALE_RE = re.compile(r"^/([a-z]{2}(?:-[a-z]{2,8})?)/", re.IGNORECASE)
+
+_DONE = object()
+
+
+def url_locale(url: str) -> Optional[str]:
+    """Locale prefix of *url*'s path (lowercase), or None."""
+    m = LOCALE_RE.match(urlparse(url).path)
+    return m.group(1).lower() if m else None
+
+
+def same_locale(start_url: str) -> Callable[[UrlRecord], bool]:
+    """On-the-fly locale filter: drop URLs under another locale prefix than *start_url*.
+
+    The batch filter (Pipeline._filter_locale_duplicates) first checks
+    that several locales are really present; a stream cannot wait for
+    that, so any other locale prefix is dropped as soon as it is seen.
+    """
+    start_locale = url_locale(start_url)
+    if start_locale is None:
+        return lambda record: True
+    return lambda record: url_locale(record.url) in (None, start_locale)
+
+
+class FrontierStream:
+    def __init__(self, maxsize: int = STREAM_QUEUE_SIZE, limit: int = 0):
+        self._queue: queue.Queue = queue.Queue(maxsize)
+        self._seen: set = set()
+        self._cancelled = threading.Event()
+        self.limit = limit
+        # Set by the consumer once scope rules are known; applied on get()
+        self.accept: Callable[[UrlRecord], bool] = lambda record: True
+        self.discovered: List[UrlRecord] = []  # every unique record put, in order
+        self.records: List[UrlRecord] = []     # records handed to the consumer, in order
+        self.dropped = 0
+        self.done = False
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def put(self, record: UrlRecord) -> bool:
+        """Queue *record* unless its URL was seen. False once the consumer cancelled."""
+        if record.url in self._seen:
+            return not self._cancelled.is_set()
+        self._seen.add(record.url)
+        self.discovered.append(record)
+        return self._put(record)
+
+    def close(self):
+        """No more records; the consumer finishes what is queued."""
+        self._put(_DONE)
+
+    def _put(self, item) -> bool:
+        while not self._cancelled.is_set():
+            try:
+                self._queue.put(item, timeout=STREAM_POLL_S)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+
+    def get(self, timeout: Optional[float] = None) -> Optional[UrlRecord]:
+        """Next accepted record; None when the stream is done.
+
+        Raises queue.Empty if nothing arrived within *timeout* (0 = don't wait).
+        """
+        while not self.done:
+            if self.limit and len(self.records) >= self.limit:
+                self.cancel()
+                break
+            item = self._queue.get(block=timeout != 0, timeout=timeout or None)
+            if item is _DONE:
+                self.done = True
+                break
+            if not self.accept(item):
+                self.dropped += 1
+                continue
+            self.records.append(item)
+            return item
+        return None
+
+    def cancel(self):
+        """Stop early (limit, time budget): the producer's next put() returns False."""
+        self.done = True
+        self._cancelled.set()
+
+    def __iter__(self):
+        while True:
+            record = self.get()
+            if record is None:
+                return
+            yield record
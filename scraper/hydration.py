@@ -0,0 +1,358 @@
+"""Browser-free extraction from embedded hydration payloads (HYDRATION mode).
+
+Many SPA frameworks ship the page content in the initial HTML as JSON so
+the client can hydrate without a second request:
+
+  Next.js     <script id="__NEXT_DATA__" type="application/json">
+  Nuxt 3      <script id="__NUXT_DATA__" type="application/json">  (devalue)
+  Nuxt 2      window.__NUXT__ = {...}          (only when plain JSON)
+  Gatsby      /page-data/<path>/page-data.json (fetched by the crawler and
+              attached with attach_page_data())
+
+hydrate() finds the payload, picks its largest content value and turns it
+into a small HTML document for PageExtractor:
+
+  HTML fragments           → <main>fragment</main>
+  Portable Text / Contentful rich text blocks → rendered to HTML
+  compiled MDX (next-mdx-remote compiledSource) → headings/paragraphs/code
+  Markdown / MDX source    → passed through verbatim in a
+                             <script type="text/markdown"> element, read
+                             back by document_markdown()
+"""
+import html as html_lib
+import json
+import re
+from typing import Any, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+
+MARKDOWN_SCRIPT_ID = "anydocs-markdown"
+PAGE_DATA_SCRIPT_ID = "anydocs-page-data"
+MIN_CONTENT_CHARS = 200
+
+# Payload keys whose string values hold page source (Markdown/MDX)
+MARKDOWN_KEYS = {
+    "markdown", "md", "mdx", "rawmarkdown", "rawmarkdownbody", "body",
+    "content", "source", "raw", "rawbody", "text",
+}
+TITLE_KEYS = ("title", "pageTitle", "headline")
+
+_HTML_BLOCK_RE = re.compile(r"<(p|h[1-6]|pre|ul|ol|table|section|article|div|blockquote)[\s>]", re.I)
+_MD_SIGNAL_RE = re.compile(r"^(#{1,6}\s|```|\s*[-*]\s|\d+\.\s)", re.M)
+_MDX_ESM_RE = re.compile(r"^(import|export)\s.*$", re.M)
+_MDX_JSX_LINE_RE = re.compile(r"^\s*<[A-Z][\w.]*(\s[^>]*)?/?>\s*$|^\s*</[A-Z][\w.]*>\s*$", re.M)
+_MARKDOWN_SCRIPT_RE = re.compile(rf'<script[^>]*\bid="{MARKDOWN_SCRIPT_ID}"[^>]*>(.*?)</script>', re.S)
+_MDX_JSX_CALL_RE = re.compile(
+    r'_components\.(h[1-6]|p|li|code|pre|td|th)\b\s*,\s*\{[^{}]*?children:\s*"((?:[^"\\]|\\.)*)"')
+
+_DEVALUE_WRAPPERS = {"Reactive", "ShallowReactive", "Ref", "ShallowRef", "EmptyRef", "EmptyShallowRef", "NuxtError"}
+
+
+# ------------------------------------------------------------------
+# Public API
+# ------------------------------------------------------------------
+
+def hydrate(html: str, url: str = "") -> Optional[str]:
+    """HTML document rendered from the page's hydration payload, or None if it has none."""
+    if not html:
+        return None
+    payload = find_payload(html)
+    if payload is None:
+        return None
+    content = _best_content(payload)
+    if content is None:
+        return None
+    kind, value = content
+    title = _find_title(payload) or document_title(html)
+    if kind == "markdown":
+        return markdown_document(_strip_mdx(value), title)
+    head = f"<head><title>{html_lib.escape(title)}</title></head>" if title else "<head></head>"
+    return f"<html>{head}<body><main>{value}</main></body></html>"
+
+
+def markdown_document(markdown: str, title: str = "") -> str:
+    """Wrap Markdown so it passes through PageExtractor unconverted (see document_markdown).
+
+    The text is HTML-escaped, so it cannot end the <script> early and
+    document_markdown() gets it back byte for byte.
+    """
+    head = f"<head><title>{html_lib.escape(title)}</title></head>" if title else "<head></head>"
+    text = html_lib.escape(markdown, quote=False)
+    body = f'<main><script type="text/markdown" id="{MARKDOWN_SCRIPT_ID}">{text}</script></main>'
+    return f"<html>{head}<body>{body}</body></html>"
+
+
+def find_payload(html: str) -> Optional[Any]:
+    """Decoded hydration payload (page-level part where known), or None."""
+    soup = BeautifulSoup(html, "html.parser")
+
+    el = soup.find("script", id="__NEXT_DATA__")
+    if el is not None:
+        data = _loads(el.string)
+        if isinstance(data, dict):
+            props = data.get("props", {})
+            return props.get("pageProps", data) if isinstance(props, dict) else None
+
+    el = soup.find("script", id="__NUXT_DATA__")
+    if el is not None:
+        values = _loads(el.string)
+        if isinstance(values, list) and values:
+            try:
+                return _unflatten_devalue(values)
+            except (IndexError, RecursionError, TypeError):
+                pass
+
+    el = soup.find("script", id=PAGE_DATA_SCRIPT_ID)
+    if el is not None:
+        data = _loads(el.string)
+        if isinstance(data, dict):
+            return data.get("result", data)
+
+    for script in soup.find_all("script"):
+        text = script.string or ""
+        match = re.search(r"window\.__NUXT__\s*=\s*", text)
+        if match:
+            data = _loads(text[match.end():].strip().rstrip(";"))
+            if data is not None:
+                return data
+    return None
+
+
+def document_markdown(html: str) -> Optional[str]:
+    """Markdown wrapped by markdown_document(), or None for any other document (no HTML parse)."""
+    if MARKDOWN_SCRIPT_ID not in html:
+        return None
+    match = _MARKDOWN_SCRIPT_RE.search(html)
+    return html_lib.unescape(match.group(1)) if match else None
+
+
+def document_title(html: str) -> str:
+    """<title> text of a document (as written by markdown_document), or ""."""
+    match = re.search(r"<title[^>]*>(.*?)</title>", html, re.S | re.I)
+    return html_lib.unescape(match.group(1)).strip() if match else ""
+
+
+def gatsby_page_data_url(html: str, url: str) -> Optional[str]:
+    """page-data.json URL for a Gatsby page that has not had its data attached yet."""
+    if 'id="___gatsby"' not in html or PAGE_DATA_SCRIPT_ID in html:
+        return None
+    parsed = urlparse(url)
+    path = parsed.path.rstrip("/")
+    if path.endswith(".html"):
+        path = path.rsplit("/", 1)[0] if path.endswith("/index.html") else path[:-5]
+    return f"{parsed.scheme}://{parsed.netloc}/page-data{path or '/index'}/page-data.json"
+
+
+def attach_page_data(html: str, page_data: str) -> str:
+    """Embed fetched Gatsby page-data JSON so hydrate() (and the archive) see it."""
+    escaped = page_data.replace("</", "<\\/")
+    script = f'<script type="application/json" id="{PAGE_DATA_SCRIPT_ID}">{escaped}</script>'
+    if "</body>" in html:
+        return html.replace("</body>", script + "</body>", 1)
+    return html + script
+
+
+# ------------------------------------------------------------------
+# Content selection
+# ------------------------------------------------------------------
+
+def _best_content(payload: Any) -> Optional[Tuple[str, str]]:
+    """(kind, value) of the largest renderable content in the payload."""
+    best: Optional[Tuple[str, str]] = None
+    best_len = MIN_CONTENT_CHARS - 1
+    for key, value in _walk(payload):
+        candidate = _candidate(key, value)
+        if candidate is None:
+            continue
+        size = _text_length(*candidate)
+        if size > best_len:
+            best, best_len = candidate, size
+    return best
+
+
+def _candidate(key: str, value: Any) -> Optional[Tuple[str, str]]:
+    if isinstance(value, str):
+        if key.lower() == "compiledsource":
+            fragment = _render_compiled_mdx(value)
+            return ("html", fragment) if fragment else None
+        if len(_HTML_BLOCK_RE.findall(value)) >= 2:
+            return "html", value
+        if key.lower() in MARKDOWN_KEYS and "\n" in value and _MD_SIGNAL_RE.search(value):
+            return "markdown", value
+        return None
+    if isinstance(value, list) and value and all(isinstance(v, dict) and v.get("_type") for v in value):
+        if any(v.get("_type") == "block" for v in value):
+            return "html", _render_portable_text(value)
+    if isinstance(value, dict) and value.get("nodeType") == "document":
+        return "html", _render_contentful(value)
+    return None
+
+
+def _text_length(kind: str, value: str) -> int:
+    if kind == "html":
+        return len(BeautifulSoup(value, "html.parser").get_text(" ", strip=True))
+    return len(value)
+
+
+def _walk(node: Any, key: str = "") -> Iterator[Tuple[str, Any]]:
+    stack: List[Tuple[str, Any]] = [(key, node)]
+    seen = set()
+    while stack:
+        key, value = stack.pop()
+        yield key, value
+        if isinstance(value, (dict, list)):
+            if id(value) in seen:  # devalue payloads may share nodes
+                continue
+            seen.add(id(value))
+            items = value.items() if isinstance(value, dict) else ((key, v) for v in value)
+            stack.extend((str(k), v) for k, v in items)
+
+
+def _find_title(payload: Any) -> str:
+    """Shallowest string under a title-like key."""
+    queue: List[Tuple[int, Any]] = [(0, payload)]
+    while queue:
+        depth, node = queue.pop(0)
+        if isinstance(node, dict):
+            for key in TITLE_KEYS:
+                if isinstance(node.get(key), str) and node[key].strip():
+                    return node[key].strip()
+            if depth < 4:
+                queue.extend((depth + 1, v) for v in node.values() if isinstance(v, (dict, list)))
+        elif isinstance(node, list) and depth < 4:
+            queue.extend((depth + 1, v) for v in node[:50] if isinstance(v, (dict, list)))
+    return ""
+
+
+# ------------------------------------------------------------------
+# Renderers
+# ------------------------------------------------------------------
+
+def _strip_mdx(text: str) -> str:
+    """Drop MDX import/export statements and lines that are only JSX component tags."""
+    out, in_fence = [], False
+    for line in text.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        if not in_fence and (_MDX_ESM_RE.match(line) or _MDX_JSX_LINE_RE.match(line)):
+            continue
+        out.append(line)
+    return "\n".join(out).strip()
+
+
+def _render_compiled_mdx(source: str) -> str:
+    """Best effort: literal children of _components.* JSX calls, in source order."""
+    parts = []
+    for tag, raw in _MDX_JSX_CALL_RE.findall(source):
+        try:
+            text = json.loads(f'"{raw}"')
+        except json.JSONDecodeError:
+            text = raw
+        text = html_lib.escape(text)
+        if tag == "pre" or (tag == "code" and "\n" in text):
+            parts.append(f"<pre><code>{text}</code></pre>")
+        else:
+            parts.append(f"<{tag}>{text}</{tag}>")
+    return "\n".join(parts)
+
+
+def _render_portable_text(blocks: List[dict]) -> str:
+    """Sanity Portable Text blocks → HTML."""
+    parts = []
+    for block in blocks:
+        btype = block.get("_type")
+        if btype == "block":
+            text = "".join(html_lib.escape(c.get("text", "")) for c in block.get("children", [])
+                           if isinstance(c, dict))
+            style = block.get("style", "normal")
+            if block.get("listItem"):
+                parts.append(f"<ul><li>{text}</li></ul>")
+            elif re.fullmatch(r"h[1-6]|blockquote", style):
+                parts.append(f"<{style}>{text}</{style}>")
+            else:
+                parts.append(f"<p>{text}</p>")
+        elif btype == "code" and isinstance(block.get("code"), str):
+            lang = html_lib.escape(block.get("language", ""))
+            parts.append(f'<pre><code class="language-{lang}">{html_lib.escape(block["code"])}</code></pre>')
+    return "\n".join(parts)
+
+
+_CONTENTFUL_TAGS = {
+    "paragraph": "p", "heading-1": "h1", "heading-2": "h2", "heading-3": "h3",
+    "heading-4": "h4", "heading-5": "h5", "heading-6": "h6",
+    "unordered-list": "ul", "ordered-list": "ol", "list-item": "li",
+    "blockquote": "blockquote", "table": "table", "table-row": "tr",
+    "table-cell": "td", "table-header-cell": "th",
+}
+
+
+def _render_contentful(node: dict) -> str:
+    """Contentful rich-text document → HTML."""
+    ntype = node.get("nodeType")
+    if ntype == "text":
+        text = html_lib.escape(node.get("value", ""))
+        marks = {m.get("type") for m in node.get("marks", []) if isinstance(m, dict)}
+        return f"<code>{text}</code>" if "code" in marks else text
+    inner = "".join(_render_contentful(c) for c in node.get("content", []) if isinstance(c, dict))
+    if ntype == "hyperlink":
+        href = html_lib.escape(str(node.get("data", {}).get("uri", "")), quote=True)
+        return f'<a href="{href}">{inner}</a>'
+    if ntype == "hr":
+        return "<hr>"
+    tag = _CONTENTFUL_TAGS.get(ntype)
+    return f"<{tag}>{inner}</{tag}>" if tag else inner
+
+
+# ------------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------------
+
+def _loads(text: Optional[str]) -> Any:
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except (json.JSONDecodeError, ValueError):
+        return None
+
+
+def _unflatten_devalue(values: list) -> Any:
+    """Decode Nuxt 3's devalue format: a flat array where containers hold indices."""
+    cache: dict = {}
+
+    def get(index):
+        if not isinstance(index, int) or index < 0:
+            return None  # -1 undefined, -2 null, -3 NaN, ...
+        if index in cache:
+            return cache[index]
+        value = values[index]
+        if isinstance(value, list):
+            if value and isinstance(value[0], str):
+                tag = value[0]
+                if tag in _DEVALUE_WRAPPERS:
+                    result = get(value[1]) if len(value) > 1 else None
+                elif tag in ("Set", "Array"):
+                    result = [get(v) for v in value[1:]]
+                elif tag == "Map":
+                    result = {str(get(k)): get(v) for k, v in zip(value[1::2], value[2::2])}
+                elif tag == "Date":
+                    result = value[1] if len(value) > 1 else None
+                else:
+                    result = None
+                cache[index] = result
+                return result
+            result = []
+            cache[index] = result
+            result.extend(get(v) for v in value)
+            return result
+        if isinstance(value, dict):
+            result = {}
+            cache[index] = result
+            for key, v in value.items():
+                result[key] = get(v)
+            return result
+        cache[index] = value
+        return value
+
+    return get(0)
@@ -12,19 +12,24 @@ Output (strict JSON):
   - prune_selectors[] (CSS)
   - notes (debug)
 
-Falls back to safe defaults when LLM is unavailable or returns invalid JSON.
+Falls back to safe defaults when LLM is unavailable or returns invalid JSON;
+selectors detected offline across the sample pages (content_detector) are
+preferred over the generic defaults and offered to the LLM as a hint.
 Includes retry loop with feedback when scope validation fails.
 """
 import json
 import os
 import re
 import sys
+import time
 from collections import defaultdict
 from typing import Dict, List, Optional, Set
 from urllib.parse import urlparse
 
 from bs4 import BeautifulSoup
 
+from content_detector import detect_selectors
+from deadline import Deadline
 from llm_client import ResilientLLMClient
 from models import LLMAnalysis, ScopeRules, SelectorSpec
 
@@ -36,6 +41,8 @@ FALLBACK_PRUNE_SELECTORS = [
 ]
 
 MAX_LLM_RETRIES = 2
+# Below this much time budget the LLM round trips are skipped for the heuristic
+MIN_LLM_SECONDS = 60
 
 
 class LLMAnalyzer:
@@ -43,6 +50,7 @@ class LLMAnalyzer:
         self.model = model
         self.llm = ResilientLLMClient(model=model, api_key=api_key)
         self.client = self.llm.client  # for backward compat checks
+        self.detected: Optional[SelectorSpec] = None  # offline detection from analyze()'s sample pages
 
     # ------------------------------------------------------------------
     # Public API
@@ -55,19 +63,26 @@ class LLMAnalyzer:
         start_html: str,
         sample_links: Set[str],
         sample_htmls: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None,
     ) -> LLMAnalysis:
         """Run LLM analysis to get scope rules + selector spec.
 
         Includes retry loop: if scope validation fails, retries with feedback.
-        Falls back to heuristic defaults if LLM unavailable or all retries fail.
+        Falls back to heuristic defaults if LLM unavailable or all retries fail,
+        or if *deadline* leaves no time for LLM calls.
         """
+        deadline = deadline or Deadline()
+        self.detected = self._detect_offline([start_html] + list(sample_htmls or []))
         if not self.llm.available:
             print("  [llm-analyzer] No API key — using heuristic fallback", file=sys.stderr)
             return self._fallback(start_url, base_url, start_html)
+        if deadline.remaining() < MIN_LLM_SECONDS:
+            print(f"  [llm-analyzer] {deadline.remaining():.0f}s of time budget left — using heuristic fallback", file=sys.stderr)
+            return self._fallback(start_url, base_url, start_html)
 
         try:
             return self._llm_analyze_with_retry(
-                start_url, base_url, start_html, sample_links, sample_htmls
+                start_url, base_url, start_html, sample_links, sample_htmls, deadline
             )
         except Exception as e:
             print(f"  [llm-analyzer] LLM call failed: {e} — using fallback", file=sys.stderr)
@@ -82,13 +97,19 @@ class LLMAnalyzer:
         crawl_success_rate: float,
         total_pages: int,
         sample_links: Set[str],
+        deadline: Optional[Deadline] = None,
     ) -> LLMAnalysis:
         """Re-analyze with feedback about poor crawl results.
 
         Called by pipeline when crawl quality is below threshold.
+        Falls back to heuristic defaults when *deadline* leaves no time for LLM calls.
         """
+        deadline = deadline or Deadline()
         if not self.llm.available:
             return self._fallback(start_url, base_url, start_html)
+        if deadline.remaining() < MIN_LLM_SECONDS:
+            print(f"  [llm-analyzer] {deadline.remaining():.0f}s of time budget left — using heuristic fallback", file=sys.stderr)
+            return self._fallback(start_url, base_url, start_html)
 
         print(f"  [llm-analyzer] Re-analyzing with crawl feedback (success rate: {crawl_success_rate:.1%})", file=sys.stderr)
 
@@ -101,7 +122,7 @@ class LLMAnalyzer:
 
         return self._llm_analyze(
             start_url, base_url, start_html, sample_links,
-            extra_context=feedback,
+            extra_context=feedback, deadline=deadline,
         )
 
     def refine_selectors(
@@ -110,15 +131,21 @@ class LLMAnalyzer:
         sample_md_contents: List[str],
         start_url: str,
         start_html: str,
+        deadline: Optional[Deadline] = None,
     ) -> SelectorSpec:
         """Refine prune selectors by showing the LLM actual crawl output.
 
         The LLM sees 2-3 sample markdown pages and identifies repeated
         UI residue that should be pruned with better CSS selectors.
-        Returns an improved SelectorSpec.
+        Returns an improved SelectorSpec (the current one unchanged when
+        *deadline* leaves no time for the LLM call).
         """
+        deadline = deadline or Deadline()
         if not self.llm.available or not sample_md_contents:
             return current_analysis.selector_spec
+        if deadline.remaining() < MIN_LLM_SECONDS:
+            print(f"  [llm-refine] {deadline.remaining():.0f}s of time budget left — keeping current selectors", file=sys.stderr)
+            return current_analysis.selector_spec
 
         print(f"  [llm-refine] Refining selectors with {len(sample_md_contents)} sample pages...", file=sys.stderr)
 
@@ -155,7 +182,7 @@ Rules:
 Return ONLY valid JSON, no markdown fences:
 {{"prune_selectors": [...], "notes": "what was added and why"}}"""
 
-        result_text = self.llm.chat(prompt, temperature=0.1, max_tokens=1500)
+        result_text = self.llm.chat(prompt, temperature=0.1, max_tokens=1500, deadline=deadline)
         if not result_text:
             print(f"  [llm-refine] No response, keeping current selectors", file=sys.stderr)
             return current_analysis.selector_spec
@@ -206,11 +233,16 @@ Return ONLY valid JSON, no markdown fences:
         start_html: str,
         sample_links: Set[str],
         sample_htmls: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None,
     ) -> LLMAnalysis:
         """Try LLM analysis up to MAX_LLM_RETRIES times with feedback on failure."""
+        deadline = deadline or Deadline()
         feedback = None
 
         for attempt in range(MAX_LLM_RETRIES + 1):
+            if attempt > 0 and deadline.remaining() < MIN_LLM_SECONDS:
+                print(f"  [llm-analyzer] Time budget low, no more retries", file=sys.stderr)
+                break
             if attempt > 0:
                 print(f"  [llm-analyzer] Retry {attempt}/{MAX_LLM_RETRIES} with feedback...", file=sys.stderr)
 
@@ -218,6 +250,7 @@ Return ONLY valid JSON, no markdown fences:
                 start_url, base_url, start_html, sample_links,
                 sample_htmls=sample_htmls,
                 extra_context=feedback,
+                deadline=deadline,
             )
 
             # Validate scope against sample links
@@ -251,6 +284,7 @@ Return ONLY valid JSON, no markdown fences:
         sample_links: Set[str],
         sample_htmls: Optional[List[str]] = None,
         extra_context: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
     ) -> LLMAnalysis:
         link_summary = self._build_link_summary(sample_links)
         clean_html = self._sanitize_html(start_html)
@@ -259,6 +293,13 @@ Return ONLY valid JSON, no markdown fences:
         if sample_htmls:
             sample_clean = self._sanitize_html(sample_htmls[0])[:8000]
             sample_section = f"\n\n### Sample Content Page HTML (truncated):\n```html\n{sample_clean}\n```"
+        if self.detected:
+            sample_section += (
+                f"\n\n### Offline DOM comparison of the sample pages:\n"
+                f"- content container: {self.detected.content_selector}\n"
+                f"- blocks repeated on every page: {self.detected.prune_selectors}\n"
+                f"Prefer these selectors unless the HTML shows they are wrong."
+            )
 
         feedback_section = ""
         if extra_context:
@@ -318,7 +359,7 @@ Return ONLY valid JSON, no markdown fences:
 {{"scope_rules": {{"include_patterns": [...], "exclude_patterns": [...]}}, "selector_spec": {{"content_selector": "...", "prune_selectors": [...], "notes": "..."}}}}"""
 
         print(f"  [llm-analyzer] Calling model: {self.model}", file=sys.stderr)
-        result_text = self.llm.chat(prompt, temperature=0.1, max_tokens=2000)
+        result_text = self.llm.chat(prompt, temperature=0.1, max_tokens=2000, deadline=deadline)
 
         if not result_text:
             print(f"  [llm-analyzer] LLM returned no response after retries", file=sys.stderr)
@@ -382,7 +423,7 @@ Return ONLY valid JSON, no markdown fences:
 
     def _fallback(self, start_url: str, base_url: str, start_html: str) -> LLMAnalysis:
         """Heuristic fallback using start_url path as include pattern."""
-        content_selector = self._detect_content_selector(start_html)
+        content_selector = self.detected.content_selector if self.detected else self._detect_content_selector(start_html)
 
         # Derive include pattern from start URL path
         parsed = urlparse(start_url)
@@ -400,13 +441,30 @@ Return ONLY valid JSON, no markdown fences:
             base_url=base_url,
             description=f"Heuristic fallback from path: {parsed.path}",
         )
-        selector_spec = SelectorSpec(
+        selector_spec = self.detected or SelectorSpec(
             content_selector=content_selector,
             prune_selectors=FALLBACK_PRUNE_SELECTORS,
             notes="Heuristic fallback — LLM unavailable or failed",
         )
         return LLMAnalysis(scope_rules=scope_rules, selector_spec=selector_spec)
 
+    @staticmethod
+    def _detect_offline(pages: List[str]) -> Optional[SelectorSpec]:
+        """Content / chrome selectors from comparing the sample pages' DOMs."""
+        t0 = time.time()
+        try:
+            spec = detect_selectors(pages)
+        except Exception as e:
+            print(f"  [llm-analyzer] Offline detection failed: {e}", file=sys.stderr)
+            return None
+        elapsed = (time.time() - t0) * 1000
+        if spec is None:
+            print(f"  [llm-analyzer] Offline detection: no stable content container ({elapsed:.0f}ms)", file=sys.stderr)
+        else:
+            print(f"  [llm-analyzer] Offline detection: content={spec.content_selector!r}, "
+                  f"prune={spec.prune_selectors} ({elapsed:.0f}ms)", file=sys.stderr)
+        return spec
+
     def _detect_content_selector(self, html: str) -> str:
         if not html:
             return "main"
@@ -604,8 +662,8 @@ Return ONLY valid JSON, no markdown fences:
             matching = sum(1 for link in sample_links if scope_rules.url_matches(link))
             print(f"  [llm-analyzer] Smart fallback matches {matching}/{len(sample_links)} links", file=sys.stderr)
 
-        # Keep LLM's selector spec if it had one, otherwise use heuristic
-        selector_spec = last_analysis.selector_spec if last_analysis else SelectorSpec(
+        # Keep LLM's selector spec if it had one, otherwise offline detection or heuristic
+        selector_spec = last_analysis.selector_spec if last_analysis else self.detected or SelectorSpec(
             content_selector=self._detect_content_selector(start_html),
             prune_selectors=FALLBACK_PRUNE_SELECTORS,
         )
@@ -1,7 +1,9 @@
 """Resilient LLM client wrapper with retry logic for free-tier models.
 
 Free models on OpenRouter may return empty responses or rate-limit errors.
-This wrapper retries with exponential backoff.
+This wrapper retries with exponential backoff. A Deadline bounds the
+whole call: request timeouts are capped by the time left, and no retry
+(or backoff sleep) runs past it.
 """
 import os
 import sys
@@ -10,6 +12,8 @@ from typing import List, Optional
 
 from openai import OpenAI
 
+from deadline import Deadline
+
 from dotenv import load_dotenv
 load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
 
@@ -17,6 +21,7 @@ DEFAULT_MODEL = "qwen/qwen3-coder-next"
 MAX_RETRIES = 4
 BASE_DELAY = 3.0
 MAX_DELAY = 30.0
+REQUEST_TIMEOUT_S = 120.0
 
 
 class ResilientLLMClient:
@@ -40,13 +45,16 @@ class ResilientLLMClient:
         temperature: float = 0.1,
         max_tokens: int = 2000,
         system: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
     ) -> Optional[str]:
         """Send a chat completion request with retry logic.
 
-        Returns the response text, or None if all retries fail.
+        Returns the response text, or None if all retries fail or
+        *deadline* passes first.
         """
         if not self.client:
             return None
+        deadline = deadline or Deadline()
 
         messages: List[dict] = []
         if system:
@@ -54,12 +62,17 @@ class ResilientLLMClient:
         messages.append({"role": "user", "content": prompt})
 
         for attempt in range(MAX_RETRIES + 1):
+            timeout = min(REQUEST_TIMEOUT_S, deadline.remaining())
+            if timeout <= 0:
+                print("  [llm] Time budget used up, giving up", file=sys.stderr)
+                return None
             try:
                 response = self.client.chat.completions.create(
                     model=self.model,
                     messages=messages,
                     temperature=temperature,
                     max_tokens=max_tokens,
+                    timeout=timeout,
                 )
 
                 raw = response.choices[0].message.content
@@ -84,6 +97,9 @@ class ResilientLLMClient:
 
             if attempt < MAX_RETRIES:
                 delay = min(BASE_DELAY * (2 ** attempt), MAX_DELAY)
+                if delay >= deadline.remaining():
+                    print("  [llm] Time budget used up, no more retries", file=sys.stderr)
+                    return None
                 print(f"  [llm] Retrying in {delay:.0f}s...", file=sys.stderr)
                 time.sleep(delay)
 
@@ -0,0 +1,205 @@
+"""llms.txt / llms-full.txt parsing (https://llmstxt.org).
+
+  llms.txt       Markdown index: a title, a summary and lists of
+                 ``[Title](url): notes`` links, often to ``.md`` renderings
+                 of the documentation pages.
+  llms-full.txt  The whole documentation as one Markdown file.
+
+split_corpus() cuts llms-full.txt back into pages. Pages are delimited by
+YAML front matter blocks when present, otherwise by top-level ``# ``
+headings (outside code fences). A page's URL comes from a ``Source:`` /
+``URL:`` line or front matter; pages without one get a URL derived from
+the title under the start directory.
+
+Fetching is done by DiscoveryWorker.probe_llms_txt; this module is pure.
+"""
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+LLMS_FULL = "llms-full.txt"
+LLMS_INDEX = "llms.txt"
+MIN_CORPUS_CHARS = 500
+MIN_PAGE_CHARS = 20
+MARKDOWN_SUFFIXES = (".md", ".mdx", ".txt")
+
+_FRONT_MATTER_RE = re.compile(r"^---[ \t]*\n((?:[\w-]+[ \t]*:.*\n)+)---[ \t]*\n", re.M)
+_SOURCE_LINE_RE = re.compile(r"^\s*(?:source|url|source_url|link)\s*:\s*<?(https?://[^\s>]+)>?\s*$", re.I)
+_INDEX_LINK_RE = re.compile(r"\[([^\]]+)\]\(([^)\s]+)\)")
+_H1_RE = re.compile(r"^#\s+(.+?)\s*#*\s*$")
+
+
+class LlmsPage(NamedTuple):
+    url: str
+    title: str
+    markdown: str
+
+
+# ------------------------------------------------------------------
+# Locations
+# ------------------------------------------------------------------
+
+def start_dir_url(start_url: str) -> str:
+    """Directory of the start URL, with a trailing slash."""
+    parsed = urlparse(start_url)
+    path = parsed.path
+    if not path.endswith("/"):
+        last = path.rsplit("/", 1)[-1]
+        path = path[: -len(last)] if "." in last else path + "/"
+    return f"{parsed.scheme}://{parsed.netloc}{path or '/'}"
+
+
+def llms_locations(start_url: str, filename: str) -> List[str]:
+    """Where to look for *filename*: the start directory first, then the site root."""
+    start_dir = start_dir_url(start_url)
+    parsed = urlparse(start_url)
+    root = f"{parsed.scheme}://{parsed.netloc}/"
+    locations = [urljoin(start_dir, filename)]
+    if start_dir != root:
+        locations.append(urljoin(root, filename))
+    return locations
+
+
+def in_scope(url: str, start_url: str) -> bool:
+    """True if *url* is on the start URL's host and below its directory."""
+    start_dir = urlparse(start_dir_url(start_url))
+    parsed = urlparse(url)
+    return parsed.netloc == start_dir.netloc and parsed.path.startswith(start_dir.path)
+
+
+def looks_like_markdown_file(text: str, content_type: str = "") -> bool:
+    """Reject HTML error pages and SPA fallbacks served with status 200."""
+    if "html" in content_type.lower():
+        return False
+    head = text.lstrip()[:200].lower()
+    return not head.startswith(("<!doctype", "<html", "<head", "<body"))
+
+
+# ------------------------------------------------------------------
+# llms.txt index
+# ------------------------------------------------------------------
+
+def parse_index(text: str, base_url: str) -> List[Tuple[str, str]]:
+    """(title, absolute url) for every Markdown link in an llms.txt index, in order."""
+    links, seen = [], set()
+    for title, href in _INDEX_LINK_RE.findall(text):
+        url = urljoin(base_url, href.strip())
+        if urlparse(url).scheme in ("http", "https") and url not in seen:
+            seen.add(url)
+            links.append((title.strip(), url))
+    return links
+
+
+def is_markdown_url(url: str) -> bool:
+    return urlparse(url).path.lower().endswith(MARKDOWN_SUFFIXES)
+
+
+def page_url_for(markdown_url: str) -> str:
+    """HTML page URL for a ``.md`` rendering (``/a.md`` → ``/a``, ``/a/index.html.md`` → ``/a/``)."""
+    parsed = urlparse(markdown_url)
+    path = parsed.path
+    for suffix in MARKDOWN_SUFFIXES:
+        if path.lower().endswith(suffix):
+            path = path[: -len(suffix)]
+            break
+    if path.endswith("/index.html") or path.endswith("/index"):
+        path = path.rsplit("/", 1)[0] + "/"
+    return parsed._replace(path=path, query="", fragment="").geturl()
+
+
+def strip_title(markdown: str, title: str) -> str:
+    """Drop a leading ``# Title`` line (the page header is written separately)."""
+    lines = markdown.lstrip().splitlines()
+    if lines:
+        match = _H1_RE.match(lines[0])
+        if match and (not title or match.group(1).strip().lower() == title.strip().lower()):
+            lines = lines[1:]
+    return "\n".join(lines).strip()
+
+
+def first_heading(markdown: str) -> str:
+    for line in markdown.splitlines():
+        match = _H1_RE.match(line)
+        if match:
+            return match.group(1).strip()
+    return ""
+
+
+# ------------------------------------------------------------------
+# llms-full.txt corpus
+# ------------------------------------------------------------------
+
+def split_corpus(text: str, start_url: str) -> List[LlmsPage]:
+    """Cut an llms-full.txt corpus into pages (unique URLs, corpus order)."""
+    text = text.replace("\r\n", "\n")
+    sections = _split_front_matter(text)
+    if sections is None:
+        sections = _split_headings(text)
+
+    pages: List[LlmsPage] = []
+    used: Dict[str, int] = {}
+    for meta, title, body in sections:
+        body, source = _pop_source_line(body)
+        url = source or meta.get("url") or meta.get("source") or meta.get("source_url") or ""
+        if url and not urlparse(url).scheme:
+            url = urljoin(start_dir_url(start_url), url)
+        title = title or meta.get("title", "") or first_heading(body)
+        body = strip_title(body, title)
+        if len(body) < MIN_PAGE_CHARS:
+            continue
+        if not url:
+            url = urljoin(start_dir_url(start_url), _slugify(title) or "page")
+        count = used.get(url, 0)
+        used[url] = count + 1
+        if count:
+            url = f"{url.rstrip('/')}-{count + 1}"
+        pages.append(LlmsPage(url=url, title=title, markdown=body))
+    return pages
+
+
+def _split_front_matter(text: str) -> Optional[List[Tuple[Dict[str, str], str, str]]]:
+    matches = list(_FRONT_MATTER_RE.finditer(text))
+    if len(matches) < 2:
+        return None
+    sections = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        meta = {}
+        for line in match.group(1).splitlines():
+            key, _, value = line.partition(":")
+            meta[key.strip().lower()] = value.strip().strip("'\"")
+        sections.append((meta, meta.get("title", ""), text[match.end():end].strip()))
+    return sections
+
+
+def _split_headings(text: str) -> List[Tuple[Dict[str, str], str, str]]:
+    """Sections per ``# `` heading; untitled text before the first one is dropped."""
+    sections: List[Tuple[Dict[str, str], str, str]] = []
+    title, lines, in_fence = "", [], False
+    for line in text.splitlines():
+        if line.lstrip().startswith(("```", "~~~")):
+            in_fence = not in_fence
+        match = None if in_fence else _H1_RE.match(line)
+        if match:
+            if title:
+                sections.append(({}, title, "\n".join(lines).strip()))
+            title, lines = match.group(1).strip(), []
+        else:
+            lines.append(line)
+    if title:
+        sections.append(({}, title, "\n".join(lines).strip()))
+    return sections or [({}, "", text.strip())]
+
+
+def _pop_source_line(body: str) -> Tuple[str, str]:
+    """Remove a ``Source: <url>`` line from the first lines of a page."""
+    lines = body.splitlines()
+    for i, line in enumerate(lines[:5]):
+        match = _SOURCE_LINE_RE.match(line)
+        if match:
+            return "\n".join(lines[:i] + lines[i + 1:]).strip(), match.group(1)
+    return body, ""
+
+
+def _slugify(title: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-")
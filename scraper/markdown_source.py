@@ -0,0 +1,90 @@
+"""Native Markdown sources — fetch a page's Markdown instead of its HTML.
+
+Many docs platforms (Mintlify, GitBook, some VitePress deployments) serve
+the page source when asked:
+
+  accept   same URL with ``Accept: text/markdown`` (content negotiation)
+  suffix   ``<page>.md``        (/docs/intro → /docs/intro.md)
+  index    ``<page>/index.md``  (/docs/intro → /docs/intro/index.md)
+
+DiscoveryWorker.probe_markdown_source() tries each strategy on a few
+sample pages; the first that works for most of them is recorded in the
+engine decision and the crawler fetches every page that way (falling
+back to HTML per page). Fetched Markdown is wrapped with
+hydration.markdown_document, so extraction skips BeautifulSoup and
+markdownify entirely.
+"""
+import re
+from typing import Dict, Tuple
+from urllib.parse import urlparse
+
+from hydration import markdown_document
+from llms_txt import first_heading, looks_like_markdown_file, strip_title
+
+STRATEGIES = ("accept", "suffix", "index")
+ACCEPT_MARKDOWN = "text/markdown, text/x-markdown;q=0.9, text/plain;q=0.5"
+PROBE_PAGES = 3
+MIN_PROBE_SHARE = 2 / 3
+MIN_MARKDOWN_CHARS = 40
+STORE_KEY = "markdown"  # FetchStore mode key for fetched page sources
+
+_FRONT_MATTER_RE = re.compile(r"\A---[ \t]*\n(.*?)\n---[ \t]*\n", re.S)
+_MARKDOWN_SIGNAL_RE = re.compile(r"^(#{1,6}\s|```|[-*]\s|\d+\.\s|>\s)|\[[^\]]+\]\([^)]+\)", re.M)
+
+
+def source_url(url: str, strategy: str) -> str:
+    """URL to request for *url*'s Markdown with *strategy*."""
+    if strategy == "accept":
+        return url
+    parsed = urlparse(url)
+    path = parsed.path or "/"
+    if strategy == "index":
+        path = path.rstrip("/") + "/index.md"
+    elif path.endswith("/"):
+        path = path + "index.md" if path == "/" else path.rstrip("/") + ".md"
+    elif path.endswith((".html", ".htm")):
+        path = path.rsplit(".", 1)[0] + ".md"
+    else:
+        path = path + ".md"
+    return parsed._replace(path=path, query="", fragment="").geturl()
+
+
+def request_headers(strategy: str) -> Dict[str, str]:
+    return {"Accept": ACCEPT_MARKDOWN} if strategy == "accept" else {}
+
+
+def is_markdown_response(text: str, content_type: str, strategy: str) -> bool:
+    """True if a response body is page Markdown (not HTML, not an error stub)."""
+    if not text or len(text.strip()) < MIN_MARKDOWN_CHARS:
+        return False
+    content_type = content_type.lower()
+    if strategy == "accept" and "markdown" not in content_type:
+        return False  # the server ignored the Accept header
+    if not looks_like_markdown_file(text, content_type):
+        return False
+    return "markdown" in content_type or bool(_MARKDOWN_SIGNAL_RE.search(text))
+
+
+def split_front_matter(text: str) -> Tuple[Dict[str, str], str]:
+    """(front matter fields, body) of a Markdown source."""
+    match = _FRONT_MATTER_RE.match(text)
+    if not match:
+        return {}, text
+    meta = {}
+    for line in match.group(1).splitlines():
+        key, sep, value = line.partition(":")
+        if sep and not line.startswith((" ", "\t")):
+            meta[key.strip().lower()] = value.strip().strip("'\"")
+    return meta, text[match.end():]
+
+
+def to_document(text: str, fallback_title: str = "") -> str:
+    """Extractor-ready document for a Markdown source: front matter dropped, title lifted."""
+    meta, body = split_front_matter(text.replace("\r\n", "\n"))
+    title = meta.get("title") or first_heading(body) or fallback_title
+    return markdown_document(strip_title(body, title), title)
+
+
+def probe_result(successes: int, tried: int) -> bool:
+    """Whether a strategy that worked for *successes* of *tried* sample pages is usable."""
+    return tried > 0 and successes / tried >= MIN_PROBE_SHARE
@@ -11,6 +11,8 @@ from pydantic import BaseModel, Field
 class EngineMode(str, Enum):
     CURL = "curl"
     SELENIUM = "selenium"
+    HYBRID = "hybrid"  # cURL per page, browser only for thin pages
+    HYDRATION = "hydration"  # cURL, content rendered from the embedded framework payload
 
 
 class EngineDecision(BaseModel):
@@ -23,6 +25,7 @@ class EngineDecision(BaseModel):
     selenium_code_blocks: int = 0
     diff_ratio: float = 0.0
     reason: str = ""
+    markdown_source: str = ""  # markdown_source strategy that serves page Markdown, "" = none
 
 
 class ScopeRules(BaseModel):
@@ -78,6 +81,32 @@ class SelectorSpec(BaseModel):
     notes: str = ""
 
 
+class ResourceBlocklist(BaseModel):
+    """What headless Chrome should not download: none of it reaches the markdown."""
+    resource_types: List[str] = Field(default_factory=lambda: ["image", "font", "media"])
+    url_patterns: List[str] = Field(default_factory=lambda: [
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+        "*doubleclick.net*",
+        "*googlesyndication.com*",
+        "*connect.facebook.net*",
+        "*hotjar.com*",
+        "*segment.io*",
+        "*cdn.segment.com*",
+        "*mixpanel.com*",
+        "*clarity.ms*",
+        "*heapanalytics.com*",
+        "*fullstory.com*",
+        "*hs-analytics.net*",
+        "*hs-scripts.com*",
+        "*intercom.io*",
+    ])
+
+    @classmethod
+    def disabled(cls) -> "ResourceBlocklist":
+        return cls(resource_types=[], url_patterns=[])
+
+
 class LLMAnalysis(BaseModel):
     scope_rules: ScopeRules
     selector_spec: SelectorSpec
@@ -88,7 +117,13 @@ class UrlRecord(BaseModel):
     title: str = ""
     discovered_from: str = ""
     source: str = ""
+    # Link hops from the start URL in the quick sample (-1 = not reached, sitemap only)
     depth: int = 0
+    inbound_links: int = 0
+    # Sitemap hints (empty / None when the URL was not in a sitemap)
+    lastmod: str = ""
+    changefreq: str = ""
+    priority: Optional[float] = None
 
 
 class ManifestEntry(BaseModel):
@@ -97,6 +132,9 @@ class ManifestEntry(BaseModel):
     size_bytes: int = 0
     headings: List[str] = Field(default_factory=list)
     content_hash: str = ""
+    etag: str = ""
+    last_modified: str = ""
+    lastmod: str = ""
 
 
 class Manifest(BaseModel):
@@ -107,6 +145,20 @@ class Manifest(BaseModel):
     entries: List[ManifestEntry] = Field(default_factory=list)
 
 
+class CrawlCheckpoint(BaseModel):
+    """State of an interrupted full crawl, read back from the crawl journal."""
+    start_url: str
+    engine_mode: EngineMode
+    selector_spec: SelectorSpec
+    markdown_source: str = ""
+    frontier: List[UrlRecord] = Field(default_factory=list)
+    entries: List[ManifestEntry] = Field(default_factory=list)
+
+    def remaining(self) -> List[UrlRecord]:
+        done = {e.url for e in self.entries}
+        return [r for r in self.frontier if r.url not in done]
+
+
 class GroupPlanEntry(BaseModel):
     name: str
     paths: List[str] = Field(default_factory=list)
@@ -124,6 +176,23 @@ class PipelineConfig(BaseModel):
     output_dir: str = "./output"
     max_pages: int = 500
     max_workers: int = 10
+    async_fetch: bool = False
+    async_concurrency: int = 256
+    extract_processes: int = 0
+    browsers: int = 0  # Selenium mode: headless browsers in the pool, 0 = auto
+    resource_blocklist: ResourceBlocklist = Field(default_factory=ResourceBlocklist)
+    llms_txt: bool = True  # build from llms-full.txt / llms.txt Markdown when the site has it
+    markdown_source: bool = True  # fetch pages as Markdown (.md alternates, Accept header) when served
+    search_index_content: bool = False  # build from a full-text static-site search index, no crawl
+    site_profiles: bool = True  # known generators (Sphinx, MkDocs, Docusaurus...) skip LLM analysis
+    selector_scoring: bool = True  # score candidate selectors on sample pages before the full crawl
+    quality_monitor: bool = True  # switch selectors mid-crawl when the running success rate drops
+    prefetch: bool = True  # fetch the in-prefix frontier into the store while LLM analysis runs
+    stream_discovery: bool = False  # crawl URLs while sitemaps are still being parsed (discovery order)
+    archive: bool = False
+    incremental: bool = False
+    resume: bool = False
+    time_budget: float = 0  # seconds for the whole run, 0 = unlimited
     engine_diff_threshold: float = 0.3
     max_file_size_kb: int = 500
     llm_model_analyzer: str = "qwen/qwen3-coder-next"
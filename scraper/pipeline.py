@@ -8,64 +8,198 @@ Flow:
 Two-pass crawl strategy:
   Pass 1: Crawl ~5 sample pages, show output to LLM for selector refinement
   Pass 2: Re-crawl all pages with improved selectors
+          (pages already fetched are served from the run's FetchStore,
+          so only extraction is repeated)
   Post:   Cross-page dedup removes any remaining repeated UI blocks
+
+Sites built with a recognised generator (site_profiles.py: Sphinx,
+MkDocs, Docusaurus, VitePress, Starlight, Mintlify) take scope rules and
+selectors from a built-in profile; LLM analysis and pass 1 are skipped.
+
+Before pass 2, selector_scoring.py scores the candidate selectors (LLM or
+profile, offline detection, fallbacks) on the in-scope sample pages and
+keeps the best. Selectors validated this way are not re-analyzed after
+a poor full crawl, so the second full crawl pass is avoided. During the
+full crawl a QualityMonitor watches the running success rate; if it drops,
+selectors are re-analyzed mid-crawl and the pages fetched so far are
+re-extracted from memory.
+
+With stream_discovery=True discovery is a producer (frontier_stream.py):
+after the quick sample, sitemap/llms.txt/search-index URLs are fed to the
+full crawl through a bounded queue while they are still being found,
+filtered by scope and locale on the fly and crawled in discovery order.
+
+While analysis and the sample crawl run, prefetch.py fetches the
+in-prefix frontier into the FetchStore in the background, so the full
+crawl mostly extracts pages that are already stored.
+
+The frontier is ordered best-first by scheduler.prioritize before it is
+capped at max_pages, so an early stop keeps the most valuable pages.
+
+The full crawl is journaled to crawl-journal.jsonl; with resume=True an
+interrupted run continues from the journal instead of starting over.
+
+Fast path: when the site publishes its docs as Markdown (llms-full.txt,
+or an llms.txt index of .md files), pages are written straight from it
+and engine selection, LLM analysis and crawling are skipped. With
+search_index_content=True the same applies to a static-site search index
+that holds the full page text (MkDocs, docusaurus-search-local).
 """
-import re
+import json
+import os
 import shutil
 import sys
+import threading
 import time
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
-from models import EngineMode, PipelineConfig
+from archive import ARCHIVE_FILENAME, archive_index, iter_latest
+from checkpoint import CrawlJournal
+from models import (
+    CrawlCheckpoint,
+    EngineDecision,
+    EngineMode,
+    LLMAnalysis,
+    Manifest,
+    ManifestEntry,
+    PipelineConfig,
+    SelectorSpec,
+    UrlRecord,
+)
 from engine_selector import select_engine
 from discovery import DiscoveryWorker
-from llm_analyzer import LLMAnalyzer
+from content_detector import detect_selectors
+from llm_analyzer import FALLBACK_CONTENT_SELECTORS, FALLBACK_PRUNE_SELECTORS, LLMAnalyzer
 from crawler import Crawler
+from extractor import PageExtractor
+from fetch_store import FetchStore
+from frontier_stream import FrontierStream, same_locale, url_locale
+from politeness import PolitenessController
+from prefetch import Prefetcher, in_prefix
+from quality_monitor import QualityMonitor
 from grouper import Grouper
-from dedup import deduplicate_crawl_output
+from dedup import DEDUP_BLOCKS_FILENAME, deduplicate_crawl_output
+from deadline import Deadline
+from scheduler import prioritize
+from search_index import has_full_text
+from selector_scoring import (
+    MIN_SCORING_PAGES,
+    VALIDATED_MATCH_RATE,
+    pick_winner,
+    score_candidates,
+    stratified_pages,
+)
+from site_profiles import HIGH_CONFIDENCE, fingerprint, profile_analysis, profile_spec
 
 MIN_CRAWL_SUCCESS_RATE = 0.20
 MAX_CRAWL_RETRIES = 1
 SAMPLE_CRAWL_SIZE = 5
 
+# Time budget (--time-budget): share allowed for discovery, and time kept
+# back from the crawl for dedup + AGENTS.md generation
+DISCOVERY_BUDGET_SHARE = 0.3
+FINALIZE_RESERVE_SHARE = 0.1
+FINALIZE_RESERVE_MAX_S = 30
+
 
 class Pipeline:
     def __init__(self, config: PipelineConfig):
         self.config = config
         self.output_dir = Path(config.output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.store: Optional[FetchStore] = None
+        self.deadline = Deadline(config.time_budget)
+        # Set when the time budget stopped the crawl before the frontier was done
+        self.crawl_cut_short = False
+        # Shared by every crawl of the run, so sample and full crawls keep what they learnt per host
+        self.politeness = PolitenessController()
+        # markdown_source strategy the crawls fetch pages with ("" = HTML)
+        self.markdown_source = ""
 
     def run(self) -> Path:
         """Execute the full scraping pipeline.
 
         Returns path to generated AGENTS.md.
         """
+        # Every stage reads pages through one run-scoped store, so each URL
+        # is fetched at most once per engine per run.
+        self.store = FetchStore(self.output_dir / ".fetch-cache")
+        self.journal = CrawlJournal(self.output_dir)
+        self.deadline = Deadline(self.config.time_budget)
+        self.crawl_cut_short = False
+        try:
+            return self._run()
+        finally:
+            self.journal.close()
+            print(f"  [fetch-store] {len(self.store)} pages stored, {self.store.hits} fetches avoided", file=sys.stderr)
+            self.store.clear()
+            self.store = None
+
+    def _run(self) -> Path:
         start = time.time()
         print(f"\n{'='*60}", file=sys.stderr)
         print(f"  Scraper v2 Pipeline: {self.config.start_url}", file=sys.stderr)
         print(f"  Output: {self.output_dir}", file=sys.stderr)
+        if self.deadline.enabled:
+            print(f"  Time budget: {self.deadline.budget:.0f}s", file=sys.stderr)
         print(f"{'='*60}\n", file=sys.stderr)
 
+        if self.config.resume:
+            checkpoint = self.journal.load()
+            if checkpoint is not None and checkpoint.start_url == self.config.start_url:
+                manifest = self._resume_crawl(checkpoint)
+                return self._finish(manifest, None, start)
+            print("  [checkpoint] No interrupted crawl to resume — starting a full run\n", file=sys.stderr)
+
+        # --- Fast path: documentation already published as Markdown ---
+        if self.config.llms_txt:
+            published = self._scrape_llms_txt()
+            if published is not None:
+                manifest, changed_files = published
+                return self._finish(manifest, changed_files, start)
+        if self.config.search_index_content:
+            published = self._scrape_search_index()
+            if published is not None:
+                manifest, changed_files = published
+                return self._finish(manifest, changed_files, start)
+
         parsed = urlparse(self.config.start_url)
         base_url = f"{parsed.scheme}://{parsed.netloc}"
 
+        previous = self._load_previous_run() if self.config.incremental else None
+
         # --- FR1: Engine Selection ---
         print("[1/7] Engine Selection...", file=sys.stderr)
-        decision = select_engine(
-            self.config.start_url,
-            threshold=self.config.engine_diff_threshold,
-        )
-        engine_mode = decision.mode
-        print(f"  → Engine: {engine_mode.value} ({decision.reason})\n", file=sys.stderr)
+        if previous:
+            previous_manifest, decision, previous_analysis = previous
+            print(f"  → Engine: {decision.mode.value} (incremental: reused from previous run)\n", file=sys.stderr)
+        else:
+            previous_manifest, previous_analysis = None, None
+            decision = select_engine(
+                self.config.start_url,
+                threshold=self.config.engine_diff_threshold,
+                store=self.store,
+                blocklist=self.config.resource_blocklist,
+                deadline=self.deadline,
+            )
+            print(f"  → Engine: {decision.mode.value} ({decision.reason})\n", file=sys.stderr)
 
-        report_path = self.output_dir / "engine-decision.json"
-        report_path.write_text(decision.model_dump_json(indent=2), encoding="utf-8")
+            report_path = self.output_dir / "engine-decision.json"
+            report_path.write_text(decision.model_dump_json(indent=2), encoding="utf-8")
+        engine_mode = decision.mode
+        if self.config.stream_discovery and previous_manifest is None:
+            return self._run_streaming(engine_mode, decision, report_path, base_url, start)
 
         # --- FR2: Discovery ---
         print("[2/7] URL Discovery...", file=sys.stderr)
-        discovery = DiscoveryWorker(engine_mode=engine_mode)
+        discovery = DiscoveryWorker(
+            engine_mode=engine_mode,
+            store=self.store,
+            deadline=self.deadline.reserve(self.deadline.remaining() * (1 - DISCOVERY_BUDGET_SHARE)),
+            blocklist=self.config.resource_blocklist,
+        )
         frontier, start_html, sample_links = discovery.discover(
             self.config.start_url,
             max_sample_pages=10,
@@ -79,12 +213,26 @@ class Pipeline:
         # --- FR3: LLM Analyzer ---
         print("[3/7] LLM Analysis (scope + selectors)...", file=sys.stderr)
         analyzer = LLMAnalyzer(model=self.config.llm_model_analyzer)
-        analysis = analyzer.analyze(
-            start_url=self.config.start_url,
-            base_url=base_url,
-            start_html=start_html,
-            sample_links=sample_links,
-        )
+        profile = fingerprint(start_html) if self.config.site_profiles and previous_analysis is None else None
+        profiled = profile is not None and profile.confidence >= HIGH_CONFIDENCE
+        # Raw HTML does not depend on the selectors: fetch while the LLM works
+        prefetcher = None
+        if self.config.prefetch and previous_analysis is None and not profiled and engine_mode != EngineMode.SELENIUM:
+            prefetcher = self._start_prefetch(frontier, engine_mode)
+        if previous_analysis is not None:
+            analysis = previous_analysis
+            print("  → Incremental: reusing scope rules and selectors from previous run", file=sys.stderr)
+        elif profiled:
+            analysis = profile_analysis(profile, self.config.start_url, base_url)
+        else:
+            analysis = analyzer.analyze(
+                start_url=self.config.start_url,
+                base_url=base_url,
+                start_html=start_html,
+                sample_links=sample_links,
+                sample_htmls=list(discovery.sample_pages.values())[1:],
+                deadline=self.deadline,
+            )
 
         # Filter frontier by scope rules
         full_frontier = frontier
@@ -99,55 +247,155 @@ class Pipeline:
 
         print(file=sys.stderr)
 
+        validated = False
+        if previous_analysis is None and self.config.selector_scoring:
+            validated = self._score_selectors(
+                analysis, analyzer, profile, profiled, discovery.sample_pages, engine_mode,
+            )
+
         # Save analysis
         analysis_path = self.output_dir / "llm-analysis.json"
         analysis_path.write_text(analysis.model_dump_json(indent=2), encoding="utf-8")
 
-        # Cap at max_pages
+        # Best pages first, then cap at max_pages
+        frontier = prioritize(frontier, self.config.start_url)
         if len(frontier) > self.config.max_pages:
-            print(f"  [WARNING] Capping frontier from {len(frontier)} to {self.config.max_pages}", file=sys.stderr)
+            print(f"  [WARNING] Capping frontier from {len(frontier)} to {self.config.max_pages} (lowest-priority URLs dropped)", file=sys.stderr)
             frontier = frontier[:self.config.max_pages]
 
-        # --- FR4a: Sample crawl for selector refinement ---
-        print("[4/7] Sample crawl for selector refinement...", file=sys.stderr)
-        sample_size = min(SAMPLE_CRAWL_SIZE, len(frontier))
-        sample_frontier = frontier[:sample_size]
+        if previous_manifest is None and self.config.markdown_source:
+            decision.markdown_source = discovery.probe_markdown_source([r.url for r in frontier])
+            report_path.write_text(decision.model_dump_json(indent=2), encoding="utf-8")
+        self.markdown_source = decision.markdown_source
 
-        crawler = Crawler(
-            engine_mode=engine_mode,
-            selector_spec=analysis.selector_spec,
-            output_dir=str(self.output_dir),
-            max_workers=self.config.max_workers,
-        )
-        try:
-            sample_manifest = crawler.crawl(sample_frontier)
-        finally:
-            crawler.close()
+        if previous_manifest is not None:
+            # --- FR4 (incremental): revalidate pages from the previous run ---
+            manifest, changed_files = self._crawl_incremental(
+                frontier, engine_mode, analysis, previous_manifest,
+            )
+        else:
+            # --- FR4a/b: Sample crawl + LLM selector refinement ---
+            if profiled:
+                print(f"[4/7] Sample crawl skipped: selectors from the built-in {profile.profile.name} profile\n", file=sys.stderr)
+            elif self.deadline.remaining() < 0.5 * (self.deadline.budget or 0):
+                print("[4/7] Sample crawl skipped: less than half of the time budget left\n", file=sys.stderr)
+            else:
+                self._sample_and_refine(frontier, engine_mode, analysis, analyzer, start_html, prefetcher)
 
-        success_rate = sample_manifest.total_pages / len(sample_frontier) if sample_frontier else 0
-        print(f"  → Sample: {sample_manifest.total_pages}/{sample_size} pages (success rate: {success_rate:.1%})", file=sys.stderr)
+            if prefetcher is not None:
+                prefetcher.stop()
 
-        # --- FR4b: LLM Selector Refinement ---
-        print("[5/7] LLM Selector Refinement...", file=sys.stderr)
-        raw_dir = self.output_dir / "md" / "raw"
-        sample_md_contents = self._read_sample_md(raw_dir, max_files=3)
+            # --- FR4c: Full crawl with refined selectors ---
+            self._clear_sample_output()
+            manifest = self._crawl_with_quality_check(
+                frontier, engine_mode, analysis, analyzer,
+                base_url, start_html, sample_links, full_frontier,
+                validated=validated,
+            )
+            changed_files = None
 
-        if sample_md_contents:
-            refined_spec = analyzer.refine_selectors(
-                current_analysis=analysis,
-                sample_md_contents=sample_md_contents,
+        return self._finish(manifest, changed_files, start)
+
+    def _run_streaming(self, engine_mode, decision, report_path, base_url, start) -> Path:
+        """FR2-FR4c with discovery as a producer (frontier_stream.py).
+
+        Only the quick sample runs before analysis. Sitemaps, llms.txt and
+        the search index are read on a producer thread while the LLM works
+        and the crawl runs; scope rules and the locale filter are applied
+        as URLs come off the stream, and the crawl takes the first
+        max_pages of them. The sample crawl uses the in-scope sample pages.
+        """
+        print("[2/7] URL Discovery (streaming)...", file=sys.stderr)
+        discovery = DiscoveryWorker(
+            engine_mode=engine_mode,
+            store=self.store,
+            deadline=self._crawl_deadline(),
+            blocklist=self.config.resource_blocklist,
+        )
+        start_html, sample_links = discovery.sample(self.config.start_url, max_pages=10)
+        stream = FrontierStream(limit=self.config.max_pages)
+        producer = threading.Thread(
+            target=self._produce, args=(discovery, stream, start_html, sample_links), daemon=True,
+        )
+        producer.start()
+        print(file=sys.stderr)
+
+        # --- FR3: LLM Analyzer (the producer keeps discovering meanwhile) ---
+        print("[3/7] LLM Analysis (scope + selectors)...", file=sys.stderr)
+        analyzer = LLMAnalyzer(model=self.config.llm_model_analyzer)
+        profile = fingerprint(start_html) if self.config.site_profiles else None
+        profiled = profile is not None and profile.confidence >= HIGH_CONFIDENCE
+        if profiled:
+            analysis = profile_analysis(profile, self.config.start_url, base_url)
+        else:
+            analysis = analyzer.analyze(
                 start_url=self.config.start_url,
+                base_url=base_url,
                 start_html=start_html,
+                sample_links=sample_links,
+                sample_htmls=list(discovery.sample_pages.values())[1:],
+                deadline=self.deadline,
             )
-            analysis.selector_spec = refined_spec
+        scope, keep_locale = analysis.scope_rules, same_locale(self.config.start_url)
+        stream.accept = lambda record: scope.url_matches(record.url) and keep_locale(record)
+        print(f"  → Content selector: {analysis.selector_spec.content_selector}", file=sys.stderr)
+        print(f"  → Prune selectors: {len(analysis.selector_spec.prune_selectors)}", file=sys.stderr)
+        print(file=sys.stderr)
 
-            # Save refined analysis
-            analysis_path.write_text(analysis.model_dump_json(indent=2), encoding="utf-8")
+        validated = False
+        if self.config.selector_scoring:
+            validated = self._score_selectors(
+                analysis, analyzer, profile, profiled, discovery.sample_pages, engine_mode,
+            )
+        analysis_path = self.output_dir / "llm-analysis.json"
+        analysis_path.write_text(analysis.model_dump_json(indent=2), encoding="utf-8")
+
+        # Sample pages are already in the store: probe and sample-crawl them
+        sampled = [UrlRecord(url=url, source="quick-sample") for url in discovery.sample_pages]
+        sampled = prioritize([r for r in sampled if stream.accept(r)], self.config.start_url)
+        if self.config.markdown_source:
+            decision.markdown_source = discovery.probe_markdown_source([r.url for r in sampled])
+            report_path.write_text(decision.model_dump_json(indent=2), encoding="utf-8")
+        self.markdown_source = decision.markdown_source
+
+        if profiled:
+            print(f"[4/7] Sample crawl skipped: selectors from the built-in {profile.profile.name} profile\n", file=sys.stderr)
+        elif not sampled:
+            print("[4/7] Sample crawl skipped: no in-scope sample pages\n", file=sys.stderr)
+        elif self.deadline.remaining() < 0.5 * (self.deadline.budget or 0):
+            print("[4/7] Sample crawl skipped: less than half of the time budget left\n", file=sys.stderr)
         else:
-            print(f"  [refine] No sample content available, skipping refinement", file=sys.stderr)
+            self._sample_and_refine(sampled, engine_mode, analysis, analyzer, start_html)
 
-        # --- FR4c: Full crawl with refined selectors ---
-        # Clean up sample crawl output
+        # --- FR4c: Full crawl, fed by the producer ---
+        self._clear_sample_output()
+        try:
+            manifest = self._crawl_with_quality_check(
+                stream, engine_mode, analysis, analyzer,
+                base_url, start_html, sample_links, stream.discovered,
+                validated=validated,
+            )
+        finally:
+            stream.cancel()  # a producer still reading sitemaps stops at its next URL
+        print(
+            f"  → Stream: {len(stream.discovered)} URLs discovered, {len(stream.records)} taken, "
+            f"{stream.dropped} dropped by scope/locale\n",
+            file=sys.stderr,
+        )
+        return self._finish(manifest, None, start)
+
+    def _produce(self, discovery: DiscoveryWorker, stream: FrontierStream, start_html: str, sample_links):
+        """Producer thread: put discovered UrlRecords on *stream* until discovery ends or the crawl stops."""
+        try:
+            for record in discovery.stream_records(self.config.start_url, start_html, sample_links):
+                if not stream.put(record):
+                    break
+        finally:
+            stream.close()
+
+    def _clear_sample_output(self):
+        """Remove md/raw written by the sample crawl before the full crawl."""
+        raw_dir = self.output_dir / "md" / "raw"
         if raw_dir.exists():
             try:
                 shutil.rmtree(raw_dir)
@@ -157,14 +405,13 @@ class Pipeline:
                 shutil.rmtree(raw_dir, ignore_errors=True)
             raw_dir.mkdir(parents=True, exist_ok=True)
 
-        manifest = self._crawl_with_quality_check(
-            frontier, engine_mode, analysis, analyzer,
-            base_url, start_html, sample_links, full_frontier,
-        )
+    def _finish(self, manifest: Manifest, changed_files: Optional[List[Path]], start: float) -> Path:
+        """FR4d + FR5: dedup, AGENTS.md / manifest.json, then drop the crawl journal."""
+        raw_dir = self.output_dir / "md" / "raw"
 
         # --- FR4d: Cross-page dedup ---
         print("[6/7] Cross-page deduplication...", file=sys.stderr)
-        deduplicate_crawl_output(raw_dir)
+        deduplicate_crawl_output(raw_dir, files=changed_files, blocks_path=self.output_dir / DEDUP_BLOCKS_FILENAME)
 
         # --- FR5: AGENTS.md index ---
         print("[7/7] AGENTS.md index generation...", file=sys.stderr)
@@ -174,6 +421,12 @@ class Pipeline:
             output_dir=str(self.output_dir),
             doc_name=self.config.name,
         )
+        if self.crawl_cut_short:
+            # Partial but consistent output; the journal lets --resume finish the frontier
+            print("  [checkpoint] Crawl stopped by time budget — run again with --resume to continue", file=sys.stderr)
+        else:
+            # manifest.json is on disk now — nothing left to resume
+            self.journal.remove()
 
         elapsed = time.time() - start
         print(f"\n{'='*60}", file=sys.stderr)
@@ -185,6 +438,396 @@ class Pipeline:
 
         return agents_path
 
+    def _resume_crawl(self, checkpoint: CrawlCheckpoint) -> Manifest:
+        """Finish an interrupted full crawl from its journal.
+
+        Journaled pages are kept as-is; only the rest of the frontier is
+        fetched, with the engine and selectors the crawl started with.
+        Engine selection, discovery, LLM analysis and the quality-retry
+        loop are not re-run.
+        """
+        remaining = checkpoint.remaining()
+        print(
+            f"[4/7] Resuming crawl: {len(checkpoint.entries)} pages done, {len(remaining)} remaining...",
+            file=sys.stderr,
+        )
+        self.journal.reopen()
+        self.markdown_source = checkpoint.markdown_source
+        crawler = self._make_crawler(
+            checkpoint.engine_mode, checkpoint.selector_spec,
+            archive=self.config.archive, archive_append=True, journal=self.journal,
+        )
+        try:
+            manifest = crawler.crawl(remaining)
+        finally:
+            crawler.close()
+        self.crawl_cut_short = crawler.skipped > 0
+
+        manifest.entries = checkpoint.entries + manifest.entries
+        manifest.start_url = self.config.start_url
+        manifest.engine_mode = checkpoint.engine_mode.value
+        manifest.total_pages = manifest.total_files = len(manifest.entries)
+        print(f"  → Final: {manifest.total_pages}/{len(checkpoint.frontier)} pages\n", file=sys.stderr)
+        return manifest
+
+    def _scrape_llms_txt(self) -> Optional[Tuple[Manifest, Optional[List[Path]]]]:
+        """Write md/raw from llms-full.txt / llms.txt Markdown; None if the site has none."""
+        print("[0/7] Probing llms-full.txt / llms.txt...", file=sys.stderr)
+        pages = DiscoveryWorker(deadline=self.deadline).probe_llms_txt(
+            self.config.start_url, max_pages=self.config.max_pages,
+        )
+        if not pages:
+            print("  → Not published, running the full pipeline\n", file=sys.stderr)
+            return None
+        return self._write_published(pages, "llms.txt")
+
+    def _scrape_search_index(self) -> Optional[Tuple[Manifest, Optional[List[Path]]]]:
+        """Write md/raw from the text in the site's search index; None if it has no full text."""
+        print("[0/7] Probing the site's search index...", file=sys.stderr)
+        pages = DiscoveryWorker(store=self.store, deadline=self.deadline).probe_search_index(self.config.start_url)
+        if not has_full_text(pages):
+            print("  → No full-text search index, running the full pipeline\n", file=sys.stderr)
+            return None
+        return self._write_published(pages[:self.config.max_pages], "search-index")
+
+    def _write_published(self, pages, source: str) -> Tuple[Manifest, Optional[List[Path]]]:
+        """Write pages (url, title, markdown) published by the site as md/raw files.
+
+        With incremental=True, unchanged pages keep their (deduplicated)
+        file and only new or changed files are returned for dedup.
+        """
+        raw_dir = self.output_dir / "md" / "raw"
+        manifest_path = self.output_dir / "manifest.json"
+        previous: Dict[str, ManifestEntry] = {}
+        if self.config.incremental and manifest_path.exists():
+            previous_manifest = Manifest.model_validate_json(manifest_path.read_text(encoding="utf-8"))
+            previous = {e.url: e for e in previous_manifest.entries}
+        else:
+            shutil.rmtree(raw_dir, ignore_errors=True)
+        raw_dir.mkdir(parents=True, exist_ok=True)
+
+        extractor = PageExtractor(SelectorSpec(), str(raw_dir))
+        entries: List[ManifestEntry] = []
+        changed: List[Path] = []
+        for page in pages:
+            markdown = extractor.cleaner.clean(page.markdown).strip()
+            if len(markdown) < 20:
+                continue
+            prev = previous.get(page.url)
+            record = UrlRecord(url=page.url, title=page.title, source=source)
+            entry = extractor.write_page(record, page.title or page.url, markdown, prev.content_hash if prev else "")
+            entries.append(entry)
+            if prev is None or prev.content_hash != entry.content_hash:
+                changed.append(raw_dir / entry.md_raw_path)
+
+        current = {e.md_raw_path for e in entries}
+        for entry in previous.values():
+            if entry.md_raw_path not in current:
+                (raw_dir / entry.md_raw_path).unlink(missing_ok=True)
+
+        print(f"  → {len(entries)} pages from {source} "
+              f"(engine selection, analysis and crawl skipped)\n", file=sys.stderr)
+        manifest = Manifest(
+            start_url=self.config.start_url,
+            engine_mode=source,
+            total_pages=len(entries),
+            total_files=len(entries),
+            entries=entries,
+        )
+        return manifest, (changed if previous else None)
+
+    def _start_prefetch(self, frontier, engine_mode) -> Optional[Prefetcher]:
+        """Background fetch of the best in-prefix URLs during analysis (prefetch.py)."""
+        candidates = prioritize(in_prefix(frontier, self.config.start_url), self.config.start_url)[:self.config.max_pages]
+        if not candidates:
+            return None
+        return Prefetcher(self._make_crawler(engine_mode, SelectorSpec()), candidates).start()
+
+    def _sample_and_refine(self, frontier, engine_mode, analysis, analyzer, start_html, prefetcher=None):
+        """FR4a/b: crawl a few pages, then let the LLM refine prune selectors.
+
+        Updates analysis.selector_spec in place and saves llm-analysis.json.
+        A running *prefetcher* keeps going, minus the sample URLs.
+        """
+        print("[4/7] Sample crawl for selector refinement...", file=sys.stderr)
+        sample_size = min(SAMPLE_CRAWL_SIZE, len(frontier))
+        sample_frontier = frontier[:sample_size]
+        if prefetcher is not None:
+            prefetcher.exclude(r.url for r in sample_frontier)
+
+        crawler = self._make_crawler(engine_mode, analysis.selector_spec)
+        try:
+            sample_manifest = crawler.crawl(sample_frontier)
+        finally:
+            crawler.close()
+
+        success_rate = sample_manifest.total_pages / len(sample_frontier) if sample_frontier else 0
+        print(f"  → Sample: {sample_manifest.total_pages}/{sample_size} pages (success rate: {success_rate:.1%})", file=sys.stderr)
+
+        print("[5/7] LLM Selector Refinement...", file=sys.stderr)
+        raw_dir = self.output_dir / "md" / "raw"
+        sample_md_contents = self._read_sample_md(raw_dir, max_files=3)
+
+        if sample_md_contents:
+            refined_spec = analyzer.refine_selectors(
+                current_analysis=analysis,
+                sample_md_contents=sample_md_contents,
+                start_url=self.config.start_url,
+                start_html=start_html,
+                deadline=self.deadline,
+            )
+            analysis.selector_spec = refined_spec
+
+            # Save refined analysis
+            analysis_path = self.output_dir / "llm-analysis.json"
+            analysis_path.write_text(analysis.model_dump_json(indent=2), encoding="utf-8")
+        else:
+            print(f"  [refine] No sample content available, skipping refinement", file=sys.stderr)
+
+    def _score_selectors(self, analysis, analyzer, profile, profiled, sample_pages, engine_mode) -> bool:
+        """Score candidate selectors on the in-scope sample pages; keep the best.
+
+        Replaces analysis.selector_spec when another candidate clearly wins.
+        Returns True if the chosen selectors matched enough pages to skip
+        re-analysis after the full crawl.
+        """
+        in_scope = [(url, html) for url, html in sample_pages.items() if analysis.scope_rules.url_matches(url)]
+        pages = stratified_pages(in_scope, self.config.start_url)
+        if len(pages) < MIN_SCORING_PAGES:
+            print(f"  [scoring] {len(pages)} in-scope sample pages — selector scoring skipped\n", file=sys.stderr)
+            return False
+
+        incumbent = "profile" if profiled else "analysis"
+        candidates = [(incumbent, analysis.selector_spec)]
+        detected = analyzer.detected if not profiled else detect_selectors(list(sample_pages.values()))
+        if detected is not None:
+            candidates.append(("offline", detected))
+        if profile is not None and not profiled:
+            candidates.append((f"profile:{profile.profile.name}", profile_spec(profile)))
+        winner = self._pick_selectors(analysis, incumbent, candidates, pages, engine_mode, "sample")
+        print(file=sys.stderr)
+        return winner is not None and winner.match_rate >= VALIDATED_MATCH_RATE
+
+    def _switch_selectors_mid_crawl(
+        self, stats, pages, analysis, analyzer, base_url, start_html, sample_links, engine_mode,
+    ) -> Optional[SelectorSpec]:
+        """Crawler.on_poor_quality: re-analyze, then keep what scores best on the crawled pages.
+
+        Only the selectors change; the frontier being crawled stays as it is.
+        """
+        reanalysis = analyzer.reanalyze_selectors(
+            start_url=self.config.start_url,
+            base_url=base_url,
+            start_html=start_html,
+            previous_selector=analysis.selector_spec.content_selector,
+            crawl_success_rate=stats.success_rate,
+            total_pages=stats.pages,
+            sample_links=sample_links,
+            deadline=self.deadline,
+        )
+        candidates = [("current", analysis.selector_spec), ("reanalysis", reanalysis.selector_spec)]
+        detected = detect_selectors([html for _, html in pages])
+        if detected is not None:
+            candidates.append(("offline", detected))
+        scored = stratified_pages(pages, self.config.start_url)
+        winner = self._pick_selectors(analysis, "current", candidates, scored, engine_mode, "crawled")
+        if winner is None or winner.source == "current":
+            return None
+        return winner.spec
+
+    def _pick_selectors(self, analysis, incumbent, candidates, pages, engine_mode, label):
+        """Score *candidates* plus the generic fallbacks on *pages*; adopt a winner other than *incumbent*."""
+        candidates = list(candidates) + [
+            (f"fallback:{sel}", SelectorSpec(content_selector=sel, prune_selectors=FALLBACK_PRUNE_SELECTORS,
+                                             notes="Generic fallback selector"))
+            for sel in FALLBACK_CONTENT_SELECTORS
+        ]
+        t0 = time.time()
+        scores = score_candidates(candidates, pages, hydrate=engine_mode == EngineMode.HYDRATION)
+        print(f"  [scoring] {len(scores)} candidate selectors on {len(pages)} {label} pages ({time.time() - t0:.2f}s):", file=sys.stderr)
+        for s in scores:
+            print(f"    {s.score:.2f}  {s.source:<24} {s.spec.content_selector!r} "
+                  f"(match {s.match_rate:.0%}, boilerplate {s.boilerplate:.0%}, ~{s.median_chars} chars)", file=sys.stderr)
+        winner = pick_winner(scores, incumbent)
+        if winner is not None and winner.source != incumbent:
+            print(f"  → Selectors from {winner.source}: {winner.spec.content_selector}", file=sys.stderr)
+            analysis.selector_spec = winner.spec
+            analysis_path = self.output_dir / "llm-analysis.json"
+            analysis_path.write_text(analysis.model_dump_json(indent=2), encoding="utf-8")
+        return winner
+
+    def _load_previous_run(self) -> Optional[Tuple[Manifest, EngineDecision, LLMAnalysis]]:
+        """Load manifest, engine decision and analysis written by the last run.
+
+        Returns None (→ full scrape) when any of them is missing.
+        """
+        paths = [self.output_dir / name for name in ("manifest.json", "engine-decision.json", "llm-analysis.json")]
+        missing = [p.name for p in paths if not p.exists()]
+        if missing:
+            print(f"  [incremental] No previous run found (missing {', '.join(missing)}) — full scrape", file=sys.stderr)
+            return None
+        manifest = Manifest.model_validate_json(paths[0].read_text(encoding="utf-8"))
+        decision = EngineDecision.model_validate_json(paths[1].read_text(encoding="utf-8"))
+        analysis = LLMAnalysis.model_validate_json(paths[2].read_text(encoding="utf-8"))
+        print(f"  [incremental] Previous run: {manifest.total_pages} pages", file=sys.stderr)
+        return manifest, decision, analysis
+
+    def _crawl_incremental(self, frontier, engine_mode, analysis, previous: Manifest):
+        """Revalidate the frontier against the previous manifest.
+
+        Pages answering 304 (ETag / Last-Modified) are kept without a download;
+        re-downloaded pages whose content hash is unchanged are not rewritten.
+        Files for URLs that left the frontier are deleted; URLs that only failed
+        to fetch this time keep their previous file.
+
+        Returns (manifest, paths of new or changed markdown files).
+        """
+        print("[4/7] Incremental crawl (conditional GET + content hash)...", file=sys.stderr)
+        raw_dir = self.output_dir / "md" / "raw"
+        previous_entries = {e.url: e for e in previous.entries}
+
+        crawler = self._make_crawler(
+            engine_mode, analysis.selector_spec,
+            archive=self.config.archive, archive_append=True, previous=previous_entries,
+        )
+        try:
+            manifest = crawler.crawl(frontier)
+        finally:
+            crawler.close()
+
+        frontier_urls = {r.url for r in frontier}
+        crawled_urls = {e.url for e in manifest.entries}
+        kept, removed = 0, 0
+        for entry in previous.entries:
+            if entry.url in crawled_urls:
+                continue
+            if entry.url in frontier_urls and (raw_dir / entry.md_raw_path).exists():
+                manifest.entries.append(entry)
+                kept += 1
+            else:
+                (raw_dir / entry.md_raw_path).unlink(missing_ok=True)
+                removed += 1
+
+        manifest.start_url = self.config.start_url
+        manifest.engine_mode = engine_mode.value
+        manifest.total_pages = manifest.total_files = len(manifest.entries)
+        print(
+            f"  → {len(crawler.changed_paths)} new/changed, {crawler.unchanged} unchanged, "
+            f"{kept} kept after fetch failure, {removed} removed\n",
+            file=sys.stderr,
+        )
+        return manifest, [raw_dir / p for p in crawler.changed_paths]
+
+    def reprocess(self, selector_spec: Optional[SelectorSpec] = None) -> Path:
+        """Rebuild md/raw, manifest.json and AGENTS.md from archive.warc.gz.
+
+        No network access. Uses *selector_spec* if given (and records it in
+        llm-analysis.json), otherwise the selectors saved by the last scrape.
+        Returns path to the regenerated AGENTS.md.
+        """
+        start = time.time()
+        archive_path = self.output_dir / ARCHIVE_FILENAME
+        if not archive_path.exists():
+            raise FileNotFoundError(f"No archive at {archive_path} — scrape with --archive first")
+
+        analysis_path = self.output_dir / "llm-analysis.json"
+        if selector_spec is None:
+            selector_spec = self.saved_selector_spec()
+        elif analysis_path.exists():
+            analysis = LLMAnalysis.model_validate_json(analysis_path.read_text(encoding="utf-8"))
+            analysis.selector_spec = selector_spec
+            analysis_path.write_text(analysis.model_dump_json(indent=2), encoding="utf-8")
+
+        engine_mode = EngineMode.CURL
+        decision_path = self.output_dir / "engine-decision.json"
+        if decision_path.exists():
+            engine_mode = EngineMode(json.loads(decision_path.read_text(encoding="utf-8"))["mode"])
+
+        print(f"[reprocess] Reading {archive_path}...", file=sys.stderr)
+        index = archive_index(archive_path)
+        print(f"  → {len(index)} archived pages", file=sys.stderr)
+        print(f"  → Content selector: {selector_spec.content_selector}", file=sys.stderr)
+
+        raw_dir = self.output_dir / "md" / "raw"
+        shutil.rmtree(raw_dir, ignore_errors=True)
+        raw_dir.mkdir(parents=True, exist_ok=True)
+
+        crawler = self._make_crawler(engine_mode, selector_spec)
+        if crawler.extract_processes <= 0:
+            crawler.extract_processes = os.cpu_count() or 1
+        # Streamed: pages are read from the archive as the extraction pool takes them
+        pages = ((UrlRecord(url=url), html) for url, html in iter_latest(archive_path, index))
+        manifest = crawler.extract_pages(pages, total=len(index))
+        manifest.start_url = self.config.start_url
+        self._carry_validators(manifest)
+
+        deduplicate_crawl_output(raw_dir, blocks_path=self.output_dir / DEDUP_BLOCKS_FILENAME)
+        agents_path = Grouper().group_and_package(
+            manifest=manifest,
+            output_dir=str(self.output_dir),
+            doc_name=self.config.name,
+        )
+        print(f"[reprocess] {manifest.total_pages}/{len(index)} pages in {time.time() - start:.1f}s", file=sys.stderr)
+        return agents_path
+
+    def _carry_validators(self, manifest: Manifest):
+        """Copy etag / last_modified / lastmod from the manifest.json being replaced.
+
+        The archive only holds HTML; without this a reprocessed manifest
+        would make the next incremental scrape refetch every page.
+        """
+        manifest_path = self.output_dir / "manifest.json"
+        if not manifest_path.exists():
+            return
+        previous = {e.url: e for e in Manifest.model_validate_json(manifest_path.read_text(encoding="utf-8")).entries}
+        for entry in manifest.entries:
+            old = previous.get(entry.url)
+            if old is not None:
+                entry.etag, entry.last_modified, entry.lastmod = old.etag, old.last_modified, old.lastmod
+
+    def saved_selector_spec(self) -> SelectorSpec:
+        """SelectorSpec recorded in llm-analysis.json by the last scrape (or defaults)."""
+        analysis_path = self.output_dir / "llm-analysis.json"
+        if not analysis_path.exists():
+            return SelectorSpec()
+        return LLMAnalysis.model_validate_json(analysis_path.read_text(encoding="utf-8")).selector_spec
+
+    def _make_crawler(
+        self, engine_mode: EngineMode, selector_spec: SelectorSpec,
+        archive: bool = False, archive_append: bool = False,
+        previous: Optional[Dict[str, ManifestEntry]] = None,
+        journal: Optional[CrawlJournal] = None,
+        monitor: Optional[QualityMonitor] = None,
+        on_poor_quality=None,
+    ) -> Crawler:
+        return Crawler(
+            engine_mode=engine_mode,
+            selector_spec=selector_spec,
+            output_dir=str(self.output_dir),
+            max_workers=self.config.max_workers,
+            async_fetch=self.config.async_fetch,
+            async_concurrency=self.config.async_concurrency,
+            extract_processes=self.config.extract_processes,
+            store=self.store,
+            archive_path=str(self.output_dir / ARCHIVE_FILENAME) if archive else None,
+            archive_append=archive_append,
+            previous=previous,
+            journal=journal,
+            deadline=self._crawl_deadline(),
+            politeness=self.politeness,
+            browsers=self.config.browsers,
+            blocklist=self.config.resource_blocklist,
+            markdown_source=self.markdown_source,
+            monitor=monitor,
+            on_poor_quality=on_poor_quality,
+        )
+
+    def _crawl_deadline(self) -> Deadline:
+        """Overall deadline minus the time kept back for dedup + AGENTS.md."""
+        if not self.deadline.enabled:
+            return self.deadline
+        return self.deadline.reserve(min(FINALIZE_RESERVE_MAX_S, FINALIZE_RESERVE_SHARE * self.deadline.budget))
+
     def _filter_locale_duplicates(self, frontier: List, start_url: str) -> List:
         """Remove locale/version duplicates from frontier.
 
@@ -194,29 +837,15 @@ class Pipeline:
         if len(frontier) < 10:
             return frontier
 
-        parsed_start = urlparse(start_url)
-        start_path = parsed_start.path.rstrip("/")
-
-        # Common locale patterns: /en/, /ja/, /ko/, /zh-hans/, /pt-br/, /en-us/, etc.
-        locale_re = re.compile(
-            r"^/([a-z]{2}(?:-[a-z]{2,8})?)/",
-            re.IGNORECASE,
-        )
-
-        # Detect locale prefix of start URL
-        start_locale_match = locale_re.match(start_path)
-        if not start_locale_match:
+        start_locale = url_locale(start_url.rstrip("/"))
+        if start_locale is None:
             return frontier
 
-        start_locale = start_locale_match.group(1).lower()
-
         # Count how many distinct locales appear in frontier
         locale_counts: dict = {}
         for r in frontier:
-            path = urlparse(r.url).path
-            m = locale_re.match(path)
-            if m:
-                loc = m.group(1).lower()
+            loc = url_locale(r.url)
+            if loc:
                 locale_counts[loc] = locale_counts.get(loc, 0) + 1
 
         # Only filter if there are multiple locales with significant counts
@@ -226,16 +855,8 @@ class Pipeline:
 
         # Keep only URLs matching start locale (or URLs without a locale prefix)
         before = len(frontier)
-        filtered = []
-        for r in frontier:
-            path = urlparse(r.url).path
-            m = locale_re.match(path)
-            if m:
-                loc = m.group(1).lower()
-                if loc == start_locale:
-                    filtered.append(r)
-            else:
-                filtered.append(r)
+        keep = same_locale(start_url)
+        filtered = [r for r in frontier if keep(r)]
 
         if len(filtered) < before:
             removed_locales = [loc for loc in significant_locales if loc != start_locale]
@@ -262,38 +883,72 @@ class Pipeline:
     def _crawl_with_quality_check(
         self, frontier, engine_mode, analysis, analyzer,
         base_url, start_html, sample_links, full_frontier,
+        validated: bool = False,
     ):
         """Crawl with quality feedback loop.
 
         If crawl success rate is below MIN_CRAWL_SUCCESS_RATE, re-analyze
         selectors with LLM feedback and re-crawl up to MAX_CRAWL_RETRIES times.
+        Selectors *validated* by scoring before the crawl are not re-analyzed.
+
+        With quality_monitor on, the crawler watches its own success rate and
+        switches selectors mid-crawl (_switch_selectors_mid_crawl); after such
+        a switch the crawl is not repeated either.
+
+        *frontier* may be a FrontierStream; a retry crawls the URLs it
+        discovered (*full_frontier*) as a list.
         """
-        for attempt in range(MAX_CRAWL_RETRIES + 1):
+        max_retries = 0 if validated else MAX_CRAWL_RETRIES
+        for attempt in range(max_retries + 1):
             attempt_label = f" (attempt {attempt + 1})" if attempt > 0 else ""
             step = "4/7" if attempt == 0 else "4/7"
             print(f"[{step}] Crawling & Transforming{attempt_label}...", file=sys.stderr)
 
-            crawler = Crawler(
-                engine_mode=engine_mode,
-                selector_spec=analysis.selector_spec,
-                output_dir=str(self.output_dir),
-                max_workers=self.config.max_workers,
+            # A streamed frontier is journaled URL by URL as the crawler takes it
+            streamed = isinstance(frontier, FrontierStream)
+            self.journal.begin(
+                self.config.start_url, engine_mode, analysis.selector_spec, [] if streamed else frontier,
+                markdown_source=self.markdown_source,
+            )
+            monitor = QualityMonitor(MIN_CRAWL_SUCCESS_RATE) if self.config.quality_monitor else None
+            crawler = self._make_crawler(
+                engine_mode, analysis.selector_spec,
+                archive=self.config.archive, journal=self.journal,
+                monitor=monitor,
+                on_poor_quality=lambda stats, pages: self._switch_selectors_mid_crawl(
+                    stats, pages, analysis, analyzer, base_url, start_html, sample_links, engine_mode),
             )
             try:
                 manifest = crawler.crawl(frontier)
             finally:
                 crawler.close()
+            self.crawl_cut_short = crawler.skipped > 0
+            if crawler.selector_switched:
+                max_retries = attempt  # selectors were already re-analyzed mid-crawl
+            if streamed:
+                frontier = frontier.records
 
             manifest.start_url = self.config.start_url
             manifest.engine_mode = engine_mode.value
 
             # --- Quality check ---
-            success_rate = manifest.total_pages / len(frontier) if frontier else 0
-            print(f"  → Crawled {manifest.total_pages}/{len(frontier)} pages (success rate: {success_rate:.1%})", file=sys.stderr)
+            # Pages the time budget never started are not failures
+            attempted = len(frontier) - crawler.skipped
+            success_rate = manifest.total_pages / attempted if attempted else 0
+            print(f"  → Crawled {manifest.total_pages}/{attempted} pages (success rate: {success_rate:.1%})", file=sys.stderr)
 
-            if success_rate >= MIN_CRAWL_SUCCESS_RATE or attempt >= MAX_CRAWL_RETRIES:
+            if self.deadline.expired():
+                print(f"  → Final: {manifest.total_pages} pages (time budget used up, no re-analysis)\n", file=sys.stderr)
+                return manifest
+            if success_rate >= MIN_CRAWL_SUCCESS_RATE or attempt >= max_retries:
                 if success_rate < MIN_CRAWL_SUCCESS_RATE:
-                    print(f"  [WARNING] Low success rate ({success_rate:.1%}) but max retries reached", file=sys.stderr)
+                    if crawler.selector_switched:
+                        reason = "selectors were already switched mid-crawl"
+                    elif validated:
+                        reason = "selectors were validated before the crawl"
+                    else:
+                        reason = "max retries reached"
+                    print(f"  [WARNING] Low success rate ({success_rate:.1%}) but {reason}", file=sys.stderr)
                 print(f"  → Final: {manifest.total_pages} pages into {manifest.total_files} files\n", file=sys.stderr)
                 return manifest
 
@@ -313,9 +968,11 @@ class Pipeline:
                 crawl_success_rate=success_rate,
                 total_pages=len(frontier),
                 sample_links=sample_links,
+                deadline=self.deadline,
             )
 
             frontier = [r for r in full_frontier if analysis.scope_rules.url_matches(r.url)]
+            frontier = prioritize(frontier, self.config.start_url)
             if len(frontier) > self.config.max_pages:
                 frontier = frontier[:self.config.max_pages]
 
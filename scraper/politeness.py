@@ -0,0 +1,249 @@
+"""Per-host politeness and adaptive concurrency for the crawler.
+
+Every network fetch is bracketed by acquire(url) / release(url, ...):
+
+- In-flight requests per host are capped by a limit that adapts AIMD-style:
+  it doubles per round trip at first (slow start), then grows by ~1 per
+  round trip while responses stay fast, and is halved on 429/503, network
+  errors, 5xx or latency far above the host's baseline.
+- 429/503 with Retry-After pause the whole host, not just one URL.
+- robots.txt Crawl-delay spaces request starts.
+
+Retries are never slept inside a worker: retry_delay() tells the caller
+when a URL may be tried again, and the crawler re-queues it.
+"""
+import asyncio
+import random
+import sys
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+
+INITIAL_LIMIT = 2
+MIN_LIMIT = 1
+LATENCY_FACTOR = 3.0          # EWMA latency above baseline × this → congestion
+LATENCY_MIN_RISE = 0.25       # ...and at least this many seconds above it
+LATENCY_ALPHA = 0.2           # EWMA smoothing
+THROTTLE_STATUSES = (429, 503)
+DEFAULT_THROTTLE_PAUSE = 5.0  # 429/503 without Retry-After
+MAX_RETRY_AFTER = 120.0
+MAX_CRAWL_DELAY = 30.0
+ROBOTS_AGENT = "AnyDocsMCP"
+ASYNC_POLL_S = 0.05
+
+_robots_cache: Dict[str, float] = {}
+_robots_lock = threading.Lock()
+
+
+class HostState:
+    """Adaptive limit and pacing for one host."""
+
+    def __init__(self, max_limit: int):
+        self.max_limit = max(max_limit, MIN_LIMIT)
+        self.limit = float(min(INITIAL_LIMIT, self.max_limit))
+        self.in_flight = 0
+        self.slow_start = True
+        self.not_before = 0.0       # Retry-After pause
+        self.crawl_delay = 0.0
+        self.last_start = 0.0
+        self.latency: Optional[float] = None
+        self.baseline: Optional[float] = None
+        self.last_decrease = 0.0
+
+    def wait_time(self, now: float) -> float:
+        """0 if a request may start now, else seconds to wait before checking again."""
+        wait = max(self.not_before - now, self.last_start + self.crawl_delay - now, 0.0)
+        if wait > 0:
+            return wait
+        if self.in_flight >= int(self.limit):
+            return -1.0  # capacity full: wait for a release
+        return 0.0
+
+    def increase(self):
+        if self.slow_start:
+            self.limit = min(self.limit + 1, self.max_limit)
+        else:
+            self.limit = min(self.limit + 1 / self.limit, self.max_limit)
+
+    def decrease(self, now: float):
+        # At most once per round trip, so one burst of errors halves only once
+        if now - self.last_decrease < (self.latency or 1.0):
+            return
+        self.limit = max(self.limit / 2, MIN_LIMIT)
+        self.slow_start = False
+        self.last_decrease = now
+
+
+class PolitenessController:
+    def __init__(self, max_per_host: int = 10):
+        self.max_per_host = max_per_host
+        self._hosts: Dict[str, HostState] = {}
+        self._cond = threading.Condition()
+
+    # ------------------------------------------------------------------
+    # Acquire / release
+    # ------------------------------------------------------------------
+
+    def acquire(self, url: str):
+        """Block the calling thread until *url*'s host may take another request."""
+        host = urlparse(url).netloc
+        with self._cond:
+            while True:
+                wait = self._try_start(host)
+                if wait == 0:
+                    return
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    async def acquire_async(self, url: str):
+        """Event-loop variant of acquire(); waits without blocking the loop."""
+        host = urlparse(url).netloc
+        while True:
+            with self._cond:
+                wait = self._try_start(host)
+            if wait == 0:
+                return
+            await asyncio.sleep(wait if wait > 0 else ASYNC_POLL_S)
+
+    def release(self, url: str, status: int, latency: float, retry_after: Optional[str] = None):
+        """Report a finished request. *status* 0 means a network error or timeout."""
+        host = urlparse(url).netloc
+        now = time.monotonic()
+        with self._cond:
+            state = self._state(host)
+            state.in_flight = max(state.in_flight - 1, 0)
+
+            if status in THROTTLE_STATUSES:
+                pause = parse_retry_after(retry_after)
+                pause = DEFAULT_THROTTLE_PAUSE if pause is None else pause
+                state.not_before = max(state.not_before, now + pause)
+                state.decrease(now)
+                print(f"  [politeness] {host}: HTTP {status}, pausing {pause:.0f}s, limit → {int(state.limit)}", file=sys.stderr)
+            elif status == 0 or status >= 500:
+                state.decrease(now)
+            else:
+                state.latency = latency if state.latency is None else (
+                    LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * state.latency)
+                state.baseline = state.latency if state.baseline is None else min(state.baseline, state.latency)
+                if (state.latency > LATENCY_FACTOR * state.baseline
+                        and state.latency - state.baseline > LATENCY_MIN_RISE):
+                    state.decrease(now)
+                else:
+                    state.increase()
+            self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # Retries / robots
+    # ------------------------------------------------------------------
+
+    def retry_delay(self, url: str, attempt: int) -> float:
+        """Seconds until *url* should be retried: backoff, or longer if its host is paused."""
+        backoff = (2 ** attempt) + random.uniform(0, 1)
+        with self._cond:
+            state = self._state(urlparse(url).netloc)
+            return max(backoff, state.not_before - time.monotonic())
+
+    def set_max_per_host(self, max_per_host: int):
+        """Cap for every host's limit (worker threads or per-host connections)."""
+        with self._cond:
+            self.max_per_host = max_per_host
+            for state in self._hosts.values():
+                state.max_limit = max(max_per_host, MIN_LIMIT)
+                state.limit = min(state.limit, state.max_limit)
+
+    def set_crawl_delay(self, host: str, seconds: float):
+        with self._cond:
+            self._state(host).crawl_delay = min(seconds, MAX_CRAWL_DELAY)
+
+    def limit(self, host: str) -> int:
+        with self._cond:
+            return int(self._state(host).limit)
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _state(self, host: str) -> HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState(self.max_per_host)
+        return state
+
+    def _try_start(self, host: str) -> float:
+        """Caller holds the lock. Starts a request (returns 0) or returns the wait."""
+        state = self._state(host)
+        now = time.monotonic()
+        wait = state.wait_time(now)
+        if wait == 0:
+            state.in_flight += 1
+            state.last_start = now
+        return wait
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After as seconds (delta-seconds or HTTP-date), capped; None if absent/invalid."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        seconds = when.timestamp() - time.time()
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+def robots_crawl_delay(base_url: str, session: requests.Session, timeout: int = 10) -> float:
+    """Crawl-delay from base_url's robots.txt for our agent (or *); cached per run."""
+    with _robots_lock:
+        if base_url in _robots_cache:
+            return _robots_cache[base_url]
+    delay = 0.0
+    try:
+        resp = session.get(f"{base_url}/robots.txt", timeout=timeout)
+        if resp.status_code == 200:
+            delay = parse_crawl_delay(resp.text)
+    except requests.RequestException:
+        pass
+    with _robots_lock:
+        _robots_cache[base_url] = delay
+    return delay
+
+
+def parse_crawl_delay(robots_txt: str, agent: str = ROBOTS_AGENT) -> float:
+    """Crawl-delay for *agent* from robots.txt text; falls back to the ``*`` group.
+
+    (urllib.robotparser only accepts integer delays.)
+    """
+    delays: Dict[str, float] = {}
+    group: list = []
+    in_rules = False
+    for line in robots_txt.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if ":" not in line:
+            continue
+        field, value = (part.strip() for part in line.split(":", 1))
+        field = field.lower()
+        if field == "user-agent":
+            if in_rules:
+                group, in_rules = [], False
+            group.append(value.lower())
+        else:
+            in_rules = True
+            if field == "crawl-delay":
+                try:
+                    for ua in group:
+                        delays[ua] = float(value)
+                except ValueError:
+                    pass
+    agent = agent.lower()
+    for ua, delay in delays.items():
+        if ua != "*" and ua in agent:
+            return delay
+    return delays.get("*", 0.0)
@@ -0,0 +1,87 @@
+"""Speculative fetching while LLM analysis is in flight.
+
+Fetching raw HTML does not depend on the selectors, so as soon as
+discovery finishes a Prefetcher starts storing the in-prefix frontier
+(URLs under the start URL's directory, best first) in the run's
+FetchStore on a background thread. LLM analysis, the sample crawl and
+selector refinement run meanwhile; the full crawl then finds those pages
+in the store and only extracts them with the final SelectorSpec.
+
+The sample crawl takes its URLs out of the prefetch first (exclude()),
+and the pipeline stops the prefetch before the full crawl starts, so no
+URL is fetched twice at the same time.
+"""
+import sys
+import threading
+import time
+from typing import Iterable, List, Optional, Set
+
+from crawler import Crawler
+from llms_txt import start_dir_url
+from models import UrlRecord
+
+
+def in_prefix(frontier: List[UrlRecord], start_url: str) -> List[UrlRecord]:
+    """Frontier URLs under the start URL's directory (the likely scope before analysis)."""
+    prefix = start_dir_url(start_url)
+    return [r for r in frontier if r.url.startswith(prefix)]
+
+
+class Prefetcher:
+    def __init__(self, crawler: Crawler, frontier: List[UrlRecord]):
+        self.crawler = crawler
+        self.frontier = frontier
+        self.stored = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        self._excluded: Set[str] = set()
+        self._in_flight: Set[str] = set()
+        self._idle = threading.Condition()
+
+    def start(self) -> "Prefetcher":
+        print(f"  [prefetch] Fetching {len(self.frontier)} in-prefix URLs in the background during analysis", file=sys.stderr)
+        self._started = time.time()
+        self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> int:
+        """Start no new fetches, wait for those in flight; returns the pages stored."""
+        if self._thread is None:
+            return 0
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.crawler.close()
+        print(f"  [prefetch] {self.stored}/{len(self.frontier)} pages stored in {time.time() - self._started:.1f}s", file=sys.stderr)
+        return self.stored
+
+    def exclude(self, urls: Iterable[str]):
+        """Leave *urls* to another stage: none is started from now on.
+
+        Waits for those already being fetched, so the caller finds them in
+        the store instead of requesting them a second time.
+        """
+        urls = set(urls)
+        with self._idle:
+            self._excluded |= urls
+            self._idle.wait_for(lambda: not self._in_flight & urls)
+
+    def _claim(self, url: str) -> bool:
+        with self._idle:
+            if url in self._excluded:
+                return False
+            self._in_flight.add(url)
+            return True
+
+    def _release(self, url: str):
+        with self._idle:
+            self._in_flight.discard(url)
+            self._idle.notify_all()
+
+    def _run(self):
+        try:
+            self.stored = self.crawler.prefetch(self.frontier, self._stop, self._claim, self._release)
+        except Exception as e:
+            print(f"  [prefetch] Stopped: {e}", file=sys.stderr)
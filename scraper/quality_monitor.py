@@ -0,0 +1,91 @@
+"""Online crawl quality monitor — catch a broken content selector mid-crawl.
+
+The crawler reports every extracted page (Crawler(monitor=...)). Once
+CHECK_AFTER pages are in, a success rate below the threshold asks the
+crawler to switch selectors:
+
+  success   the page produced an entry of at least THIN_PAGE_BYTES
+  thin      an entry below THIN_PAGE_BYTES (selector hit a wrapper or stub)
+  failed    no entry at all (selector matched nothing usable)
+
+Pages fetched while the monitor is watching are kept in memory, so after
+a switch they are re-extracted with the new SelectorSpec instead of being
+fetched again. A healthy crawl stops the watch after SETTLE_AFTER pages
+and the retained pages are released; at most one switch happens per crawl.
+"""
+import statistics
+import threading
+from typing import List, NamedTuple
+
+CHECK_AFTER = 20
+SETTLE_AFTER = 100
+THIN_PAGE_BYTES = 200
+
+
+class QualityStats(NamedTuple):
+    pages: int
+    succeeded: int
+    thin: int
+    failed: int
+    median_bytes: int
+
+    @property
+    def success_rate(self) -> float:
+        return self.succeeded / self.pages if self.pages else 0.0
+
+
+class QualityMonitor:
+    def __init__(self, min_success_rate: float, check_after: int = CHECK_AFTER, settle_after: int = SETTLE_AFTER):
+        self.min_success_rate = min_success_rate
+        self.check_after = check_after
+        self.settle_after = max(settle_after, check_after)
+        self.watching = True
+        self.pending = False    # a switch was requested and has not finished yet
+        self.switched = False
+        self._sizes: List[int] = []
+        self._failed = 0
+        self._lock = threading.Lock()
+
+    def record(self, size_bytes: int) -> bool:
+        """Count one page (0 = no entry). True if the caller should switch selectors now.
+
+        Returns True at most once; the caller then calls switch_done().
+        """
+        with self._lock:
+            if size_bytes:
+                self._sizes.append(size_bytes)
+            else:
+                self._failed += 1
+            if not self.watching:
+                return False
+            stats = self._stats()
+            if stats.pages < self.check_after:
+                return False
+            if stats.success_rate < self.min_success_rate:
+                self.watching = False  # the caller is switching; no second trigger
+                self.pending = True
+                return True
+            if stats.pages >= self.settle_after:
+                self.watching = False
+            return False
+
+    def switch_done(self, switched: bool):
+        """After a switch attempt: stats restart for the new selectors (the watch is over)."""
+        with self._lock:
+            self.pending = False
+            self.switched = switched
+            self._sizes, self._failed = [], 0
+
+    def stats(self) -> QualityStats:
+        with self._lock:
+            return self._stats()
+
+    def _stats(self) -> QualityStats:
+        thin = sum(1 for size in self._sizes if size < THIN_PAGE_BYTES)
+        return QualityStats(
+            pages=len(self._sizes) + self._failed,
+            succeeded=len(self._sizes) - thin,
+            thin=thin,
+            failed=self._failed,
+            median_bytes=int(statistics.median(self._sizes)) if self._sizes else 0,
+        )
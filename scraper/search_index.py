@@ -0,0 +1,264 @@
+"""Client-side search indexes of static documentation generators.
+
+  mkdocs      ``search/search_index.json``: every page and section with its
+              text (plain, or HTML with mkdocs-material)
+  docusaurus  ``search-index.json`` (docusaurus-search-local): page titles,
+              headings and section text
+  sphinx      ``searchindex.js``: document names and titles (no text)
+  vitepress   ``assets/chunks/@localSearchIndex<locale>.<hash>.js``:
+              MiniSearch index with page and section titles (no text)
+
+Every index lists the complete set of pages with their real titles, so
+discovery merges it into the frontier. Where it also holds the page text
+(has_full_text) the pipeline can build the output without crawling.
+
+Fetching is done by DiscoveryWorker.probe_search_index; this module is pure.
+"""
+import html as html_lib
+import json
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from markdownify import markdownify as md
+
+from llms_txt import start_dir_url
+
+MKDOCS_INDEX = "search/search_index.json"
+DOCUSAURUS_INDEX = "search-index.json"
+SPHINX_INDEX = "searchindex.js"
+SPHINX_OPTIONS = "_static/documentation_options.js"
+MAX_PARENT_DIRS = 3
+MIN_PAGE_TEXT = 200       # characters of text for a page to count as full text
+FULL_TEXT_MIN_SHARE = 0.8
+MAX_VITEPRESS_SCRIPTS = 5  # JS chunks read while looking for the VitePress index
+
+_GENERATOR_RE = re.compile(r'<meta[^>]+name=["\']generator["\'][^>]+content=["\']([^"\']+)', re.I)
+_SPHINX_OPTIONS_RE = re.compile(r'src=["\']([^"\']*_static/documentation_options\.js)[^"\']*["\']')
+_MKDOCS_BASE_RE = re.compile(r'(?:var base_url\s*=\s*|"base"\s*:\s*)["\']([^"\']*)["\']')
+_SPHINX_SET_INDEX_RE = re.compile(r"Search\.setIndex\((.*)\)\s*;?\s*$", re.S)
+_SPHINX_OPTION_RE = re.compile(r"\b(BUILDER|FILE_SUFFIX)\s*:\s*['\"]([^'\"]*)['\"]")
+_JS_KEY_RE = re.compile(r"([{,])\s*([A-Za-z_]\w*)\s*:")
+_SCRIPT_SRC_RE = re.compile(r'(?:src|href)=["\']([^"\']*/assets/[^"\']+\.js)["\']')
+_VITEPRESS_REF_RE = re.compile(r"(@localSearchIndex[\w-]*\.[\w-]+\.js|VPLocalSearchBox\.[\w-]+\.js)")
+_VITEPRESS_DATA_RE = re.compile(r"=\s*'((?:[^'\\]|\\.)*)'")
+_TAG_RE = re.compile(r"<[^>]+>")
+_HTML_BLOCK_RE = re.compile(r"<(?:p|pre|code|ul|ol|li|h[1-6]|table|div|a|br)\b", re.I)
+
+
+class SearchPage(NamedTuple):
+    url: str
+    title: str
+    markdown: str  # "" when the index holds titles only
+
+
+# ------------------------------------------------------------------
+# Locations
+# ------------------------------------------------------------------
+
+def detect_generator(html: str) -> str:
+    """"mkdocs", "docusaurus", "sphinx", "vitepress" or "" for the page's site generator."""
+    match = _GENERATOR_RE.search(html or "")
+    generator = match.group(1).lower() if match else ""
+    for name in ("mkdocs", "docusaurus", "vitepress"):
+        if name in generator:
+            return name
+    if "documentation_options.js" in (html or "") or "sphinx" in generator:
+        return "sphinx"
+    return ""
+
+
+def parent_dirs(start_url: str) -> List[str]:
+    """The start directory and up to MAX_PARENT_DIRS of its parents, nearest first."""
+    parsed = urlparse(start_dir_url(start_url))
+    parts = [p for p in parsed.path.split("/") if p]
+    dirs = []
+    for depth in range(len(parts), max(len(parts) - MAX_PARENT_DIRS, 0) - 1, -1):
+        path = "/" + "".join(f"{p}/" for p in parts[:depth])
+        dirs.append(f"{parsed.scheme}://{parsed.netloc}{path}")
+    return dirs
+
+
+def index_locations(start_url: str, html: str) -> List[Tuple[str, str]]:
+    """(kind, url) of the search index files to try, most likely first.
+
+    VitePress is not listed: its index chunk is found through the page's
+    scripts (vitepress_script_urls / vitepress_chunk_refs).
+    """
+    generator = detect_generator(html)
+    dirs = parent_dirs(start_url)
+    locations: List[Tuple[str, str]] = []
+    if generator in ("sphinx", ""):
+        match = _SPHINX_OPTIONS_RE.search(html or "")
+        if match:
+            root = urljoin(urljoin(start_url, match.group(1)), "..")
+            locations.append(("sphinx", urljoin(root, SPHINX_INDEX)))
+        locations += [("sphinx", urljoin(d, SPHINX_INDEX)) for d in dirs]
+    if generator in ("mkdocs", ""):
+        match = _MKDOCS_BASE_RE.search(html or "")
+        if match:
+            base = match.group(1).rstrip("/") + "/" if match.group(1) else "./"
+            locations.append(("mkdocs", urljoin(urljoin(start_url, base), MKDOCS_INDEX)))
+        locations += [("mkdocs", urljoin(d, MKDOCS_INDEX)) for d in dirs]
+    if generator in ("docusaurus", ""):
+        locations += [("docusaurus", urljoin(d, DOCUSAURUS_INDEX)) for d in dirs]
+    return list(dict.fromkeys(locations))
+
+
+def index_base(kind: str, index_url: str) -> str:
+    """URL the page locations of an index are relative to."""
+    if kind == "mkdocs":
+        return urljoin(index_url, "..")
+    if kind == "sphinx":
+        return urljoin(index_url, ".")
+    parsed = urlparse(index_url)
+    return f"{parsed.scheme}://{parsed.netloc}/"
+
+
+def vitepress_script_urls(html: str, page_url: str) -> List[str]:
+    """Module scripts / preloads of a VitePress page (where the index chunk is referenced)."""
+    urls = [urljoin(page_url, src) for src in _SCRIPT_SRC_RE.findall(html or "")]
+    return list(dict.fromkeys(urls))[:MAX_VITEPRESS_SCRIPTS]
+
+
+def vitepress_chunk_refs(js: str, script_url: str) -> Tuple[Optional[str], Optional[str]]:
+    """(index chunk URL, search box chunk URL) referenced by a VitePress script."""
+    chunks_dir = script_url.split("/assets/", 1)[0] + "/assets/chunks/"
+    index_url = box_url = None
+    for name in _VITEPRESS_REF_RE.findall(js or ""):
+        if name.startswith("@localSearchIndex"):
+            # The root locale's index is the site's main language
+            if index_url is None or name.startswith("@localSearchIndexroot"):
+                index_url = chunks_dir + name
+        elif box_url is None:
+            box_url = chunks_dir + name
+    return index_url, box_url
+
+
+# ------------------------------------------------------------------
+# Parsing
+# ------------------------------------------------------------------
+
+def parse_search_index(kind: str, text: str, base_url: str, sphinx_options: str = "") -> List[SearchPage]:
+    """Pages of a search index, in index order; [] if *text* is not a valid index."""
+    try:
+        if kind == "mkdocs":
+            return parse_mkdocs(json.loads(text), base_url)
+        if kind == "docusaurus":
+            return parse_docusaurus(json.loads(text), base_url)
+        if kind == "sphinx":
+            return parse_sphinx(text, base_url, sphinx_options)
+        if kind == "vitepress":
+            return parse_vitepress(text, base_url)
+    except (ValueError, TypeError, AttributeError, KeyError):
+        pass
+    return []
+
+
+def parse_mkdocs(data: dict, base_url: str) -> List[SearchPage]:
+    """MkDocs: page entries (``loc``) carry the page text, section entries (``loc#id``) their own."""
+    pages: Dict[str, dict] = {}
+    for doc in data.get("docs", []):
+        page, _, anchor = doc.get("location", "").partition("#")
+        url = urljoin(base_url, page)
+        entry = pages.setdefault(url, {"title": "", "text": "", "sections": []})
+        title, text = plain_text(doc.get("title", "")), to_markdown(doc.get("text", ""))
+        if anchor:
+            entry["sections"].append((title, text))
+        else:
+            entry["title"], entry["text"] = title, text
+    return [_page(url, entry) for url, entry in pages.items()]
+
+
+def parse_docusaurus(data: list, base_url: str) -> List[SearchPage]:
+    """docusaurus-search-local: documents sets of titles (t, u), headings (h, p) and contents (s, t)."""
+    pages: Dict[str, dict] = {}
+    for doc_set in data:
+        for doc in doc_set.get("documents", []):
+            url = urljoin(base_url, doc.get("u", ""))
+            entry = pages.setdefault(url, {"title": "", "text": "", "sections": []})
+            if "s" in doc:
+                text = to_markdown(doc.get("t", ""))
+                if doc.get("h"):
+                    entry["sections"].append((plain_text(doc["s"]), text))
+                else:
+                    entry["text"] = "\n\n".join(filter(None, (entry["text"], text)))
+            elif "p" not in doc:
+                entry["title"] = plain_text(doc.get("t", ""))
+    return [_page(url, entry) for url, entry in pages.items()]
+
+
+def parse_sphinx(text: str, base_url: str, options_js: str = "") -> List[SearchPage]:
+    """Sphinx: docnames + titles; URLs follow the builder (html: ``name.html``, dirhtml: ``name/``)."""
+    match = _SPHINX_SET_INDEX_RE.search(text.strip())
+    if not match:
+        return []
+    payload = match.group(1)
+    try:
+        data = json.loads(payload)
+    except ValueError:
+        data = json.loads(_JS_KEY_RE.sub(r'\1"\2":', payload))  # Sphinx < 5 wrote bare keys
+    options = dict(_SPHINX_OPTION_RE.findall(options_js))
+    dirhtml = options.get("BUILDER") == "dirhtml"
+    suffix = options.get("FILE_SUFFIX", ".html")
+    pages = []
+    for docname, title in zip(data["docnames"], data["titles"]):
+        if dirhtml:
+            path = "" if docname == "index" else (docname[:-len("index")] if docname.endswith("/index") else docname + "/")
+        else:
+            path = docname + suffix
+        pages.append(SearchPage(url=urljoin(base_url, path), title=plain_text(title), markdown=""))
+    return pages
+
+
+def parse_vitepress(text: str, base_url: str) -> List[SearchPage]:
+    """VitePress: MiniSearch JSON embedded as a JS string; one document per section."""
+    match = _VITEPRESS_DATA_RE.search(text)
+    if not match:
+        return []
+    literal = match.group(1).replace("\\'", "'").replace('"', '\\"')
+    data = json.loads(json.loads(f'"{literal}"'))
+    stored = data.get("storedFields", {})
+    titles: Dict[str, str] = {}
+    for short_id, doc_id in data.get("documentIds", {}).items():
+        url = urljoin(base_url, doc_id.split("#", 1)[0])
+        fields = stored.get(short_id, {})
+        # "titles" lists a section's parent headings; the first is the page heading
+        parents = fields.get("titles") or []
+        if not titles.get(url):
+            titles[url] = parents[0] if parents else fields.get("title", "")
+    return [SearchPage(url=url, title=plain_text(title), markdown="") for url, title in titles.items()]
+
+
+def has_full_text(pages: List[SearchPage]) -> bool:
+    """True if most pages carry enough text to be written without crawling."""
+    if not pages:
+        return False
+    full = sum(1 for p in pages if len(p.markdown) >= MIN_PAGE_TEXT)
+    return full / len(pages) >= FULL_TEXT_MIN_SHARE
+
+
+# ------------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------------
+
+def plain_text(value: str) -> str:
+    return html_lib.unescape(_TAG_RE.sub("", value or "")).strip()
+
+
+def to_markdown(text: str) -> str:
+    """Index text as Markdown (mkdocs-material and others store HTML fragments)."""
+    text = (text or "").strip()
+    if _HTML_BLOCK_RE.search(text):
+        return md(text, heading_style="ATX", code_language="").strip()
+    return text
+
+
+def _page(url: str, entry: dict) -> SearchPage:
+    """Page text plus sections the page text does not already contain."""
+    parts = [entry["text"]] if entry["text"] else []
+    for title, text in entry["sections"]:
+        if text and text not in entry["text"]:
+            parts.append(f"## {title}\n\n{text}" if title and title != entry["title"] else text)
+    title = entry["title"] or (entry["sections"][0][0] if entry["sections"] else "")
+    return SearchPage(url=url, title=title, markdown="\n\n".join(parts).strip())
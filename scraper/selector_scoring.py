@@ -0,0 +1,123 @@
+"""Selector scoring — validate candidate SelectorSpecs before the full crawl.
+
+Every candidate (LLM or profile analysis, offline detection, near-miss
+profile, generic fallbacks) is run through the real extractor on the same
+already-fetched sample pages and scored:
+
+  match rate   share of pages where content_selector matches and yields text
+  boilerplate  share of extracted text in blocks repeated across the pages
+               (dedup.find_repeated_blocks — nav, footers, banners)
+  coverage     median unique text per page, relative to the best candidate
+
+  score = match_rate × (1 − boilerplate) × coverage
+
+With hydrate=True (HYDRATION mode) selectors are matched against the
+document rendered from each page's hydration payload — the DOM the
+extractor actually reads — not against the raw shell.
+
+The incumbent keeps its place unless another candidate beats it by
+MIN_IMPROVEMENT. A winner matching at least VALIDATED_MATCH_RATE of the
+pages is trusted, so the pipeline skips the crawl-then-reanalyze retry.
+"""
+import statistics
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from bs4 import BeautifulSoup
+
+from dedup import find_repeated_blocks, remove_repeated_blocks
+from extractor import PageExtractor
+from hydration import document_markdown, hydrate as hydrate_payload
+from models import SelectorSpec, UrlRecord
+from scheduler import prioritize
+
+SCORING_PAGES = 8
+MIN_SCORING_PAGES = 2
+MIN_PAGE_CHARS = 20         # PageExtractor.process drops pages below this
+MIN_IMPROVEMENT = 0.1       # score margin a challenger needs over the incumbent
+VALIDATED_MATCH_RATE = 0.6
+
+
+class SelectorScore(NamedTuple):
+    source: str
+    spec: SelectorSpec
+    match_rate: float
+    boilerplate: float
+    median_chars: int       # unique (non-repeated) characters per matched page
+    score: float
+
+
+def stratified_pages(sample_pages: Sequence[Tuple[str, str]], start_url: str, limit: int = SCORING_PAGES) -> List[str]:
+    """HTML of up to *limit* sample pages, spread over site sections (scheduler order)."""
+    html_by_url = dict(sample_pages)
+    ordered = prioritize([UrlRecord(url=url) for url in html_by_url], start_url)
+    return [html_by_url[record.url] for record in ordered[:limit]]
+
+
+def score_candidates(
+    candidates: Sequence[Tuple[str, SelectorSpec]], pages: Sequence[str], hydrate: bool = False,
+) -> List[SelectorScore]:
+    """Scores for (source, spec) candidates on *pages*, best first (stable for ties)."""
+    documents = [(hydrate_payload(html) or html) if hydrate else html for html in pages]
+    # Markdown documents pass through the extractor whatever the selectors: no soup, always a match
+    soups = [None if document_markdown(doc) is not None else BeautifulSoup(doc, "html.parser") for doc in documents]
+    measured = []
+    for source, spec in _unique(candidates):
+        extractor = PageExtractor(spec, raw_dir="")  # documents are hydrated already
+        outputs = {}
+        for i, (doc, soup) in enumerate(zip(documents, soups)):
+            if soup is not None and not _matches(soup, spec.content_selector):
+                continue  # the extractor's generic fallback is not this candidate's merit
+            markdown = extractor.convert(doc)
+            if len(markdown.strip()) >= MIN_PAGE_CHARS:
+                outputs[str(i)] = markdown
+        measured.append((source, spec, outputs))
+
+    raw = []
+    for source, spec, outputs in measured:
+        repeated = find_repeated_blocks(outputs)
+        total = sum(len(text) for text in outputs.values())
+        unique = [len(remove_repeated_blocks(text, repeated)) for text in outputs.values()]
+        boilerplate = 1 - sum(unique) / total if total else 0.0
+        median = int(statistics.median(unique)) if unique else 0
+        raw.append((source, spec, len(outputs) / len(pages) if pages else 0.0, max(boilerplate, 0.0), median))
+
+    best_median = max((r[4] for r in raw), default=0)
+    scores = [
+        SelectorScore(source, spec, rate, round(boilerplate, 3), median,
+                      round(rate * (1 - boilerplate) * (median / best_median if best_median else 0), 3))
+        for source, spec, rate, boilerplate, median in raw
+    ]
+    return sorted(scores, key=lambda s: -s.score)
+
+
+def pick_winner(scores: List[SelectorScore], incumbent: str) -> Optional[SelectorScore]:
+    """Best candidate; the *incumbent* source wins unless beaten by MIN_IMPROVEMENT."""
+    if not scores:
+        return None
+    best = scores[0]
+    current = next((s for s in scores if s.source == incumbent), None)
+    if current is not None and best.score < current.score + MIN_IMPROVEMENT:
+        return current
+    return best
+
+
+# ------------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------------
+
+def _matches(soup: BeautifulSoup, selector: str) -> bool:
+    try:
+        return soup.select_one(selector) is not None
+    except Exception:
+        return False
+
+
+def _unique(candidates: Sequence[Tuple[str, SelectorSpec]]) -> List[Tuple[str, SelectorSpec]]:
+    """Candidates with distinct selectors; the first source of each is kept."""
+    seen, unique = set(), []
+    for source, spec in candidates:
+        key = (spec.content_selector, tuple(spec.prune_selectors))
+        if key not in seen:
+            seen.add(key)
+            unique.append((source, spec))
+    return unique
@@ -0,0 +1,191 @@
+"""Built-in selector profiles for well-known documentation generators.
+
+fingerprint() scores the start page against each profile's signatures:
+
+  generator  ``<meta name="generator">`` content         (GENERATOR_WEIGHT)
+  assets     generator-specific asset paths in the HTML (ASSET_WEIGHT each)
+  dom        generator-specific elements                (DOM_WEIGHT each)
+
+A profile whose content selector is present on the page and whose score
+reaches HIGH_CONFIDENCE replaces LLM analysis and selector refinement:
+profile_analysis() builds the scope rules and SelectorSpec from it.
+"""
+import re
+import sys
+from typing import List, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+
+from models import LLMAnalysis, ScopeRules, SelectorSpec
+
+GENERATOR_WEIGHT = 0.6
+ASSET_WEIGHT = 0.2
+DOM_WEIGHT = 0.2
+HIGH_CONFIDENCE = 0.8
+
+COMMON_EXCLUDES = [r"/blog/", r"/news/", r"/pricing/", r"/login/", r"/changelog/"]
+
+_GENERATOR_RE = re.compile(r'<meta[^>]+name=["\']generator["\'][^>]+content=["\']([^"\']+)', re.I)
+
+
+class SiteProfile(NamedTuple):
+    name: str
+    generator: str               # regex on the meta generator content
+    assets: Tuple[str, ...]      # regexes on the raw HTML
+    dom: Tuple[str, ...]         # CSS selectors
+    content_selector: str
+    prune_selectors: Tuple[str, ...]
+    exclude_patterns: Tuple[str, ...] = ()
+
+
+class ProfileMatch(NamedTuple):
+    profile: SiteProfile
+    confidence: float
+    evidence: List[str]
+
+
+# More specific profiles first: a tie goes to the earlier one
+PROFILES: Tuple[SiteProfile, ...] = (
+    SiteProfile(
+        name="mkdocs-material",
+        generator=r"mkdocs-material",
+        assets=(r"assets/javascripts/bundle\.[\w]+\.min\.js", r"assets/stylesheets/main\.[\w]+\.min\.css"),
+        dom=(".md-content", ".md-sidebar", "[data-md-component]"),
+        content_selector="article.md-content__inner",
+        prune_selectors=(".headerlink", ".md-content__button", ".md-source-file", ".md-feedback", ".md-tags"),
+        exclude_patterns=(r"/search\.html", r"/404\.html"),
+    ),
+    SiteProfile(
+        name="mkdocs",
+        generator=r"^mkdocs-",
+        assets=(r"search/main\.js", r"js/base\.js|js/theme\.js"),
+        dom=("div[role='main']", "#mkdocs_search_modal, .rst-versions"),
+        content_selector="div[role='main']",
+        prune_selectors=(".headerlink", ".rst-footer-buttons", "div[role='navigation']", ".wy-breadcrumbs"),
+        exclude_patterns=(r"/search\.html", r"/404\.html"),
+    ),
+    SiteProfile(
+        name="sphinx",
+        generator=r"sphinx",
+        assets=(r"_static/documentation_options\.js", r"_static/(?:doctools|sphinx_highlight|searchtools)\.js"),
+        dom=("[role='main']", ".sphinxsidebar, .wy-nav-side, .sidebar-drawer, .bd-sidebar-primary"),
+        content_selector="[role='main']",
+        prune_selectors=(
+            ".headerlink", ".rst-footer-buttons", ".wy-breadcrumbs", ".related", ".prev-next-area",
+            ".toc-drawer", ".bd-sidebar-secondary", "#searchbox",
+        ),
+        exclude_patterns=(r"/_sources/", r"/_modules/", r"/(?:genindex|py-modindex|search)(?:\.html)?/?$"),
+    ),
+    SiteProfile(
+        name="docusaurus",
+        generator=r"docusaurus",
+        assets=(r"/assets/js/runtime~main\.[\w]+\.js", r"/assets/js/main\.[\w]+\.js"),
+        dom=("#__docusaurus", ".theme-doc-markdown"),
+        content_selector=".theme-doc-markdown",
+        prune_selectors=(".hash-link", ".theme-doc-toc-mobile", ".theme-doc-version-badge"),
+        exclude_patterns=(r"/blog/", r"/tags/", r"/search$"),
+    ),
+    SiteProfile(
+        name="vitepress",
+        generator=r"vitepress",
+        assets=(r"/assets/chunks/", r"/assets/style\.[\w-]+\.css"),
+        dom=("#VPContent", ".vp-doc"),
+        content_selector=".vp-doc",
+        prune_selectors=(".header-anchor", ".VPDocFooter", ".edit-link", ".prev-next"),
+    ),
+    SiteProfile(
+        name="starlight",
+        generator=r"starlight",
+        assets=(r"/_astro/", r"starlight"),
+        dom=(".sl-markdown-content", "starlight-toc, mobile-starlight-toc"),
+        content_selector="main",
+        prune_selectors=(
+            "starlight-toc", "mobile-starlight-toc", ".pagination-links", ".sl-anchor-link",
+            "footer", "starlight-menu-button",
+        ),
+        exclude_patterns=(r"/404$",),
+    ),
+    SiteProfile(
+        name="mintlify",
+        generator=r"mintlify",
+        assets=(r"mintlify", r"mintcdn\.com"),
+        dom=("#content-area", "#sidebar-content, #navbar"),
+        content_selector="#content-area",
+        prune_selectors=("#pagination", "#table-of-contents", "footer"),
+    ),
+)
+
+
+def meta_generator(html: str) -> str:
+    """Every meta generator on the page (Starlight sits next to Astro's), comma-joined."""
+    return ", ".join(m.strip() for m in _GENERATOR_RE.findall(html or ""))
+
+
+def fingerprint(html: str) -> Optional[ProfileMatch]:
+    """Best-scoring profile for a page, or None if nothing matches at all.
+
+    A profile whose content selector is missing from the page is kept
+    below HIGH_CONFIDENCE, so the LLM decides instead.
+    """
+    if not html:
+        return None
+    generator = meta_generator(html)
+    soup = BeautifulSoup(html, "html.parser")
+    best: Optional[ProfileMatch] = None
+    for profile in PROFILES:
+        score, evidence = 0.0, []
+        if generator and re.search(profile.generator, generator, re.I):
+            score += GENERATOR_WEIGHT
+            evidence.append(f"generator {generator!r}")
+        for pattern in profile.assets:
+            if re.search(pattern, html):
+                score += ASSET_WEIGHT
+                evidence.append(f"asset /{pattern}/")
+        for selector in profile.dom:
+            if _select(soup, selector):
+                score += DOM_WEIGHT
+                evidence.append(f"element {selector}")
+        if not score:
+            continue
+        if not _select(soup, profile.content_selector):
+            score = min(score, HIGH_CONFIDENCE - 0.1)
+            evidence.append(f"no {profile.content_selector}")
+        match = ProfileMatch(profile, round(min(score, 1.0), 2), evidence)
+        if best is None or match.confidence > best.confidence:
+            best = match
+    return best
+
+
+def profile_analysis(match: ProfileMatch, start_url: str, base_url: str) -> LLMAnalysis:
+    """Scope rules and selectors from a matched profile (what LLMAnalyzer.analyze would return)."""
+    profile = match.profile
+    path_parts = urlparse(start_url).path.strip("/").split("/")
+    # A start page file (index.html) is not a section to scope to
+    include = [f"/{path_parts[0]}/"] if path_parts[0] and (len(path_parts) > 1 or "." not in path_parts[0]) else []
+    scope_rules = ScopeRules(
+        include_patterns=include,
+        exclude_patterns=list(dict.fromkeys(COMMON_EXCLUDES + list(profile.exclude_patterns))),
+        base_url=base_url,
+        description=f"Built-in {profile.name} profile",
+    )
+    selector_spec = profile_spec(match)
+    print(f"  [profiles] {profile.name} (confidence {match.confidence:.2f}) — LLM analysis skipped", file=sys.stderr)
+    return LLMAnalysis(scope_rules=scope_rules, selector_spec=selector_spec)
+
+
+def profile_spec(match: ProfileMatch) -> SelectorSpec:
+    """The profile's selectors as a SelectorSpec."""
+    profile = match.profile
+    return SelectorSpec(
+        content_selector=profile.content_selector,
+        prune_selectors=list(profile.prune_selectors),
+        notes=f"Built-in {profile.name} profile (confidence {match.confidence:.2f}: {', '.join(match.evidence)})",
+    )
+
+
+def _select(soup: BeautifulSoup, selector: str) -> bool:
+    try:
+        return soup.select_one(selector) is not None
+    except Exception:
+        return False
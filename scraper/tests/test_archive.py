@@ -0,0 +1,48 @@
+"""Unit tests for archive.py — WARC write/read round trip."""
+import gzip
+
+from archive import WarcWriter, archive_index, iter_archive, iter_latest, load_archive
+
+
+class TestWarcArchive:
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "archive.warc.gz"
+        with WarcWriter(path) as writer:
+            writer.write_page("https://example.com/a", "<html>A é</html>")
+            writer.write_page("https://example.com/b", "<html>B</html>")
+        assert list(iter_archive(path)) == [
+            ("https://example.com/a", "<html>A é</html>"),
+            ("https://example.com/b", "<html>B</html>"),
+        ]
+
+    def test_records_counted_without_warcinfo(self, tmp_path):
+        writer = WarcWriter(tmp_path / "archive.warc.gz")
+        writer.write_page("https://example.com/a", "x")
+        writer.close()
+        assert writer.records == 1
+
+    def test_later_record_wins(self, tmp_path):
+        path = tmp_path / "archive.warc.gz"
+        with WarcWriter(path) as writer:
+            writer.write_page("https://example.com/a", "old")
+            writer.write_page("https://example.com/a", "new")
+        assert load_archive(path) == {"https://example.com/a": "new"}
+
+    def test_latest_streamed_once_per_url(self, tmp_path):
+        path = tmp_path / "archive.warc.gz"
+        with WarcWriter(path) as writer:
+            writer.write_page("https://example.com/a", "old")
+            writer.write_page("https://example.com/b", "B")
+        with WarcWriter(path, append=True) as writer:
+            writer.write_page("https://example.com/a", "new")
+        assert archive_index(path) == {"https://example.com/a": 2, "https://example.com/b": 1}
+        assert list(iter_latest(path)) == [("https://example.com/b", "B"), ("https://example.com/a", "new")]
+
+    def test_warc_headers(self, tmp_path):
+        path = tmp_path / "archive.warc.gz"
+        with WarcWriter(path) as writer:
+            writer.write_page("https://example.com/a", "x")
+        raw = gzip.open(path).read().decode("utf-8")
+        assert raw.startswith("WARC/1.1\r\nWARC-Type: warcinfo")
+        assert "WARC-Type: resource" in raw
+        assert "WARC-Target-URI: https://example.com/a" in raw
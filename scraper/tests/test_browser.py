@@ -0,0 +1,198 @@
+"""Unit tests for browser.py — driver pool checkout, reuse and recycling."""
+import threading
+import time
+
+import pytest
+
+import browser
+from browser import RECYCLE_AFTER, BrowserPool, blocked_url_patterns, wait_until_ready
+from models import ResourceBlocklist
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+        self.alive = True
+        self.cdp = []
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError("dead")
+        return 1
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp.append((cmd, params))
+
+    def quit(self):
+        self.quit_called = True
+
+
+class TestBrowserPool:
+    def _pool(self, size=2):
+        created = []
+
+        def factory():
+            created.append(FakeDriver())
+            return created[-1]
+
+        return BrowserPool(size, factory=factory), created
+
+    def test_driver_reused(self):
+        pool, created = self._pool()
+        with pool.checkout() as first:
+            pass
+        with pool.checkout() as second:
+            pass
+        assert first is second
+        assert len(created) == 1
+
+    def test_never_more_than_size(self):
+        pool, created = self._pool(size=2)
+        barrier = threading.Barrier(2)
+
+        def work():
+            with pool.checkout():
+                barrier.wait(timeout=5)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=5)
+        assert len(created) == 2
+
+    def test_error_recycles_driver(self):
+        pool, created = self._pool()
+        with pytest.raises(ValueError):
+            with pool.checkout():
+                raise ValueError("boom")
+        assert created[0].quit_called
+        with pool.checkout() as driver:
+            assert driver is created[1]
+
+    def test_dead_idle_driver_replaced(self):
+        pool, created = self._pool()
+        with pool.checkout():
+            pass
+        created[0].alive = False
+        with pool.checkout() as driver:
+            assert driver is created[1]
+        assert created[0].quit_called
+
+    def test_recycled_after_page_limit(self):
+        pool, created = self._pool(size=1)
+        for _ in range(RECYCLE_AFTER):
+            with pool.checkout():
+                pass
+        assert created[0].quit_called
+
+    def test_close_quits_idle(self):
+        pool, created = self._pool()
+        with pool.checkout():
+            pass
+        pool.close()
+        assert created[0].quit_called
+
+
+class TestBrowserBroker:
+    def test_pool_shared_and_resized(self):
+        from browser import BrowserBroker
+        broker = BrowserBroker()
+        pool = broker.pool(2)
+        assert broker.pool() is pool
+        assert broker.pool(4) is pool
+        assert pool.size == 4
+        broker.shutdown()
+
+    def test_resize_down_quits_surplus_on_return(self):
+        pool = BrowserPool(2, factory=FakeDriver)
+        with pool.checkout() as a, pool.checkout() as b:
+            pool.resize(1)
+        assert a.quit_called != b.quit_called
+
+
+class ProbeDriver:
+    """Answers the readiness probe from a script of states (last one repeats)."""
+
+    def __init__(self, states):
+        self.states = list(states)
+        self.calls = 0
+
+    def execute_script(self, script, *args):
+        state = self.states[min(self.calls, len(self.states) - 1)]
+        self.calls += 1
+        if isinstance(state, Exception):
+            raise state
+        return state
+
+
+@pytest.fixture
+def fast_ready(monkeypatch):
+    monkeypatch.setattr(browser, "READY_QUIET_S", 0.02)
+    monkeypatch.setattr(browser, "READY_POLL_S", 0.005)
+    monkeypatch.setattr(browser, "READY_SELECTOR_GRACE", 0.1)
+
+
+class TestWaitUntilReady:
+    def test_returns_once_quiet(self, fast_ready):
+        driver = ProbeDriver([
+            ["loading", 0, 3, False],
+            ["complete", 5, 8, True],
+            ["complete", 500, 8, True],
+        ])
+        start = time.monotonic()
+        assert wait_until_ready(driver, "main", max_wait=2) is True
+        assert time.monotonic() - start < 1
+
+    def test_waits_for_resource_count_to_settle(self, fast_ready):
+        driver = ProbeDriver([["complete", 500, n, True] for n in range(10)])
+        assert wait_until_ready(driver, None, max_wait=2) is True
+        assert driver.calls > 10
+
+    def test_gives_up_after_max_wait(self, fast_ready):
+        driver = ProbeDriver([["complete", 0, 1, True]])  # DOM never stops mutating
+        start = time.monotonic()
+        assert wait_until_ready(driver, None, max_wait=0.15) is False
+        assert 0.15 <= time.monotonic() - start < 1
+
+    def test_missing_selector_only_waits_grace(self, fast_ready):
+        driver = ProbeDriver([["complete", 500, 1, False]])
+        start = time.monotonic()
+        assert wait_until_ready(driver, ".no-such-thing", max_wait=5) is True
+        assert time.monotonic() - start < 1
+
+    def test_script_error_falls_back(self, fast_ready):
+        assert wait_until_ready(ProbeDriver([RuntimeError("no js")]), None, max_wait=1) is False
+
+
+class TestResourceBlocking:
+    def test_patterns_from_types_and_urls(self):
+        patterns = blocked_url_patterns(ResourceBlocklist(resource_types=["font"], url_patterns=["*ads.example*"]))
+        assert "*.woff2" in patterns
+        assert "*.woff2?*" in patterns
+        assert "*ads.example*" in patterns
+        assert not any(p.startswith("*.png") for p in patterns)
+
+    def test_default_blocks_images_and_analytics(self):
+        patterns = blocked_url_patterns(ResourceBlocklist())
+        assert "*.png" in patterns
+        assert "*google-analytics.com*" in patterns
+        assert "*.css" not in patterns
+
+    def test_disabled_and_none_block_nothing(self):
+        assert blocked_url_patterns(ResourceBlocklist.disabled()) == ()
+        assert blocked_url_patterns(None) == ()
+
+    def test_unknown_type_ignored(self):
+        assert blocked_url_patterns(ResourceBlocklist(resource_types=["hologram"], url_patterns=[])) == ()
+
+    def test_applied_once_per_driver(self):
+        driver = FakeDriver()
+        pool = BrowserPool(1, factory=lambda: driver)
+        for _ in range(3):
+            with pool.checkout(("*.png",)):
+                pass
+        assert driver.cdp == [("Network.enable", {}), ("Network.setBlockedURLs", {"urls": ["*.png"]})]
+        with pool.checkout():
+            pass
+        assert driver.cdp[-1] == ("Network.setBlockedURLs", {"urls": []})
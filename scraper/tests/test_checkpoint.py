@@ -0,0 +1,72 @@
+"""Unit tests for checkpoint.py — crawl journal write/load/resume state."""
+from checkpoint import CrawlJournal
+from models import EngineMode, ManifestEntry, SelectorSpec, UrlRecord
+
+
+def _frontier():
+    return [UrlRecord(url=f"https://example.com/docs/{p}") for p in ("a", "b", "c")]
+
+
+class TestCrawlJournal:
+    def test_load_without_journal(self, tmp_path):
+        assert CrawlJournal(tmp_path).load() is None
+
+    def test_round_trip_and_remaining(self, tmp_path):
+        journal = CrawlJournal(tmp_path)
+        journal.begin("https://example.com/docs", EngineMode.CURL, SelectorSpec(content_selector="main"), _frontier())
+        journal.record(ManifestEntry(url="https://example.com/docs/a", md_raw_path="docs/a.md"))
+        journal.close()
+
+        checkpoint = CrawlJournal(tmp_path).load()
+        assert checkpoint.engine_mode == EngineMode.CURL
+        assert checkpoint.selector_spec.content_selector == "main"
+        assert [e.md_raw_path for e in checkpoint.entries] == ["docs/a.md"]
+        assert [r.url for r in checkpoint.remaining()] == [
+            "https://example.com/docs/b", "https://example.com/docs/c",
+        ]
+
+    def test_reopen_appends(self, tmp_path):
+        journal = CrawlJournal(tmp_path)
+        journal.begin("https://example.com/docs", EngineMode.CURL, SelectorSpec(), _frontier())
+        journal.record(ManifestEntry(url="https://example.com/docs/a", md_raw_path="docs/a.md"))
+        journal.close()
+        journal.reopen()
+        journal.record(ManifestEntry(url="https://example.com/docs/b", md_raw_path="docs/b.md"))
+        journal.close()
+        assert len(CrawlJournal(tmp_path).load().remaining()) == 1
+
+    def test_truncated_last_line_ignored(self, tmp_path):
+        journal = CrawlJournal(tmp_path)
+        journal.begin("https://example.com/docs", EngineMode.CURL, SelectorSpec(), _frontier())
+        journal.record(ManifestEntry(url="https://example.com/docs/a", md_raw_path="docs/a.md"))
+        journal.close()
+        with open(journal.path, "a", encoding="utf-8") as fh:
+            fh.write('{"kind": "entry", "url": "https://exa')
+        assert len(CrawlJournal(tmp_path).load().entries) == 1
+
+    def test_begin_replaces_old_journal(self, tmp_path):
+        journal = CrawlJournal(tmp_path)
+        journal.begin("https://example.com/docs", EngineMode.CURL, SelectorSpec(), _frontier())
+        journal.record(ManifestEntry(url="https://example.com/docs/a", md_raw_path="docs/a.md"))
+        journal.begin("https://example.com/docs", EngineMode.CURL, SelectorSpec(), _frontier())
+        journal.close()
+        assert CrawlJournal(tmp_path).load().entries == []
+
+    def test_remove(self, tmp_path):
+        journal = CrawlJournal(tmp_path)
+        journal.begin("https://example.com/docs", EngineMode.CURL, SelectorSpec(), _frontier())
+        journal.remove()
+        assert not journal.path.exists()
+
+    def test_selector_switch_resets_done_entries(self, tmp_path):
+        journal = CrawlJournal(tmp_path)
+        journal.begin("https://example.com/docs", EngineMode.CURL, SelectorSpec(content_selector="nav"), _frontier())
+        journal.record(ManifestEntry(url="https://example.com/docs/a", md_raw_path="docs/a.md"))
+        journal.record(ManifestEntry(url="https://example.com/docs/b", md_raw_path="docs/b.md"))
+        journal.record_selectors(SelectorSpec(content_selector="article"))
+        journal.record(ManifestEntry(url="https://example.com/docs/a", md_raw_path="docs/a.md"))
+        journal.close()
+
+        checkpoint = CrawlJournal(tmp_path).load()
+        assert checkpoint.selector_spec.content_selector == "article"
+        assert [e.url for e in checkpoint.entries] == ["https://example.com/docs/a"]
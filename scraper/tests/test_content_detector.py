@@ -0,0 +1,92 @@
+"""Unit tests for content_detector.py — offline content / chrome detection."""
+from bs4 import BeautifulSoup
+
+from content_detector import detect_selectors, element_selector
+
+
+def _page(title: str, body: str) -> str:
+    return f"""<html><head><title>{title}</title><script>var x = 1;</script></head><body>
+<header class="site-header"><a href="/">Acme Docs</a> <a href="/blog">Blog</a></header>
+<div class="layout">
+  <nav class="sidebar"><a href="/docs/a">Install</a><a href="/docs/b">Configure</a><a href="/docs/c">Deploy</a></nav>
+  <div class="doc-main css-1x2y3z4">
+    <article class="markdown">
+      <h1>{title}</h1>
+      <p>{body}</p>
+      <p>{body} More details follow in this paragraph about {title.lower()}.</p>
+      <div class="feedback">Was this page helpful? Yes No</div>
+    </article>
+    <aside class="toc"><a href="#one">{title} one</a></aside>
+  </div>
+</div>
+<footer class="footer">Copyright 2026 Acme Inc.</footer>
+</body></html>"""
+
+
+PAGES = [
+    _page("Install", "Run pip install acme to get the package and its command line tool."),
+    _page("Configure", "Settings live in acme.toml next to the project root; every key is optional."),
+    _page("Deploy", "Build the image with acme build, then push it to the registry of your choice."),
+]
+
+
+class TestElementSelector:
+    def _el(self, html: str):
+        return BeautifulSoup(html, "html.parser").find(True)
+
+    def test_id_classes_role_tag(self):
+        assert element_selector(self._el('<div id="content" class="x">')) == "#content"
+        assert element_selector(self._el('<div class="doc-main css-1x2y3z4 wide">')) == "div.doc-main.wide"
+        assert element_selector(self._el("<div role=\"main\">")) == "div[role='main']"
+        assert element_selector(self._el("<article>")) == "article"
+        assert element_selector(self._el("<div>")) is None
+
+    def test_generated_names_skipped(self):
+        assert element_selector(self._el('<div class="sc-bdVaJa kZJxXH2">')) is None
+        assert element_selector(self._el('<div id="r123abc" class="main">')) == "div.main"
+
+
+class TestDetectSelectors:
+    def test_content_and_chrome(self):
+        spec = detect_selectors(PAGES)
+        assert spec.content_selector == "article.markdown"
+        # Repeated blocks inside the content container come first
+        assert spec.prune_selectors[0] == "div.feedback"
+        assert {"header.site-header", "nav.sidebar", "footer.footer"} <= set(spec.prune_selectors)
+        # The per-page TOC differs between pages: not chrome
+        assert "aside.toc" not in spec.prune_selectors
+        assert "3/3" in spec.notes
+
+    def test_chrome_selector_matching_page_content_is_unsafe(self):
+        pages = list(PAGES)
+        pages[0] = pages[0].replace("<p>Run", '<div class="feedback">Unique text</div><p>Run')
+        assert "div.feedback" not in detect_selectors(pages).prune_selectors
+
+    def test_single_page_finds_content_only(self):
+        spec = detect_selectors(PAGES[:1])
+        assert spec.content_selector == "article.markdown"
+        assert spec.prune_selectors == []
+
+    def test_no_agreement(self):
+        pages = [
+            "<html><body><div>" + "plain text " * 30 + "</div></body></html>",
+            "<html><body><section>" + "other text " * 30 + "</section></body></html>",
+            "<html><body><p>" + "loose text " * 30 + "</p></body></html>",
+        ]
+        assert detect_selectors(pages) is None
+
+    def test_empty(self):
+        assert detect_selectors([]) is None
+        assert detect_selectors(["", ""]) is None
+
+
+class TestAnalyzerFallback:
+    def test_offline_detection_replaces_heuristic(self, monkeypatch):
+        from llm_analyzer import LLMAnalyzer
+
+        monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+        analysis = LLMAnalyzer().analyze(
+            "https://acme.dev/docs/a", "https://acme.dev", PAGES[0], set(), sample_htmls=PAGES[1:])
+        assert analysis.selector_spec.content_selector == "article.markdown"
+        assert "div.feedback" in analysis.selector_spec.prune_selectors
+        assert analysis.scope_rules.include_patterns == ["/docs/"]
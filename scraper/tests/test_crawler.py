@@ -1,6 +1,9 @@
 """Unit tests for crawler.py — URL-to-filepath, title extraction."""
+import pytest
+
 from crawler import Crawler
-from models import EngineMode, SelectorSpec
+from extractor import PageExtractor
+from models import EngineMode, ManifestEntry, SelectorSpec, UrlRecord
 
 
 class TestUrlToFilepath:
@@ -50,3 +53,487 @@ class TestExtractTitle:
         html = "<html><body></body></html>"
         soup = BeautifulSoup(html, "html.parser")
         assert Crawler._extract_title(soup, "") == "Untitled"
+
+
+class TestLastmodSkip:
+    def _crawler(self, tmp_path, previous):
+        return Crawler(EngineMode.CURL, SelectorSpec(), str(tmp_path), previous=previous)
+
+    def test_unchanged_lastmod_skips_fetch(self, tmp_path):
+        (tmp_path / "md" / "raw" / "docs").mkdir(parents=True)
+        (tmp_path / "md" / "raw" / "docs" / "a.md").write_text("x")
+        prev = ManifestEntry(url="https://e.com/docs/a", md_raw_path="docs/a.md", lastmod="2024-05-01")
+        crawler = self._crawler(tmp_path, {prev.url: prev})
+        assert crawler._lastmod_unchanged(UrlRecord(url=prev.url, lastmod="2024-05-01"))
+        assert not crawler._lastmod_unchanged(UrlRecord(url=prev.url, lastmod="2024-06-01"))
+        assert not crawler._lastmod_unchanged(UrlRecord(url=prev.url))
+
+    def test_missing_file_forces_fetch(self, tmp_path):
+        prev = ManifestEntry(url="https://e.com/docs/a", md_raw_path="docs/a.md", lastmod="2024-05-01")
+        crawler = self._crawler(tmp_path, {prev.url: prev})
+        assert not crawler._lastmod_unchanged(UrlRecord(url=prev.url, lastmod="2024-05-01"))
+
+
+class FakeResponse:
+    def __init__(self, status=200, text="", headers=None):
+        self.status_code = status
+        self.text = text
+        self.headers = headers or {}
+        self.encoding = None
+
+
+class FakeSession:
+    """requests.Session stand-in: url → FakeResponse, answering 304 to a matching If-None-Match."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+
+    def get(self, url, timeout=None, headers=None):
+        headers = headers or {}
+        self.requests.append((url, headers))
+        resp = self.pages.get(url, FakeResponse(404))
+        if resp.headers.get("ETag") and headers.get("If-None-Match") == resp.headers["ETag"]:
+            return FakeResponse(304)
+        return resp
+
+
+class TestIncrementalRevalidation:
+    URL = "https://e.com/docs/a"
+    PAGE = "<main><h1>A</h1><p>Enough text on this page to keep it around.</p></main>"
+
+    def _crawler(self, tmp_path, etag='"v1"', store=None):
+        (tmp_path / "md" / "raw" / "docs").mkdir(parents=True, exist_ok=True)
+        (tmp_path / "md" / "raw" / "docs" / "a.md").write_text("old")
+        prev = ManifestEntry(url=self.URL, md_raw_path="docs/a.md", etag='"v1"',
+                             last_modified="Wed, 01 May 2024 00:00:00 GMT", content_hash="h")
+        crawler = Crawler(EngineMode.CURL, SelectorSpec(content_selector="main"), str(tmp_path),
+                          previous={prev.url: prev}, store=store)
+        crawler.session = FakeSession({self.URL: FakeResponse(200, self.PAGE, {"ETag": etag})})
+        return crawler
+
+    def test_conditional_headers(self, tmp_path):
+        crawler = self._crawler(tmp_path)
+        assert crawler._conditional_headers(self.URL) == {
+            "If-None-Match": '"v1"', "If-Modified-Since": "Wed, 01 May 2024 00:00:00 GMT"}
+        assert crawler._conditional_headers("https://e.com/docs/new") == {}
+        (tmp_path / "md" / "raw" / "docs" / "a.md").unlink()
+        assert crawler._conditional_headers(self.URL) == {}  # no file to reuse
+
+    def test_304_keeps_previous_entry(self, tmp_path):
+        crawler = self._crawler(tmp_path)
+        manifest = crawler.crawl([UrlRecord(url=self.URL)])
+        assert crawler.unchanged == 1 and crawler.changed_paths == []
+        assert [e.content_hash for e in manifest.entries] == ["h"]
+        assert (tmp_path / "md" / "raw" / "docs" / "a.md").read_text() == "old"
+
+    def test_changed_page_rewritten(self, tmp_path):
+        crawler = self._crawler(tmp_path, etag='"v2"')
+        manifest = crawler.crawl([UrlRecord(url=self.URL)])
+        assert crawler.changed_paths == ["docs/a.md"]
+        assert manifest.entries[0].etag == '"v2"'
+
+    def test_stored_copy_with_same_validator_not_modified(self, tmp_path):
+        from fetch_store import FetchStore
+
+        store = FetchStore(tmp_path / "cache")
+        store.put(self.URL, EngineMode.CURL.value, self.PAGE, headers={"etag": '"v1"', "last-modified": ""})
+        crawler = self._crawler(tmp_path, store=store)
+        crawler.crawl([UrlRecord(url=self.URL)])
+        assert crawler.unchanged == 1
+        assert crawler.session.requests == []
+
+    def test_stored_copy_without_validators_revalidated(self, tmp_path):
+        from fetch_store import FetchStore
+
+        store = FetchStore(tmp_path / "cache")
+        store.put(self.URL, EngineMode.CURL.value, self.PAGE)  # e.g. filled by the quick sample
+        crawler = self._crawler(tmp_path, store=store)
+        crawler.crawl([UrlRecord(url=self.URL)])
+        assert crawler.unchanged == 1
+        assert crawler.session.requests[0][1]["If-None-Match"] == '"v1"'
+
+
+class TestGatsbyPageData:
+    """HYDRATION mode attaches page-data.json to stored pages as well as fetched ones."""
+    SHELL = '<html><head><title>{}</title></head><body><div id="___gatsby"></div></body></html>'
+    BODY = "# {}\n\n" + "Install the tool, then run `init` in the project folder. " * 5
+
+    def _page_data(self, name):
+        import json
+        return json.dumps({"result": {"data": {"mdx": {"body": self.BODY.format(name)}}}})
+
+    def _setup(self, tmp_path):
+        from fetch_store import FetchStore
+
+        store = FetchStore(tmp_path / "cache")
+        store.put("https://e.com/docs/a", EngineMode.CURL.value, self.SHELL.format("A"))  # stored by discovery
+        pages = {f"https://e.com/page-data/docs/{n}/page-data.json": FakeResponse(200, self._page_data(n.upper()))
+                 for n in ("a", "b")}
+        pages["https://e.com/docs/b"] = FakeResponse(200, self.SHELL.format("B"))
+        return store, pages
+
+    def test_stored_shell_gets_page_data(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("crawler.robots_crawl_delay", lambda base_url, session: 0.0)
+        store, pages = self._setup(tmp_path)
+        crawler = Crawler(EngineMode.HYDRATION, SelectorSpec(content_selector="article"), str(tmp_path), store=store)
+        crawler.session = FakeSession(pages)
+        manifest = crawler.crawl([UrlRecord(url="https://e.com/docs/a"), UrlRecord(url="https://e.com/docs/b")])
+
+        assert sorted(e.url for e in manifest.entries) == ["https://e.com/docs/a", "https://e.com/docs/b"]
+        assert "https://e.com/page-data/docs/a/page-data.json" in [url for url, _ in crawler.session.requests]
+        assert "anydocs-page-data" in store.get("https://e.com/docs/a", EngineMode.CURL.value)
+
+    def test_stored_shell_gets_page_data_async(self, tmp_path, monkeypatch):
+        httpx = pytest.importorskip("httpx")
+        import crawler as crawler_module
+
+        store, pages = self._setup(tmp_path)
+        requested = []
+
+        def handler(request):
+            requested.append(str(request.url))
+            resp = pages.get(str(request.url), FakeResponse(404))
+            return httpx.Response(resp.status_code, text=resp.text)
+        client = httpx.AsyncClient
+        monkeypatch.setattr(crawler_module.httpx, "AsyncClient",
+                            lambda **kw: client(transport=httpx.MockTransport(handler), **kw))
+        monkeypatch.setattr(crawler_module, "robots_crawl_delay", lambda base_url, session: 0.0)
+        crawler = Crawler(EngineMode.HYDRATION, SelectorSpec(content_selector="article"), str(tmp_path),
+                          store=store, async_fetch=True)
+        manifest = crawler.crawl([UrlRecord(url="https://e.com/docs/a"), UrlRecord(url="https://e.com/docs/b")])
+
+        assert manifest.total_pages == 2
+        assert "https://e.com/page-data/docs/a/page-data.json" in requested
+
+
+class TestHybridFetch:
+    RICH = "<main><h1>Title</h1><p>" + "Plenty of server-rendered text. " * 30 + "</p></main>"
+    SHELL = '<div id="root"></div>'
+
+    def _crawler(self, tmp_path, monkeypatch, curl_html, rendered_html):
+        import crawler as crawler_module
+        from crawler import FetchResult
+        monkeypatch.setattr(crawler_module, "SELENIUM_AVAILABLE", True)
+        crawler = Crawler(EngineMode.HYBRID, SelectorSpec(), str(tmp_path))
+        crawler.rendered = 0
+        crawler.browser_calls = []
+        monkeypatch.setattr(crawler, "_fetch_curl", lambda url: FetchResult(html=curl_html, etag='"v1"'))
+
+        def fetch_selenium(url):
+            crawler.browser_calls.append(url)
+            return rendered_html
+        monkeypatch.setattr(crawler, "_fetch_selenium", fetch_selenium)
+        return crawler
+
+    def test_rich_page_stays_on_http(self, tmp_path, monkeypatch):
+        crawler = self._crawler(tmp_path, monkeypatch, self.RICH, self.RICH)
+        assert crawler._fetch("https://e.com/a").html == self.RICH
+        assert crawler.browser_calls == []
+
+    def test_thin_page_rendered(self, tmp_path, monkeypatch):
+        crawler = self._crawler(tmp_path, monkeypatch, self.SHELL, self.RICH)
+        result = crawler._fetch("https://e.com/a")
+        assert result.html == self.RICH
+        assert result.etag == '"v1"'  # HTTP validators kept for revalidation
+        assert crawler.rendered == 1
+
+    def test_render_no_better_keeps_http(self, tmp_path, monkeypatch):
+        crawler = self._crawler(tmp_path, monkeypatch, self.SHELL, self.SHELL)
+        assert crawler._fetch("https://e.com/a").html == self.SHELL
+        assert crawler.browser_calls == ["https://e.com/a"]
+        assert crawler.rendered == 0
+
+
+class TestMarkdownSourceFetch:
+    MARKDOWN = "# Setup\n\nInstall the tool, then run `init` in the project folder.\n\n- one\n- two\n"
+    HTML = "<main><h1>Setup</h1><p>Install the tool.</p></main>"
+
+    def _crawler(self, tmp_path, monkeypatch, responses):
+        from crawler import FetchResult
+        crawler = Crawler(EngineMode.CURL, SelectorSpec(), str(tmp_path), markdown_source="suffix")
+        crawler.requests = []
+
+        def fetch_curl(url, fetch_url=None, headers=None):
+            crawler.requests.append(fetch_url or url)
+            return responses.get(fetch_url or url) or FetchResult(retry=True)
+        monkeypatch.setattr(crawler, "_fetch_curl", fetch_curl)
+        return crawler
+
+    def test_markdown_source_used(self, tmp_path, monkeypatch):
+        from crawler import FetchResult
+        from hydration import document_markdown
+        crawler = self._crawler(tmp_path, monkeypatch, {
+            "https://e.com/setup.md": FetchResult(html=self.MARKDOWN, content_type="text/markdown", etag='"m1"'),
+        })
+        result = crawler._fetch("https://e.com/setup")
+        assert document_markdown(result.html).startswith("Install the tool")
+        assert result.etag == '"m1"'
+        assert crawler.requests == ["https://e.com/setup.md"]
+        assert crawler.native_markdown == 1
+
+    def test_falls_back_to_html(self, tmp_path, monkeypatch):
+        from crawler import FetchResult
+        crawler = self._crawler(tmp_path, monkeypatch, {
+            "https://e.com/setup.md": FetchResult(html="<!DOCTYPE html><html>" + self.HTML, content_type="text/html"),
+            "https://e.com/setup": FetchResult(html=self.HTML, content_type="text/html"),
+        })
+        assert crawler._fetch("https://e.com/setup").html == self.HTML
+        assert crawler.requests == ["https://e.com/setup.md", "https://e.com/setup"]
+        assert crawler.native_markdown == 0
+
+
+class TestExtractPool:
+    PAGE = "<main><h1>A</h1><p>Enough text on this page to keep it around.</p></main>"
+
+    class RecordingPool:
+        """ProcessPoolExecutor stand-in: runs submissions on the caller, or refuses them."""
+
+        def __init__(self, broken=False):
+            self.broken = broken
+            self.submitted = []
+
+        def submit(self, fn, *args):
+            from concurrent.futures import Future
+
+            if self.broken:
+                raise RuntimeError("pool is broken")
+            self.submitted.append(args[0].url)
+            future = Future()
+            future.set_result(PageExtractor(SelectorSpec(content_selector="main"), self.raw_dir).process(*args[:3]))
+            return future
+
+    def _crawler(self, tmp_path, pool):
+        import threading
+
+        crawler = Crawler(EngineMode.CURL, SelectorSpec(content_selector="main"), str(tmp_path))
+        pool.raw_dir = str(crawler.raw_dir)
+        crawler._extract_pool = pool
+        crawler._extract_slots = threading.BoundedSemaphore(2)
+        return crawler
+
+    def test_refused_submit_releases_slot(self, tmp_path):
+        from crawler import FetchResult
+
+        crawler = self._crawler(tmp_path, self.RecordingPool(broken=True))
+        for i in range(5):  # more than the two slots: would block if slots leaked
+            crawler._dispatch_extract(UrlRecord(url=f"https://e.com/docs/p{i}"), FetchResult(html=self.PAGE))
+        assert crawler._extract_slots.acquire(blocking=False) and crawler._extract_slots.acquire(blocking=False)
+        assert crawler._extracting == 0
+
+    def test_stale_extraction_redone_in_pool(self, tmp_path, monkeypatch):
+        from crawler import FetchResult
+
+        pool = self.RecordingPool()
+        crawler = self._crawler(tmp_path, pool)
+        monkeypatch.setattr(crawler.extractor, "process", lambda *args: pytest.fail("redo ran on the result thread"))
+        record, result = UrlRecord(url="https://e.com/docs/a"), FetchResult(html=self.PAGE)
+        crawler._spec_version = 1  # selectors switched while the page was being extracted
+        crawler._collect(record, None, result, version=0)
+        assert pool.submitted == ["https://e.com/docs/a"]
+        assert [e.url for e in crawler._entries] == ["https://e.com/docs/a"]
+        assert crawler._extracting == 0
+
+
+class TestOnlineQualityCheck:
+    BODY = "Each page explains one part of the tool in enough detail to be useful. " * 6
+
+    def _page(self, i: int) -> str:
+        return (f'<html><body><div class="crumbs">Docs / Page {i}</div>'
+                f'<article class="doc"><h1>Page {i}</h1><p>{self.BODY}</p></article></body></html>')
+
+    def _crawl(self, tmp_path, monkeypatch, workers, new_spec):
+        from crawler import FetchResult
+        from quality_monitor import QualityMonitor
+        calls = {"fetches": [], "switch_pages": []}
+
+        def on_poor_quality(stats, pages):
+            calls["switch_pages"].append(len(pages))
+            return new_spec
+
+        crawler = Crawler(
+            EngineMode.CURL, SelectorSpec(content_selector="div.crumbs"), str(tmp_path), max_workers=workers,
+            monitor=QualityMonitor(0.5, check_after=3), on_poor_quality=on_poor_quality,
+        )
+
+        def fetch_curl(url, fetch_url=None, headers=None):
+            calls["fetches"].append(url)
+            return FetchResult(html=self._page(int(url.rsplit("/", 1)[1])))
+        monkeypatch.setattr(crawler, "_fetch_curl", fetch_curl)
+        frontier = [UrlRecord(url=f"https://e.com/docs/{i}") for i in range(10)]
+        return crawler, crawler.crawl(frontier), calls
+
+    def test_switch_reextracts_from_memory(self, tmp_path, monkeypatch):
+        crawler, manifest, calls = self._crawl(tmp_path, monkeypatch, 1, SelectorSpec(content_selector="article.doc"))
+        assert crawler.selector_switched
+        assert calls["switch_pages"] == [3]
+        assert sorted(calls["fetches"]) == sorted(f"https://e.com/docs/{i}" for i in range(10))  # nothing refetched
+        assert manifest.total_pages == 10
+        for entry in manifest.entries:
+            assert "enough detail" in (tmp_path / "md" / "raw" / entry.md_raw_path).read_text(encoding="utf-8")
+
+    def test_switch_with_parallel_workers(self, tmp_path, monkeypatch):
+        crawler, manifest, calls = self._crawl(tmp_path, monkeypatch, 4, SelectorSpec(content_selector="article.doc"))
+        assert crawler.selector_switched
+        assert sorted(e.url for e in manifest.entries) == sorted(f"https://e.com/docs/{i}" for i in range(10))
+        assert all(e.size_bytes > 300 for e in manifest.entries)
+
+    def test_switch_runs_on_its_own_thread(self, tmp_path, monkeypatch):
+        import threading
+
+        threads = []
+        switch_selectors = Crawler._switch_selectors
+
+        def record_thread(crawler):
+            threads.append(threading.current_thread().name)
+            switch_selectors(crawler)
+        monkeypatch.setattr(Crawler, "_switch_selectors", record_thread)
+        crawler, manifest, calls = self._crawl(tmp_path, monkeypatch, 2, SelectorSpec(content_selector="article.doc"))
+        assert threads == ["selector-switch"]
+        assert manifest.total_pages == 10
+
+    def test_no_better_selectors(self, tmp_path, monkeypatch):
+        crawler, manifest, calls = self._crawl(tmp_path, monkeypatch, 1, None)
+        assert not crawler.selector_switched
+        assert calls["switch_pages"] == [3]
+        assert crawler._retained == []
+
+
+class TestAsyncCrawl:
+    """_crawl_async / _fetch_async against an httpx.MockTransport."""
+    PAGE = "<main><h1>{}</h1><p>Enough text on this page to keep it around.</p></main>"
+
+    def _crawler(self, tmp_path, monkeypatch, handler, **kwargs):
+        httpx = pytest.importorskip("httpx")
+        import crawler as crawler_module
+
+        client = httpx.AsyncClient
+        monkeypatch.setattr(crawler_module.httpx, "AsyncClient",
+                            lambda **kw: client(transport=httpx.MockTransport(handler), **kw))
+        monkeypatch.setattr(crawler_module, "robots_crawl_delay", lambda base_url, session: 0.0)
+        crawler = Crawler(EngineMode.CURL, SelectorSpec(content_selector="main"), str(tmp_path),
+                          async_fetch=True, **kwargs)
+        monkeypatch.setattr(crawler.politeness, "retry_delay", lambda url, attempt: 0.01)
+        return crawler
+
+    def _frontier(self, n):
+        return [UrlRecord(url=f"https://e.com/docs/p{i}") for i in range(n)]
+
+    def test_retry_then_success(self, tmp_path, monkeypatch):
+        import httpx
+
+        calls = []
+
+        def handler(request):
+            calls.append(str(request.url))
+            if len(calls) == 1:
+                return httpx.Response(500)
+            return httpx.Response(200, text=self.PAGE.format("P0"))
+        crawler = self._crawler(tmp_path, monkeypatch, handler)
+        manifest = crawler.crawl(self._frontier(1))
+        assert len(calls) == 2
+        assert manifest.total_pages == 1
+
+    def test_retries_exhausted(self, tmp_path, monkeypatch):
+        import httpx
+
+        calls = []
+
+        def handler(request):
+            calls.append(str(request.url))
+            return httpx.Response(500)
+        crawler = self._crawler(tmp_path, monkeypatch, handler, max_retries=3)
+        assert crawler.crawl(self._frontier(1)).total_pages == 0
+        assert len(calls) == 3
+
+    def test_give_up_status_not_retried(self, tmp_path, monkeypatch):
+        import httpx
+
+        calls = []
+
+        def handler(request):
+            calls.append(str(request.url))
+            return httpx.Response(404)
+        crawler = self._crawler(tmp_path, monkeypatch, handler)
+        assert crawler.crawl(self._frontier(1)).total_pages == 0
+        assert len(calls) == 1
+
+    def test_per_host_connection_cap(self, tmp_path, monkeypatch):
+        import asyncio
+
+        import httpx
+
+        active, peak = [0], [0]
+
+        async def handler(request):
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.01)
+            active[0] -= 1
+            return httpx.Response(200, text=self.PAGE.format(request.url.path))
+        crawler = self._crawler(tmp_path, monkeypatch, handler, per_host_connections=3)
+        assert crawler.crawl(self._frontier(20)).total_pages == 20
+        assert 1 < peak[0] <= 3
+
+    def test_not_modified_keeps_previous(self, tmp_path, monkeypatch):
+        import httpx
+
+        (tmp_path / "md" / "raw" / "docs").mkdir(parents=True)
+        (tmp_path / "md" / "raw" / "docs" / "p0.md").write_text("old")
+        prev = ManifestEntry(url="https://e.com/docs/p0", md_raw_path="docs/p0.md", etag='"v1"', content_hash="h")
+
+        def handler(request):
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, text=self.PAGE.format("P0"))
+        crawler = self._crawler(tmp_path, monkeypatch, handler, previous={prev.url: prev})
+        manifest = crawler.crawl(self._frontier(1))
+        assert crawler.unchanged == 1
+        assert [e.content_hash for e in manifest.entries] == ["h"]
+
+    def test_extraction_failure_does_not_end_crawl(self, tmp_path, monkeypatch):
+        import httpx
+
+        crawler = self._crawler(tmp_path, monkeypatch, lambda request: httpx.Response(
+            200, text=self.PAGE.format(request.url.path)))
+        process = crawler.extractor.process
+
+        def flaky(record, html, previous_hash=""):
+            if record.url.endswith("p1"):
+                raise ValueError("bad payload")
+            return process(record, html, previous_hash)
+        monkeypatch.setattr(crawler.extractor, "process", flaky)
+        manifest = crawler.crawl(self._frontier(3))
+        assert sorted(e.url for e in manifest.entries) == ["https://e.com/docs/p0", "https://e.com/docs/p2"]
+
+    def test_event_loop_keeps_fetching_during_selector_switch(self, tmp_path, monkeypatch):
+        import asyncio
+        import time
+
+        import httpx
+
+        from extractor import PageExtractor
+        from quality_monitor import QualityMonitor
+
+        requests_at, switch = [], {}
+        page = "<html><body><div class='crumbs'>x</div><article class='doc'><h1>{}</h1><p>" + "Text. " * 60 + "</p></article></body></html>"
+
+        async def handler(request):
+            requests_at.append(time.monotonic())
+            await asyncio.sleep(0.02)
+            return httpx.Response(200, text=page.format(request.url.path))
+
+        def on_poor_quality(stats, pages):
+            switch["start"] = time.monotonic()
+            time.sleep(0.3)  # the LLM call
+            switch["end"] = time.monotonic()
+            return SelectorSpec(content_selector="article.doc")
+
+        crawler = self._crawler(tmp_path, monkeypatch, handler, per_host_connections=2,
+                                monitor=QualityMonitor(0.5, check_after=3), on_poor_quality=on_poor_quality)
+        crawler.selector_spec = SelectorSpec(content_selector="div.crumbs")
+        crawler.extractor = PageExtractor(crawler.selector_spec, str(crawler.raw_dir))
+        manifest = crawler.crawl(self._frontier(30))
+        assert crawler.selector_switched
+        assert manifest.total_pages == 30
+        assert any(switch["start"] < t < switch["end"] for t in requests_at)
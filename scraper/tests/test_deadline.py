@@ -0,0 +1,31 @@
+"""Unit tests for deadline.py — time budget bookkeeping."""
+import math
+
+from deadline import Deadline
+
+
+class TestDeadline:
+    def test_no_budget_never_expires(self):
+        deadline = Deadline(0)
+        assert not deadline.enabled
+        assert not deadline.expired()
+        assert deadline.remaining() == math.inf
+
+    def test_budget_counts_down(self):
+        deadline = Deadline(60)
+        assert deadline.enabled
+        assert 59 < deadline.remaining() <= 60
+        assert not deadline.expired()
+
+    def test_reserve_moves_end_earlier(self):
+        deadline = Deadline(60)
+        assert deadline.reserve(50).remaining() <= 10
+        assert deadline.reserve(61).expired()
+        assert deadline.reserve(61).remaining() == 0.0
+
+    def test_reserve_without_budget_stays_unlimited(self):
+        assert not Deadline().reserve(30).expired()
+        unlimited = Deadline()
+        reserved = unlimited.reserve(unlimited.remaining() * 0.7)  # the pipeline's discovery share
+        assert reserved.remaining() == math.inf
+        assert not reserved.enabled
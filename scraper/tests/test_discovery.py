@@ -45,3 +45,206 @@ class TestIsNavigable:
 
     def test_html_extension_navigable(self):
         assert DiscoveryWorker._is_navigable("https://example.com/page.html")
+
+
+class TestSitemapUrlEntry:
+    NS = {"ns": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+
+    def _url_el(self, inner):
+        import xml.etree.ElementTree as ET
+        return ET.fromstring(f'<url xmlns="{self.NS["ns"]}">{inner}</url>')
+
+    def test_reads_lastmod_changefreq_priority(self):
+        el = self._url_el(
+            "<loc> https://example.com/docs/intro </loc><lastmod>2024-05-01</lastmod>"
+            "<changefreq>weekly</changefreq><priority>0.8</priority>"
+        )
+        entry = DiscoveryWorker._parse_url_entry(el, self.NS)
+        assert entry["url"] == "https://example.com/docs/intro"
+        assert entry["lastmod"] == "2024-05-01"
+        assert entry["changefreq"] == "weekly"
+        assert entry["priority"] == "0.8"
+
+    def test_optional_fields_absent(self):
+        entry = DiscoveryWorker._parse_url_entry(self._url_el("<loc>https://example.com/a</loc>"), self.NS)
+        assert entry == {"url": "https://example.com/a", "title": "A"}
+
+    def test_missing_loc_skipped(self):
+        assert DiscoveryWorker._parse_url_entry(self._url_el("<lastmod>2024</lastmod>"), self.NS) is None
+
+    def test_priority_clamped_and_malformed(self):
+        assert DiscoveryWorker._parse_priority("1.5") == 1.0
+        assert DiscoveryWorker._parse_priority("0.3") == 0.3
+        assert DiscoveryWorker._parse_priority("high") is None
+        assert DiscoveryWorker._parse_priority(None) is None
+
+
+class FakeResponse:
+    def __init__(self, text, status=200, content_type="text/plain; charset=utf-8"):
+        self.text = text
+        self.status_code = status
+        self.headers = {"Content-Type": content_type}
+        self.encoding = None
+        self.content = text.encode()
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+
+class FakeSession:
+    def __init__(self, files):
+        self.files = files
+        self.requested = []
+
+    def get(self, url, timeout=None, headers=None):
+        self.requested.append(url)
+        if url in self.files:
+            body = self.files[url]
+            return FakeResponse(*body) if isinstance(body, tuple) else FakeResponse(body)
+        return FakeResponse("<!DOCTYPE html><html>Not found</html>", content_type="text/html")
+
+
+class TestProbeLlmsTxt:
+    START = "https://d.io/docs/"
+    BODY = "Explanation of this part of the documentation. " * 3
+
+    def _worker(self, files):
+        worker = DiscoveryWorker()
+        worker.session = FakeSession(files)
+        return worker
+
+    def test_full_corpus_split_and_scoped(self):
+        corpus = "\n".join(
+            f"# Page {i}\nSource: https://d.io/{'docs' if i < 4 else 'blog'}/p{i}\n\n{self.BODY}\n" for i in range(6))
+        worker = self._worker({"https://d.io/llms-full.txt": corpus})
+        pages = worker.probe_llms_txt(self.START)
+        assert [p.url for p in pages] == [f"https://d.io/docs/p{i}" for i in range(4)]
+        assert worker.session.requested[0] == "https://d.io/docs/llms-full.txt"
+
+    def test_max_pages(self):
+        corpus = "\n".join(f"# P{i}\nSource: https://d.io/docs/p{i}\n\n{self.BODY}\n" for i in range(10))
+        worker = self._worker({"https://d.io/docs/llms-full.txt": corpus})
+        assert len(worker.probe_llms_txt(self.START, max_pages=3)) == 3
+
+    def test_index_of_markdown_files(self):
+        worker = self._worker({
+            "https://d.io/llms.txt": "# D\n\n- [Intro](https://d.io/docs/intro.md)\n- [API](https://d.io/docs/api.md)\n",
+            "https://d.io/docs/intro.md": f"# Introduction\n\n{self.BODY}",
+            "https://d.io/docs/api.md": f"# API\n\n{self.BODY}",
+        })
+        pages = worker.probe_llms_txt(self.START)
+        assert [(p.url, p.title) for p in pages] == [
+            ("https://d.io/docs/intro", "Introduction"), ("https://d.io/docs/api", "API")]
+        assert pages[0].markdown == self.BODY.strip()
+
+    def test_index_of_html_pages_is_not_a_fast_path(self):
+        worker = self._worker({"https://d.io/llms.txt": "- [Intro](https://d.io/docs/intro)\n- [API](https://d.io/docs/api)\n"})
+        assert worker.probe_llms_txt(self.START) == []
+        assert [u for _, u in worker._llms_index_links(self.START)] == ["https://d.io/docs/intro", "https://d.io/docs/api"]
+
+    def test_nothing_published(self):
+        assert self._worker({}).probe_llms_txt(self.START) == []
+
+
+class TestProbeMarkdownSource:
+    URLS = [f"https://d.io/docs/p{i}" for i in range(3)]
+    BODY = "# Page\n\nExplanation of this part of the documentation, with [a link](/x)."
+
+    def _worker(self, files):
+        worker = DiscoveryWorker()
+        worker.session = FakeSession(files)
+        return worker
+
+    def test_suffix_alternates(self):
+        worker = self._worker({f"{u}.md": self.BODY for u in self.URLS})
+        assert worker.probe_markdown_source(self.URLS) == "suffix"
+
+    def test_content_negotiation_preferred(self):
+        files = {u: (self.BODY, 200, "text/markdown; charset=utf-8") for u in self.URLS}
+        files.update({f"{u}.md": self.BODY for u in self.URLS})
+        assert self._worker(files).probe_markdown_source(self.URLS) == "accept"
+
+    def test_html_answer_to_accept_rejected(self):
+        files = {u: ("<!DOCTYPE html><html><body>Page</body></html>", 200, "text/html") for u in self.URLS}
+        assert self._worker(files).probe_markdown_source(self.URLS) == ""
+
+    def test_most_pages_must_serve_markdown(self):
+        worker = self._worker({f"{self.URLS[0]}.md": self.BODY})
+        assert worker.probe_markdown_source(self.URLS) == ""
+
+
+class TestProbeSearchIndex:
+    def _worker(self, files):
+        worker = DiscoveryWorker()
+        worker.session = FakeSession(files)
+        return worker
+
+    def test_mkdocs_index_scoped_to_start_dir(self):
+        import json
+        index = {"docs": [
+            {"location": "guide/", "title": "Guide", "text": "Guide text."},
+            {"location": "blog/", "title": "Blog", "text": "Blog text."},
+        ]}
+        worker = self._worker({"https://d.io/search/search_index.json": json.dumps(index)})
+        html = '<meta name="generator" content="mkdocs-1.5">'
+        pages = worker.probe_search_index("https://d.io/guide/", html)
+        assert [(p.url, p.title, p.markdown) for p in pages] == [("https://d.io/guide/", "Guide", "Guide text.")]
+        worker.probe_search_index("https://d.io/guide/", html)
+        assert worker.session.requested.count("https://d.io/search/search_index.json") == 1
+
+    def test_vitepress_chunk_found_through_search_box(self):
+        import json
+        data = json.dumps({"documentIds": {"0": "/guide/#intro"}, "storedFields": {"0": {"title": "Intro", "titles": []}}})
+        worker = self._worker({
+            "https://d.io/assets/chunks/theme.A1.js": 'import("./VPLocalSearchBox.B2.js")',
+            "https://d.io/assets/chunks/VPLocalSearchBox.B2.js": 'import("./@localSearchIndexroot.C3.js")',
+            "https://d.io/assets/chunks/@localSearchIndexroot.C3.js": f"const e='{data}';export{{e as default}};",
+        })
+        html = '<meta name="generator" content="VitePress v1"><link rel="modulepreload" href="/assets/chunks/theme.A1.js">'
+        pages = worker.probe_search_index("https://d.io/", html)
+        assert [(p.url, p.title) for p in pages] == [("https://d.io/guide/", "Intro")]
+
+    def test_no_index(self):
+        assert self._worker({}).probe_search_index("https://d.io/docs/", "<html></html>") == []
+
+
+class TestStreamRecords:
+    SITEMAP = '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{}</urlset>'
+    INDEX = '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{}</sitemapindex>'
+
+    def _urls(self, *paths):
+        return self.SITEMAP.format("".join(f"<url><loc>https://d.io{p}</loc></url>" for p in paths))
+
+    def test_child_sitemaps_yielded_as_parsed(self):
+        worker = DiscoveryWorker()
+        worker.session = FakeSession({
+            "https://d.io/sitemap.xml": self.INDEX.format(
+                "<sitemap><loc>https://d.io/a.xml</loc></sitemap><sitemap><loc>https://d.io/b.xml</loc></sitemap>"),
+            "https://d.io/a.xml": self._urls("/docs/a1", "/docs/a2"),
+            "https://d.io/b.xml": self._urls("/docs/b1"),
+        })
+        entries = worker._iter_sitemap("https://d.io/sitemap.xml")
+        assert next(entries)["url"] == "https://d.io/docs/a1"
+        assert "https://d.io/b.xml" not in worker.session.requested
+        assert [e["url"] for e in entries] == ["https://d.io/docs/a2", "https://d.io/docs/b1"]
+
+    def test_sources_in_order(self, monkeypatch):
+        from search_index import SearchPage
+
+        worker = DiscoveryWorker()
+        worker.link_depth = {"https://d.io/docs/near": 1, "https://d.io/docs/far": 2}
+        worker.session = FakeSession({"https://d.io/sitemap.xml": self._urls("/docs/near", "/docs/s1", "/blog/x")})
+        monkeypatch.setattr(worker, "_find_sitemap_locations", lambda base_url: ["https://d.io/sitemap.xml"])
+        monkeypatch.setattr(worker, "probe_search_index",
+                            lambda start_url, html: [SearchPage(url="https://d.io/docs/found", title="Found", markdown="")])
+        records = list(worker.stream_records(
+            "https://d.io/docs/", "<html></html>", {"https://d.io/docs/far", "https://d.io/docs/near#top"}))
+        assert [(r.url, r.source) for r in records] == [
+            ("https://d.io/docs/near", "quick-sample"),
+            ("https://d.io/docs/far", "quick-sample"),
+            ("https://d.io/docs/found", "search-index"),
+            ("https://d.io/docs/near", "sitemap"),  # repeated: FrontierStream dedups
+            ("https://d.io/docs/s1", "sitemap"),
+        ]
+        assert records[0].depth == 1 and records[4].depth == -1
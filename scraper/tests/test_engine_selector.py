@@ -0,0 +1,88 @@
+"""Unit tests for engine_selector.py — page metrics, thinness and the engine decision."""
+import pytest
+
+import engine_selector
+from engine_selector import is_thin_page, page_metrics, select_engine
+from models import EngineMode
+
+START = "https://docs.example.com/guide/"
+
+NAV = "".join(f'<a href="/guide/p{i}">Page {i}</a>' for i in range(8))
+RICH = (
+    "<html><body><main><h1>Guide</h1>"
+    + "<p>" + "Server-rendered documentation text. " * 20 + "</p>"
+    + "<h2>Usage</h2><pre><code>pip install example</code></pre>"
+    + f"<div class='links'>{NAV}</div></main></body></html>"
+)
+RICHER = RICH.replace("</main>", "<h2>Tabs</h2><h2>API</h2><h2>More</h2><h2>Even more</h2>"
+                      + "<p>" + "Client-rendered extras. " * 40 + "</p></main>")
+SHELL = '<html><body><div id="root"></div><script src="/app.js"></script></body></html>'
+
+
+class TestPageMetrics:
+    def test_counts(self):
+        m = page_metrics(RICH, START)
+        assert m.headings == 2
+        assert m.code_blocks == 1
+        assert m.links == 8
+        assert m.md_length > 400
+
+    def test_empty(self):
+        assert page_metrics(None, START).md_length == 0
+
+    def test_shell_is_thin(self):
+        assert is_thin_page(SHELL, START)
+        assert is_thin_page("", START)
+
+    def test_rich_page_not_thin(self):
+        assert not is_thin_page(RICH, START)
+
+    def test_long_text_without_structure_or_links_is_thin(self):
+        assert is_thin_page("<p>" + "Loading the app... " * 50 + "</p>", START)
+
+
+class TestSelectEngine:
+    @pytest.fixture
+    def pages(self, monkeypatch):
+        served = {}
+        monkeypatch.setattr(engine_selector, "SELENIUM_AVAILABLE", True)
+        monkeypatch.setattr(engine_selector, "_fetch_curl", lambda url, timeout=None: served["curl"])
+        monkeypatch.setattr(engine_selector, "_fetch_selenium", lambda url, blocked=(): served["selenium"])
+        return served
+
+    def test_selenium_skipped_when_budget_low(self, pages, monkeypatch):
+        from deadline import Deadline
+
+        def no_browser(url, blocked=()):
+            raise AssertionError("Selenium must not start with the time budget nearly used up")
+        monkeypatch.setattr(engine_selector, "_fetch_selenium", no_browser)
+        pages.update(curl=SHELL)
+        decision = select_engine(START, deadline=Deadline(5))
+        assert decision.mode == EngineMode.CURL
+        assert "time budget" in decision.reason
+
+    def test_same_content_curl(self, pages):
+        pages.update(curl=RICH, selenium=RICH)
+        assert select_engine(START).mode == EngineMode.CURL
+
+    def test_spa_shell_selenium(self, pages):
+        pages.update(curl=SHELL, selenium=RICHER)
+        assert select_engine(START).mode == EngineMode.SELENIUM
+
+    def test_content_in_both_hybrid(self, pages):
+        pages.update(curl=RICH, selenium=RICHER)
+        decision = select_engine(START)
+        assert decision.mode == EngineMode.HYBRID
+        assert "thin pages" in decision.reason
+
+    def test_hydration_payload_chosen_over_browser(self, pages):
+        import json
+        body = "## Guide\n\n" + "Server-side payload text that the browser would render. " * 20
+        data = json.dumps({"props": {"pageProps": {"markdown": body}}})
+        pages.update(
+            curl=f'{SHELL}<script id="__NEXT_DATA__" type="application/json">{data}</script>',
+            selenium=RICHER,
+        )
+        decision = select_engine(START)
+        assert decision.mode == EngineMode.HYDRATION
+        assert "hydration payload" in decision.reason
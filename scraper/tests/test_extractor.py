@@ -0,0 +1,108 @@
+"""Unit tests for extractor.py — page extraction and process-pool worker."""
+from extractor import PageExtractor, extract_page, init_worker
+from models import SelectorSpec, UrlRecord
+
+PAGE_HTML = """<html><head><title>Intro</title></head><body>
+<nav><a href="/a">A</a></nav>
+<main><h1>Introduction</h1><p>Welcome to the documentation for this project.</p>
+<div class="feedback">Was this helpful?</div></main>
+</body></html>"""
+
+
+class TestPageExtractor:
+    def test_process_writes_file_and_entry(self, tmp_path):
+        extractor = PageExtractor(SelectorSpec(content_selector="main"), str(tmp_path))
+        entry = extractor.process(UrlRecord(url="https://example.com/docs/intro"), PAGE_HTML)
+        assert entry is not None
+        assert entry.md_raw_path == "docs/intro.md"
+        content = (tmp_path / "docs" / "intro.md").read_text(encoding="utf-8")
+        assert content.startswith("# Introduction")
+        assert "**Source:** https://example.com/docs/intro" in content
+        assert entry.size_bytes == len(content.encode("utf-8"))
+
+    def test_prune_selectors_applied(self, tmp_path):
+        spec = SelectorSpec(content_selector="main", prune_selectors=[".feedback"])
+        extractor = PageExtractor(spec, str(tmp_path))
+        extractor.process(UrlRecord(url="https://example.com/docs/intro"), PAGE_HTML)
+        content = (tmp_path / "docs" / "intro.md").read_text(encoding="utf-8")
+        assert "Was this helpful" not in content
+
+    def test_empty_content_returns_none(self, tmp_path):
+        extractor = PageExtractor(SelectorSpec(content_selector="main"), str(tmp_path))
+        html = "<html><body><main><p>Hi</p></main></body></html>"
+        assert extractor.process(UrlRecord(url="https://example.com/x"), html) is None
+
+
+    def test_unchanged_hash_not_rewritten(self, tmp_path):
+        extractor = PageExtractor(SelectorSpec(content_selector="main"), str(tmp_path))
+        record = UrlRecord(url="https://example.com/docs/intro")
+        entry = extractor.write_page(record, "Intro", "Body text")
+        path = tmp_path / "docs" / "intro.md"
+        path.write_text("deduplicated copy", encoding="utf-8")
+
+        again = extractor.write_page(record, "Intro", "Body text", previous_hash=entry.content_hash)
+        assert again.content_hash == entry.content_hash
+        assert path.read_text(encoding="utf-8") == "deduplicated copy"
+
+        changed = extractor.write_page(record, "Intro", "New body", previous_hash=entry.content_hash)
+        assert changed.content_hash != entry.content_hash
+        assert "New body" in path.read_text(encoding="utf-8")
+
+    def test_unchanged_hash_with_missing_file_rewritten(self, tmp_path):
+        extractor = PageExtractor(SelectorSpec(content_selector="main"), str(tmp_path))
+        record = UrlRecord(url="https://example.com/docs/intro")
+        entry = extractor.write_page(record, "Intro", "Body text")
+        (tmp_path / "docs" / "intro.md").unlink()
+        extractor.write_page(record, "Intro", "Body text", previous_hash=entry.content_hash)
+        assert (tmp_path / "docs" / "intro.md").exists()
+
+
+class TestWorkerEntryPoints:
+    def test_init_then_extract(self, tmp_path):
+        init_worker(SelectorSpec(content_selector="main"), str(tmp_path))
+        entry = extract_page(UrlRecord(url="https://example.com/docs/intro"), PAGE_HTML)
+        assert entry.url == "https://example.com/docs/intro"
+        assert (tmp_path / "docs" / "intro.md").exists()
+
+
+class TestHydratedExtraction:
+    def _page(self):
+        import json
+        markdown = "## Setup\n\n" + "Install the tool, then run `init` in the project folder. " * 5
+        data = json.dumps({"props": {"pageProps": {"title": "Setup guide", "markdown": markdown}}})
+        return (f'<html><body><div id="__next"><p>Loading...</p></div>'
+                f'<script id="__NEXT_DATA__" type="application/json">{data}</script></body></html>')
+
+    def test_payload_rendered_when_enabled(self, tmp_path):
+        extractor = PageExtractor(SelectorSpec(content_selector="article"), str(tmp_path), hydrate=True)
+        entry = extractor.process(UrlRecord(url="https://example.com/docs/setup"), self._page())
+        content = (tmp_path / entry.md_raw_path).read_text(encoding="utf-8")
+        assert content.startswith("# Setup guide")
+        assert "run `init` in the project folder" in content
+        assert "## Setup" in entry.headings
+
+    def test_payload_ignored_by_default(self, tmp_path):
+        extractor = PageExtractor(SelectorSpec(content_selector="article"), str(tmp_path))
+        assert extractor.process(UrlRecord(url="https://example.com/docs/setup"), self._page()) is None
+
+    def test_markdown_document_passes_through(self, tmp_path):
+        from hydration import markdown_document
+        markdown = "Run `init`, then open <http://localhost:3000>.\n\n```html\n<div></div>\n```"
+        extractor = PageExtractor(SelectorSpec(content_selector="article"), str(tmp_path))
+        entry = extractor.process(UrlRecord(url="https://example.com/docs/setup"), markdown_document(markdown, "Setup"))
+        content = (tmp_path / entry.md_raw_path).read_text(encoding="utf-8")
+        assert content.startswith("# Setup")
+        assert "```html\n<div></div>\n```" in content
+
+    def test_markdown_document_not_parsed(self, tmp_path, monkeypatch):
+        import extractor as extractor_module
+        from hydration import markdown_document
+
+        def no_parse(*args, **kwargs):
+            raise AssertionError("Markdown documents must not be parsed as HTML")
+        monkeypatch.setattr(extractor_module, "BeautifulSoup", no_parse)
+        monkeypatch.setattr("hydration.BeautifulSoup", no_parse)
+        markdown = "Run `init` in the project folder, then open the generated config file."
+        extractor = PageExtractor(SelectorSpec(content_selector="article"), str(tmp_path), hydrate=True)
+        entry = extractor.process(UrlRecord(url="https://example.com/docs/setup"), markdown_document(markdown, "Setup"))
+        assert (tmp_path / entry.md_raw_path).read_text(encoding="utf-8").startswith("# Setup")
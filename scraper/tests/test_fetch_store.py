@@ -0,0 +1,33 @@
+"""Unit tests for fetch_store.py — keying, engine separation, cleanup."""
+from fetch_store import FetchStore
+
+
+class TestFetchStore:
+    def test_put_then_get(self, tmp_path):
+        store = FetchStore(tmp_path / "cache")
+        store.put("https://example.com/docs/intro", "curl", "<html>hi</html>")
+        assert store.get("https://example.com/docs/intro", "curl") == "<html>hi</html>"
+        assert store.hits == 1
+
+    def test_miss_counted(self, tmp_path):
+        store = FetchStore(tmp_path / "cache")
+        assert store.get("https://example.com/none", "curl") is None
+        assert store.misses == 1
+
+    def test_trailing_slash_and_fragment_ignored(self, tmp_path):
+        store = FetchStore(tmp_path / "cache")
+        store.put("https://example.com/docs/", "curl", "x")
+        assert store.get("https://example.com/docs#section", "curl") == "x"
+
+    def test_engines_kept_apart(self, tmp_path):
+        store = FetchStore(tmp_path / "cache")
+        store.put("https://example.com/a", "curl", "raw")
+        assert store.get("https://example.com/a", "selenium") is None
+        assert ("https://example.com/a", "curl") in store
+
+    def test_clear_removes_directory(self, tmp_path):
+        store = FetchStore(tmp_path / "cache")
+        store.put("https://example.com/a", "curl", "raw")
+        store.clear()
+        assert len(store) == 0
+        assert not (tmp_path / "cache").exists()
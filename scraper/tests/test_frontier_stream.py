@@ -0,0 +1,115 @@
+"""Unit tests for frontier_stream.py and streamed crawls — discovery feeding the crawler."""
+import queue
+import threading
+
+import pytest
+
+from checkpoint import CrawlJournal
+from crawler import Crawler, FetchResult
+from frontier_stream import FrontierStream, same_locale, url_locale
+from models import EngineMode, SelectorSpec, UrlRecord
+
+
+def _record(path: str) -> UrlRecord:
+    return UrlRecord(url=f"https://e.com{path}")
+
+
+def _produce(stream: FrontierStream, paths):
+    def run():
+        try:
+            for path in paths:
+                if not stream.put(_record(path)):
+                    break
+        finally:
+            stream.close()
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+class TestLocale:
+    def test_url_locale(self):
+        assert url_locale("https://e.com/en/stable/") == "en"
+        assert url_locale("https://e.com/zh-Hans/guide") == "zh-hans"
+        assert url_locale("https://e.com/docs/intro") is None
+
+    def test_same_locale(self):
+        keep = same_locale("https://e.com/en/stable/intro")
+        assert keep(_record("/en/stable/a")) and keep(_record("/api/b"))
+        assert not keep(_record("/ja/6.0/a"))
+        assert same_locale("https://e.com/docs/")(_record("/ja/6.0/a"))
+
+
+class TestFrontierStream:
+    def test_dedup_filter_and_order(self):
+        stream = FrontierStream()
+        stream.accept = lambda record: "/docs/" in record.url
+        for path in ("/docs/a", "/blog/x", "/docs/b", "/docs/a"):
+            stream.put(_record(path))
+        stream.close()
+        assert [r.url for r in stream] == ["https://e.com/docs/a", "https://e.com/docs/b"]
+        assert stream.dropped == 1
+        assert len(stream.discovered) == 3
+        assert stream.get() is None
+
+    def test_empty_without_waiting(self):
+        stream = FrontierStream()
+        with pytest.raises(queue.Empty):
+            stream.get(timeout=0)
+
+    def test_bounded_queue_backpressure(self):
+        stream = FrontierStream(maxsize=2)
+        producer = _produce(stream, [f"/docs/p{i}" for i in range(10)])
+        producer.join(timeout=0.5)
+        assert producer.is_alive()  # blocked on the full queue
+        assert len(list(stream)) == 10
+        producer.join(timeout=1)
+        assert not producer.is_alive()
+
+    def test_limit_stops_producer(self):
+        stream = FrontierStream(maxsize=2, limit=3)
+        producer = _produce(stream, [f"/docs/p{i}" for i in range(100)])
+        assert len(list(stream)) == 3
+        producer.join(timeout=1)
+        assert not producer.is_alive()
+        assert len(stream.discovered) < 100
+
+
+class TestStreamedCrawl:
+    def _crawler(self, tmp_path, monkeypatch, **kwargs):
+        crawler = Crawler(EngineMode.CURL, SelectorSpec(content_selector="main"), str(tmp_path / "out"),
+                          max_workers=2, **kwargs)
+        monkeypatch.setattr(crawler, "_fetch_curl", lambda url, fetch_url=None, headers=None: FetchResult(
+            html=f"<main><h1>{url}</h1><p>Enough text on this page to keep it.</p></main>"))
+        monkeypatch.setattr("crawler.robots_crawl_delay", lambda base_url, session: 0.0)
+        return crawler
+
+    def test_crawl_consumes_stream(self, tmp_path, monkeypatch):
+        stream = FrontierStream(maxsize=2)
+        _produce(stream, [f"/docs/p{i}" for i in range(6)])
+        manifest = self._crawler(tmp_path, monkeypatch).crawl(stream)
+        assert sorted(e.url for e in manifest.entries) == [f"https://e.com/docs/p{i}" for i in range(6)]
+        assert manifest.start_url == "https://e.com/docs/p0"
+
+    def test_async_crawl_consumes_stream(self, tmp_path, monkeypatch):
+        pytest.importorskip("httpx")
+        stream = FrontierStream(maxsize=2)
+        _produce(stream, [f"/docs/p{i}" for i in range(6)])
+        crawler = self._crawler(tmp_path, monkeypatch, async_fetch=True)
+
+        async def fetch_async(client, url, fetch_url=None, headers=None):
+            return crawler._fetch_curl(url)
+        monkeypatch.setattr(crawler, "_fetch_async", fetch_async)
+        assert crawler.crawl(stream).total_pages == 6
+
+    def test_streamed_urls_journaled(self, tmp_path, monkeypatch):
+        journal = CrawlJournal(tmp_path)
+        journal.begin("https://e.com/docs/", EngineMode.CURL, SelectorSpec(content_selector="main"), [])
+        stream = FrontierStream()
+        _produce(stream, ["/docs/a", "/docs/b"])
+        self._crawler(tmp_path, monkeypatch, journal=journal).crawl(stream)
+        journal.close()
+
+        checkpoint = CrawlJournal(tmp_path).load()
+        assert sorted(r.url for r in checkpoint.frontier) == ["https://e.com/docs/a", "https://e.com/docs/b"]
+        assert checkpoint.remaining() == []
@@ -0,0 +1,131 @@
+"""Unit tests for hydration.py — payload detection and rendering."""
+import json
+
+from bs4 import BeautifulSoup
+
+from hydration import (
+    attach_page_data,
+    document_markdown,
+    find_payload,
+    gatsby_page_data_url,
+    hydrate,
+    markdown_document,
+)
+
+BODY_MD = "# Install\n\nRun the installer and follow the prompts. " * 6 + "\n\n```bash\npip install x\n```\n"
+
+
+def _next_page(page_props: dict) -> str:
+    # Next.js escapes "<" so the payload cannot close its <script>
+    data = json.dumps({"props": {"pageProps": page_props}, "page": "/docs/[slug]"}).replace("<", "\\u003c")
+    return (f'<html><head><title>Site</title></head><body><div id="__next"></div>'
+            f'<script id="__NEXT_DATA__" type="application/json">{data}</script></body></html>')
+
+
+def _main_text(doc: str) -> str:
+    return BeautifulSoup(doc, "html.parser").find("main").get_text(" ", strip=True)
+
+
+class TestFindPayload:
+    def test_next_page_props(self):
+        assert find_payload(_next_page({"slug": "a"})) == {"slug": "a"}
+
+    def test_next_unusable_props(self):
+        for props in ("null", "[]", '"x"'):
+            html = f'<script id="__NEXT_DATA__" type="application/json">{{"props": {props}}}</script>'
+            assert find_payload(html) is None
+            assert hydrate(html) is None
+
+    def test_nuxt3_devalue(self):
+        values = [["Reactive", 1], {"data": 2}, {"page": 3}, {"title": 4, "body": 5}, "Intro", "text"]
+        html = f'<script type="application/json" id="__NUXT_DATA__">{json.dumps(values)}</script>'
+        assert find_payload(html) == {"data": {"page": {"title": "Intro", "body": "text"}}}
+
+    def test_nuxt2_plain_json(self):
+        html = '<script>window.__NUXT__={"data":[{"body":"x"}]};</script>'
+        assert find_payload(html) == {"data": [{"body": "x"}]}
+
+    def test_nuxt2_js_expression_ignored(self):
+        assert find_payload("<script>window.__NUXT__=(function(a){return {a:a}}(1));</script>") is None
+
+    def test_no_payload(self):
+        assert find_payload("<html><body><main>hi</main></body></html>") is None
+        assert hydrate("<html><body><main>hi</main></body></html>") is None
+
+
+class TestHydrate:
+    def test_markdown_passthrough_strips_mdx(self):
+        source = "import Tabs from '@theme/Tabs'\n\n<Tabs>\n\n" + BODY_MD + "\n</Tabs>\n"
+        doc = hydrate(_next_page({"frontmatter": {"title": "Install"}, "mdxSource": {"source": source}}))
+        markdown = document_markdown(doc)
+        assert markdown.startswith("# Install")
+        assert "import Tabs" not in markdown
+        assert "<Tabs>" not in markdown
+        assert "```bash\npip install x\n```" in markdown
+        assert "<title>Install</title>" in doc
+
+    def test_html_fragment(self):
+        fragment = "<h2>Usage</h2>" + "<p>Call the client with your API key and a request body.</p>" * 5
+        doc = hydrate(_next_page({"post": {"html": fragment}}))
+        assert "<main><h2>Usage</h2>" in doc
+        assert document_markdown(doc) is None
+
+    def test_largest_candidate_wins(self):
+        small = "<p>Short teaser paragraph.</p><p>More teaser text here.</p>" * 4
+        large = "<h2>Full</h2>" + "<p>The complete article body with every detail spelled out.</p>" * 8
+        doc = hydrate(_next_page({"teaser": small, "article": large}))
+        assert "<h2>Full</h2>" in doc
+
+    def test_portable_text(self):
+        blocks = [{"_type": "block", "style": "h2", "children": [{"text": "Setup"}]}] + [
+            {"_type": "block", "style": "normal", "children": [{"text": "Configure the project before running it. "}]}
+        ] * 6 + [{"_type": "code", "language": "js", "code": "run()"}]
+        doc = hydrate(_next_page({"page": {"body": blocks}}))
+        assert "<h2>Setup</h2>" in doc
+        assert '<pre><code class="language-js">run()</code></pre>' in doc
+
+    def test_contentful_rich_text(self):
+        para = {"nodeType": "paragraph", "content": [{"nodeType": "text", "value": "Rich text paragraph content. " * 3, "marks": []}]}
+        document = {"nodeType": "document", "content": [
+            {"nodeType": "heading-2", "content": [{"nodeType": "text", "value": "Overview", "marks": []}]},
+        ] + [para] * 4}
+        doc = hydrate(_next_page({"entry": {"content": {"json": document}}}))
+        assert "<h2>Overview</h2>" in doc
+        assert "Rich text paragraph content." in _main_text(doc)
+
+    def test_compiled_mdx(self):
+        compiled = ('function _createMdxContent(props){const _components={h2:"h2",p:"p",...props.components};'
+                    'return _jsxs(_Fragment,{children:[_jsx(_components.h2, {children: "Quick start"}),'
+                    + ",".join('_jsx(_components.p, {children: "Install the package and import the client module."})'
+                               for _ in range(6))
+                    + "]})}")
+        doc = hydrate(_next_page({"source": {"compiledSource": compiled}}))
+        assert "<h2>Quick start</h2>" in doc
+        assert "Install the package" in _main_text(doc)
+
+    def test_too_little_content(self):
+        assert hydrate(_next_page({"html": "<p>a</p><p>b</p>"})) is None
+
+    def test_script_end_tag_in_markdown_survives(self):
+        md = BODY_MD + "\n```html\n<script>x()</script>\n```\n"
+        doc = hydrate(_next_page({"markdown": md}))
+        assert "</script>" in document_markdown(doc)
+
+    def test_markdown_round_trips_exactly(self):
+        md = BODY_MD + "\n```js\nconst end = '<\\/script>'; // &lt; & </div>\n```\n"
+        assert document_markdown(markdown_document(md, "T")) == md
+
+
+class TestGatsby:
+    SHELL = '<html><body><div id="___gatsby"></div></body></html>'
+
+    def test_page_data_url(self):
+        assert gatsby_page_data_url(self.SHELL, "https://d.io/docs/intro/") == "https://d.io/page-data/docs/intro/page-data.json"
+        assert gatsby_page_data_url(self.SHELL, "https://d.io/") == "https://d.io/page-data/index/page-data.json"
+        assert gatsby_page_data_url("<html></html>", "https://d.io/") is None
+
+    def test_attached_page_data_hydrates(self):
+        data = json.dumps({"result": {"data": {"mdx": {"body": BODY_MD}}}})
+        html = attach_page_data(self.SHELL, data)
+        assert gatsby_page_data_url(html, "https://d.io/") is None  # already attached
+        assert document_markdown(hydrate(html)).startswith("# Install")
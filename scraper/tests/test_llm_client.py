@@ -0,0 +1,80 @@
+"""Unit tests for llm_client.py and LLMAnalyzer — time budget handling."""
+import time
+from types import SimpleNamespace
+
+import llm_client
+from deadline import Deadline
+from llm_analyzer import LLMAnalyzer
+from llm_client import REQUEST_TIMEOUT_S, ResilientLLMClient
+from models import LLMAnalysis, ScopeRules, SelectorSpec
+
+
+class FakeCompletions:
+    """client.chat.completions stand-in: replies from *answers* (an Exception is raised)."""
+
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.timeouts = []
+
+    def create(self, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        message = SimpleNamespace(content=answer)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")])
+
+
+def _client(answers) -> ResilientLLMClient:
+    client = ResilientLLMClient(api_key="test-key")
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(answers)))
+    return client
+
+
+def _completions(client: ResilientLLMClient) -> FakeCompletions:
+    return client.client.chat.completions
+
+
+class TestChatDeadline:
+    def test_request_timeout_capped_by_budget(self):
+        client = _client(["ok"])
+        assert client.chat("hi", deadline=Deadline(5)) == "ok"
+        assert 0 < _completions(client).timeouts[0] <= 5
+
+    def test_default_request_timeout(self):
+        client = _client(["ok"])
+        client.chat("hi")
+        assert _completions(client).timeouts == [REQUEST_TIMEOUT_S]
+
+    def test_expired_budget_sends_nothing(self):
+        deadline = Deadline(0.01)
+        time.sleep(0.02)
+        client = _client(["ok"])
+        assert client.chat("hi", deadline=deadline) is None
+        assert _completions(client).timeouts == []
+
+    def test_no_backoff_past_deadline(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr(llm_client.time, "sleep", sleeps.append)
+        client = _client([RuntimeError("429 rate limited")] * 5)
+        assert client.chat("hi", deadline=Deadline(2)) is None  # first backoff is BASE_DELAY = 3s
+        assert len(_completions(client).timeouts) == 1
+        assert sleeps == []
+
+
+class TestAnalyzerDeadline:
+    def _analyzer(self):
+        analyzer = LLMAnalyzer(api_key="test-key")
+        analyzer.llm = _client([])  # any call would fail on the empty answer list
+        return analyzer
+
+    def test_refine_keeps_selectors_when_budget_low(self):
+        spec = SelectorSpec(content_selector="main")
+        analysis = LLMAnalysis(scope_rules=ScopeRules(), selector_spec=spec)
+        refined = self._analyzer().refine_selectors(analysis, ["# Page"], "https://e.com/docs/", "", deadline=Deadline(5))
+        assert refined == spec
+
+    def test_reanalyze_falls_back_when_budget_low(self):
+        analysis = self._analyzer().reanalyze_selectors(
+            "https://e.com/docs/", "https://e.com", "<main></main>", "main", 0.1, 10, set(), deadline=Deadline(5))
+        assert analysis.scope_rules.include_patterns == ["/docs/"]
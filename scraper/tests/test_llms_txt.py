@@ -0,0 +1,83 @@
+"""Unit tests for llms_txt.py — locations, index parsing and corpus splitting."""
+from llms_txt import (
+    in_scope,
+    llms_locations,
+    looks_like_markdown_file,
+    page_url_for,
+    parse_index,
+    split_corpus,
+)
+
+START = "https://docs.example.com/guide/"
+BODY = "Some explanation of the feature that is long enough to keep."
+
+
+class TestLocations:
+    def test_start_dir_then_root(self):
+        assert llms_locations(START, "llms-full.txt") == [
+            "https://docs.example.com/guide/llms-full.txt",
+            "https://docs.example.com/llms-full.txt",
+        ]
+
+    def test_root_only_once(self):
+        assert llms_locations("https://docs.example.com/", "llms.txt") == ["https://docs.example.com/llms.txt"]
+
+    def test_start_file_uses_its_directory(self):
+        assert llms_locations("https://d.io/v2/index.html", "llms.txt")[0] == "https://d.io/v2/llms.txt"
+
+    def test_scope(self):
+        assert in_scope("https://docs.example.com/guide/a", START)
+        assert not in_scope("https://docs.example.com/blog/a", START)
+        assert not in_scope("https://other.com/guide/a", START)
+
+    def test_html_fallback_rejected(self):
+        assert not looks_like_markdown_file("<!DOCTYPE html><html>...", "text/html")
+        assert not looks_like_markdown_file("  <html><body>app</body></html>")
+        assert looks_like_markdown_file("# Docs\n\n- [A](a.md)", "text/plain")
+
+
+class TestIndex:
+    def test_links_resolved_in_order(self):
+        text = "# Proj\n\n> Summary\n\n## Docs\n\n- [Intro](/guide/intro.md): start here\n- [API](api.md)\n- [Intro](/guide/intro.md)\n"
+        assert parse_index(text, "https://docs.example.com/guide/llms.txt") == [
+            ("Intro", "https://docs.example.com/guide/intro.md"),
+            ("API", "https://docs.example.com/guide/api.md"),
+        ]
+
+    def test_page_url_for_markdown_rendering(self):
+        assert page_url_for("https://d.io/guide/intro.md") == "https://d.io/guide/intro"
+        assert page_url_for("https://d.io/guide/index.html.md") == "https://d.io/guide/"
+
+
+class TestSplitCorpus:
+    def test_headings_with_source_lines(self):
+        text = (f"# Intro\nSource: https://docs.example.com/guide/intro\n\n{BODY}\n\n"
+                f"# Setup\n\nURL: https://docs.example.com/guide/setup\n\n{BODY}\n")
+        pages = split_corpus(text, START)
+        assert [p.url for p in pages] == ["https://docs.example.com/guide/intro", "https://docs.example.com/guide/setup"]
+        assert pages[0].title == "Intro"
+        assert pages[0].markdown == BODY
+        assert "Source:" not in pages[1].markdown
+
+    def test_heading_inside_code_fence_not_split(self):
+        text = f"# Shell\n\n{BODY}\n\n```bash\n# comment\necho hi\n```\n"
+        pages = split_corpus(text, START)
+        assert len(pages) == 1
+        assert "# comment" in pages[0].markdown
+
+    def test_front_matter_sections(self):
+        text = (f"---\ntitle: Intro\nurl: /guide/intro\n---\n# Intro\n\n{BODY}\n"
+                f"---\ntitle: API\nurl: https://docs.example.com/guide/api\n---\n{BODY}\n")
+        pages = split_corpus(text, START)
+        assert [p.url for p in pages] == ["https://docs.example.com/guide/intro", "https://docs.example.com/guide/api"]
+        assert pages[0].markdown == BODY  # duplicate title heading dropped
+
+    def test_missing_urls_derived_from_titles(self):
+        text = f"# Getting Started\n\n{BODY}\n\n# Getting Started\n\n{BODY} Again.\n"
+        urls = [p.url for p in split_corpus(text, START)]
+        assert urls == ["https://docs.example.com/guide/getting-started",
+                        "https://docs.example.com/guide/getting-started-2"]
+
+    def test_untitled_preamble_and_stubs_dropped(self):
+        text = f"> Project summary\n\n# Intro\n\n{BODY}\n\n# Empty\n\nTBD\n"
+        assert [p.title for p in split_corpus(text, START)] == ["Intro"]
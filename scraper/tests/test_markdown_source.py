@@ -0,0 +1,78 @@
+"""Unit tests for markdown_source.py — source URLs, response checks, documents."""
+from hydration import document_markdown
+from markdown_source import (
+    is_markdown_response,
+    probe_result,
+    request_headers,
+    source_url,
+    split_front_matter,
+    to_document,
+)
+
+BODY = "Install the tool, then run `init` in the project folder.\n\n- one\n- two"
+
+
+class TestSourceUrl:
+    def test_suffix(self):
+        assert source_url("https://d.io/docs/intro", "suffix") == "https://d.io/docs/intro.md"
+
+    def test_suffix_trailing_slash(self):
+        assert source_url("https://d.io/docs/intro/", "suffix") == "https://d.io/docs/intro.md"
+
+    def test_suffix_root(self):
+        assert source_url("https://d.io/", "suffix") == "https://d.io/index.md"
+
+    def test_suffix_replaces_html_extension(self):
+        assert source_url("https://d.io/docs/intro.html", "suffix") == "https://d.io/docs/intro.md"
+
+    def test_index(self):
+        assert source_url("https://d.io/docs/intro/", "index") == "https://d.io/docs/intro/index.md"
+
+    def test_accept_keeps_url_and_sets_header(self):
+        assert source_url("https://d.io/docs/intro?x=1", "accept") == "https://d.io/docs/intro?x=1"
+        assert "text/markdown" in request_headers("accept")["Accept"]
+        assert request_headers("suffix") == {}
+
+
+class TestIsMarkdownResponse:
+    def test_markdown_content_type(self):
+        assert is_markdown_response(f"Intro\n\n{BODY}", "text/markdown", "suffix")
+
+    def test_plain_text_needs_markdown_syntax(self):
+        assert is_markdown_response(f"# Intro\n\n{BODY}", "text/plain", "suffix")
+        assert not is_markdown_response("just some words " * 10, "text/plain", "suffix")
+
+    def test_html_rejected(self):
+        assert not is_markdown_response(f"<!DOCTYPE html><html>{BODY}</html>", "", "suffix")
+        assert not is_markdown_response(f"# Intro\n\n{BODY}", "text/html; charset=utf-8", "suffix")
+
+    def test_accept_requires_markdown_content_type(self):
+        assert not is_markdown_response(f"# Intro\n\n{BODY}", "text/plain", "accept")
+        assert is_markdown_response(f"# Intro\n\n{BODY}", "text/markdown", "accept")
+
+    def test_stub_rejected(self):
+        assert not is_markdown_response("# 404", "text/markdown", "suffix")
+
+
+class TestToDocument:
+    def test_front_matter(self):
+        meta, body = split_front_matter(f"---\ntitle: 'Setup'\ntags:\n  - a\n---\n{BODY}")
+        assert meta == {"title": "Setup", "tags": ""}
+        assert body == BODY
+
+    def test_title_from_front_matter(self):
+        doc = to_document(f"---\ntitle: Setup\n---\n# Setup\n\n{BODY}")
+        assert "<title>Setup</title>" in doc
+        assert document_markdown(doc) == BODY
+
+    def test_title_from_heading(self):
+        doc = to_document(f"# Setup guide\n\n{BODY}")
+        assert "<title>Setup guide</title>" in doc
+        assert document_markdown(doc) == BODY
+
+
+class TestProbeResult:
+    def test_share(self):
+        assert probe_result(2, 3)
+        assert not probe_result(1, 3)
+        assert not probe_result(0, 0)
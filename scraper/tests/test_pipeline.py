@@ -0,0 +1,150 @@
+"""Unit tests for pipeline.py — incremental crawl bookkeeping, dedup and reprocess."""
+from archive import ARCHIVE_FILENAME, WarcWriter
+from checkpoint import CrawlJournal
+from crawler import Crawler
+from models import EngineMode, LLMAnalysis, Manifest, ManifestEntry, PipelineConfig, ScopeRules, SelectorSpec, UrlRecord
+from pipeline import Pipeline
+from tests.test_crawler import FakeResponse, FakeSession
+
+PAGE = "<main><h1>{}</h1><p>Enough text on this page to keep it around.</p></main>"
+
+
+def _pipeline(tmp_path, monkeypatch, pages, session=FakeSession, **config):
+    pipeline = Pipeline(PipelineConfig(start_url="https://e.com/docs/", name="t", output_dir=str(tmp_path), **config))
+    make_crawler = pipeline._make_crawler
+
+    def with_fake_session(*args, **kwargs) -> Crawler:
+        crawler = make_crawler(*args, **kwargs)
+        crawler.session = session(pages)
+        return crawler
+    monkeypatch.setattr(pipeline, "_make_crawler", with_fake_session)
+    return pipeline
+
+
+def _previous(tmp_path, names):
+    raw = tmp_path / "md" / "raw" / "docs"
+    raw.mkdir(parents=True, exist_ok=True)
+    entries = []
+    for name in names:
+        (raw / f"{name}.md").write_text(f"old {name}")
+        entries.append(ManifestEntry(url=f"https://e.com/docs/{name}", md_raw_path=f"docs/{name}.md",
+                                     etag=f'"{name}1"', content_hash=f"hash-{name}"))
+    return Manifest(start_url="https://e.com/docs/", engine_mode="curl", entries=entries)
+
+
+class TestCrawlIncremental:
+    def test_unchanged_kept_changed_rewritten_removed_dropped(self, tmp_path, monkeypatch):
+        pages = {
+            "https://e.com/docs/a": FakeResponse(200, PAGE.format("A"), {"ETag": '"a1"'}),   # unchanged → 304
+            "https://e.com/docs/b": FakeResponse(200, PAGE.format("B"), {"ETag": '"b2"'}),   # changed
+            "https://e.com/docs/new": FakeResponse(200, PAGE.format("New"), {"ETag": '"n1"'}),
+        }
+        pipeline = _pipeline(tmp_path, monkeypatch, pages)
+        previous = _previous(tmp_path, ["a", "b", "gone"])
+        frontier = [UrlRecord(url=f"https://e.com/docs/{n}") for n in ("a", "b", "new")]
+        analysis = LLMAnalysis(scope_rules=ScopeRules(), selector_spec=SelectorSpec(content_selector="main"))
+
+        manifest, changed = pipeline._crawl_incremental(frontier, EngineMode.CURL, analysis, previous)
+
+        by_url = {e.url: e for e in manifest.entries}
+        assert set(by_url) == {"https://e.com/docs/a", "https://e.com/docs/b", "https://e.com/docs/new"}
+        assert by_url["https://e.com/docs/a"].content_hash == "hash-a"
+        raw = tmp_path / "md" / "raw" / "docs"
+        assert (raw / "a.md").read_text() == "old a"
+        assert sorted(p.name for p in changed) == ["b.md", "new.md"]
+        assert not (raw / "gone.md").exists()
+
+    def test_fetch_failure_keeps_previous_file(self, tmp_path, monkeypatch):
+        pipeline = _pipeline(tmp_path, monkeypatch, {})  # every URL answers 404
+        previous = _previous(tmp_path, ["a"])
+        analysis = LLMAnalysis(scope_rules=ScopeRules(), selector_spec=SelectorSpec(content_selector="main"))
+
+        manifest, changed = pipeline._crawl_incremental(
+            [UrlRecord(url="https://e.com/docs/a")], EngineMode.CURL, analysis, previous)
+
+        assert [e.url for e in manifest.entries] == ["https://e.com/docs/a"]
+        assert changed == []
+        assert (tmp_path / "md" / "raw" / "docs" / "a.md").exists()
+
+
+class TestIncrementalDedup:
+    FOOTER = "Edit this page on GitHub or open an issue for the docs team."
+
+    def _write(self, raw, i, text):
+        path = raw / f"p{i}.md"
+        path.write_text(f"# P{i}\n\n{text}\n\n{self.FOOTER}\n", encoding="utf-8")
+        return path
+
+    def _finish(self, pipeline, changed):
+        pipeline.journal, pipeline.crawl_cut_short = CrawlJournal(pipeline.output_dir), False
+        manifest = Manifest(start_url="https://e.com/docs/", engine_mode="curl", entries=[
+            ManifestEntry(url=f"https://e.com/docs/p{i}", md_raw_path=f"docs/p{i}.md") for i in range(5)])
+        pipeline._finish(manifest, changed, 0)
+
+    def test_changed_page_loses_boilerplate(self, tmp_path):
+        raw = tmp_path / "md" / "raw" / "docs"
+        raw.mkdir(parents=True)
+        for i in range(5):
+            self._write(raw, i, f"Page {i} has its own text here.")
+        pipeline = Pipeline(PipelineConfig(start_url="https://e.com/docs/", name="t", output_dir=str(tmp_path)))
+        self._finish(pipeline, None)
+        assert self.FOOTER not in (raw / "p0.md").read_text(encoding="utf-8")
+
+        # Nightly refresh: one page changed — too few to find repeated blocks among themselves
+        changed = self._write(raw, 1, "Page 1 was updated since the last run.")
+        self._finish(pipeline, [changed])
+        content = changed.read_text(encoding="utf-8")
+        assert "updated since the last run" in content and self.FOOTER not in content
+
+
+class TestTimeBudget:
+    def test_crawl_stops_at_deadline_and_writes_manifest(self, tmp_path, monkeypatch):
+        import time
+
+        class SlowSession(FakeSession):
+            def get(self, url, timeout=None, headers=None):
+                time.sleep(0.1)
+                return super().get(url, timeout, headers)
+
+        class NoReanalysis:
+            def reanalyze_selectors(self, **kwargs):
+                raise AssertionError("no LLM re-analysis once the time budget is used up")
+
+        monkeypatch.setattr("crawler.robots_crawl_delay", lambda base_url, session: 0.0)
+        frontier = [UrlRecord(url=f"https://e.com/docs/p{i}") for i in range(100)]
+        pages = {r.url: FakeResponse(200, PAGE.format(r.url)) for r in frontier}
+        pipeline = _pipeline(tmp_path, monkeypatch, pages, SlowSession, max_workers=2, time_budget=1)
+        pipeline.journal = CrawlJournal(tmp_path)
+        analysis = LLMAnalysis(scope_rules=ScopeRules(), selector_spec=SelectorSpec(content_selector="main"))
+
+        start = time.monotonic()
+        manifest = pipeline._crawl_with_quality_check(
+            frontier, EngineMode.CURL, analysis, NoReanalysis(), "https://e.com", "", set(), frontier)
+        pipeline._finish(manifest, None, 0)
+        pipeline.journal.close()
+
+        assert time.monotonic() - start < 2
+        assert 0 < manifest.total_pages < len(frontier)
+        assert pipeline.crawl_cut_short
+        written = Manifest.model_validate_json((tmp_path / "manifest.json").read_text(encoding="utf-8"))
+        assert written.total_pages == manifest.total_pages
+
+
+class TestReprocess:
+    def test_validators_carried_over(self, tmp_path):
+        with WarcWriter(tmp_path / ARCHIVE_FILENAME) as archive:
+            archive.write_page("https://e.com/docs/a", PAGE.format("A"))
+            archive.write_page("https://e.com/docs/b", PAGE.format("B"))
+        previous = _previous(tmp_path, ["a"])
+        previous.entries[0].last_modified = "Mon, 01 Jan 2024 00:00:00 GMT"
+        previous.entries[0].lastmod = "2024-01-01"
+        (tmp_path / "manifest.json").write_text(previous.model_dump_json(), encoding="utf-8")
+
+        pipeline = Pipeline(PipelineConfig(start_url="https://e.com/docs/", name="t", output_dir=str(tmp_path)))
+        pipeline.reprocess(SelectorSpec(content_selector="main"))
+
+        manifest = Manifest.model_validate_json((tmp_path / "manifest.json").read_text(encoding="utf-8"))
+        entries = {e.url: e for e in manifest.entries}
+        a = entries["https://e.com/docs/a"]
+        assert (a.etag, a.last_modified, a.lastmod) == ('"a1"', "Mon, 01 Jan 2024 00:00:00 GMT", "2024-01-01")
+        assert entries["https://e.com/docs/b"].etag == ""
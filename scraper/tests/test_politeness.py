@@ -0,0 +1,84 @@
+"""Unit tests for politeness.py — AIMD limits, Retry-After, Crawl-delay."""
+import time
+
+from politeness import (
+    HostState,
+    PolitenessController,
+    parse_crawl_delay,
+    parse_retry_after,
+)
+
+URL = "https://example.com/docs/a"
+
+
+class TestParseRetryAfter:
+    def test_seconds(self):
+        assert parse_retry_after("7") == 7.0
+
+    def test_http_date_in_past_is_zero(self):
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+    def test_capped(self):
+        assert parse_retry_after("100000") == 120.0
+
+    def test_missing_or_invalid(self):
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+
+class TestParseCrawlDelay:
+    def test_wildcard_group(self):
+        assert parse_crawl_delay("User-agent: *\nDisallow: /x\nCrawl-delay: 2.5\n") == 2.5
+
+    def test_own_agent_wins(self):
+        txt = "User-agent: *\nCrawl-delay: 10\n\nUser-agent: AnyDocsMCP\nCrawl-delay: 1\n"
+        assert parse_crawl_delay(txt) == 1.0
+
+    def test_other_agent_ignored(self):
+        assert parse_crawl_delay("User-agent: Googlebot\nCrawl-delay: 5\n") == 0.0
+
+    def test_shared_group(self):
+        assert parse_crawl_delay("User-agent: a\nUser-agent: *\nCrawl-delay: 3\n") == 3.0
+
+
+class TestHostState:
+    def test_slow_start_then_additive(self):
+        state = HostState(max_limit=10)
+        state.increase()
+        assert state.limit == 3
+        state.decrease(now=time.monotonic())
+        assert state.limit == 1.5
+        state.increase()
+        assert 1.5 < state.limit < 2.5
+
+    def test_limit_capped(self):
+        state = HostState(max_limit=3)
+        for _ in range(10):
+            state.increase()
+        assert state.limit == 3
+
+    def test_full_capacity_waits(self):
+        state = HostState(max_limit=2)
+        state.in_flight = 2
+        assert state.wait_time(time.monotonic()) < 0
+
+
+class TestPolitenessController:
+    def test_throttle_halves_limit_and_pauses_host(self):
+        ctl = PolitenessController(max_per_host=8)
+        for _ in range(4):
+            ctl.acquire(URL)
+            ctl.release(URL, 200, 0.05)
+        before = ctl.limit("example.com")
+        ctl.acquire(URL)
+        ctl.release(URL, 429, 0.05, retry_after="30")
+        assert ctl.limit("example.com") <= before // 2 + 1
+        assert ctl.retry_delay(URL, attempt=0) > 25
+
+    def test_set_max_per_host_lowers_limit(self):
+        ctl = PolitenessController(max_per_host=8)
+        for _ in range(10):
+            ctl.acquire(URL)
+            ctl.release(URL, 200, 0.05)
+        ctl.set_max_per_host(2)
+        assert ctl.limit("example.com") == 2
@@ -0,0 +1,93 @@
+"""Unit tests for prefetch.py and Crawler.prefetch — background fetch into the store."""
+import threading
+
+from crawler import Crawler, FetchResult
+from fetch_store import FetchStore
+from models import EngineMode, SelectorSpec, UrlRecord
+from prefetch import Prefetcher, in_prefix
+
+
+def _frontier(n=4):
+    return [UrlRecord(url=f"https://e.com/docs/p{i}") for i in range(n)]
+
+
+def _crawler(tmp_path, monkeypatch, mode=EngineMode.CURL):
+    crawler = Crawler(mode, SelectorSpec(), str(tmp_path / "out"), max_workers=2,
+                      store=FetchStore(tmp_path / "cache"))
+    crawler.fetched = []
+
+    def fetch_curl(url, fetch_url=None, headers=None):
+        crawler.fetched.append(url)
+        return FetchResult(html=f"<main>{url}</main>")
+    monkeypatch.setattr(crawler, "_fetch_curl", fetch_curl)
+    return crawler
+
+
+class TestInPrefix:
+    def test_start_directory(self):
+        frontier = [UrlRecord(url=u) for u in (
+            "https://e.com/docs/a", "https://e.com/docs/api/b", "https://e.com/blog/c", "https://e.com/")]
+        assert [r.url for r in in_prefix(frontier, "https://e.com/docs/intro.html")] == [
+            "https://e.com/docs/a", "https://e.com/docs/api/b"]
+        assert len(in_prefix(frontier, "https://e.com/")) == 4
+
+
+class TestCrawlerPrefetch:
+    def test_pages_stored_not_extracted(self, tmp_path, monkeypatch):
+        crawler = _crawler(tmp_path, monkeypatch)
+        assert crawler.prefetch(_frontier(), threading.Event()) == 4
+        assert crawler.store.get("https://e.com/docs/p2", EngineMode.CURL.value) == "<main>https://e.com/docs/p2</main>"
+        assert not list((tmp_path / "out").rglob("*.md"))
+
+    def test_crawl_served_from_store(self, tmp_path, monkeypatch):
+        crawler = _crawler(tmp_path, monkeypatch)
+        crawler.prefetch(_frontier(), threading.Event())
+        crawler.crawl(_frontier())
+        assert len(crawler.fetched) == 4
+
+    def test_stopped_before_start(self, tmp_path, monkeypatch):
+        crawler = _crawler(tmp_path, monkeypatch)
+        stop = threading.Event()
+        stop.set()
+        assert crawler.prefetch(_frontier(), stop) == 0
+        assert crawler.fetched == []
+
+    def test_selenium_mode_not_prefetched(self, tmp_path, monkeypatch):
+        crawler = _crawler(tmp_path, monkeypatch, EngineMode.SELENIUM)
+        assert crawler.prefetch(_frontier(), threading.Event()) == 0
+
+
+class TestPrefetcher:
+    def test_start_stop(self, tmp_path, monkeypatch):
+        prefetcher = Prefetcher(_crawler(tmp_path, monkeypatch), _frontier()).start()
+        assert prefetcher.stop() <= 4
+        assert prefetcher.stop() == 0  # already stopped
+
+    def test_excluded_urls_not_fetched(self, tmp_path, monkeypatch):
+        crawler = _crawler(tmp_path, monkeypatch)
+        prefetcher = Prefetcher(crawler, _frontier())
+        prefetcher.exclude(r.url for r in _frontier(2))
+        prefetcher.start()._thread.join(5)
+        assert sorted(crawler.fetched) == ["https://e.com/docs/p2", "https://e.com/docs/p3"]
+
+    def test_exclude_waits_for_in_flight_fetch(self, tmp_path, monkeypatch):
+        crawler = _crawler(tmp_path, monkeypatch)
+        started, release = threading.Event(), threading.Event()
+        fetch_curl = crawler._fetch_curl
+
+        def slow_fetch(url, fetch_url=None, headers=None):
+            started.set()
+            release.wait(5)
+            return fetch_curl(url)
+        monkeypatch.setattr(crawler, "_fetch_curl", slow_fetch)
+        prefetcher = Prefetcher(crawler, _frontier(1)).start()
+        assert started.wait(5)
+        excluded = threading.Thread(target=prefetcher.exclude, args=(["https://e.com/docs/p0"],))
+        excluded.start()
+        excluded.join(0.1)
+        assert excluded.is_alive()  # still being fetched
+        release.set()
+        excluded.join(5)
+        assert not excluded.is_alive()
+        assert crawler.store.get("https://e.com/docs/p0", EngineMode.CURL.value)
+        prefetcher.stop()
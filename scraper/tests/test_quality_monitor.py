@@ -0,0 +1,33 @@
+"""Unit tests for quality_monitor.py — running success rate and switch trigger."""
+from quality_monitor import THIN_PAGE_BYTES, QualityMonitor
+
+GOOD = THIN_PAGE_BYTES * 5
+
+
+class TestQualityMonitor:
+    def test_no_check_before_enough_pages(self):
+        monitor = QualityMonitor(0.5, check_after=4)
+        assert not any(monitor.record(0) for _ in range(3))
+        assert monitor.watching
+
+    def test_triggers_once_below_threshold(self):
+        monitor = QualityMonitor(0.5, check_after=4)
+        results = [monitor.record(size) for size in (GOOD, 0, 10, 0, 0, 0)]
+        assert results == [False, False, False, True, False, False]
+        stats = monitor.stats()
+        assert (stats.pages, stats.succeeded, stats.thin, stats.failed) == (6, 1, 1, 4)
+
+    def test_healthy_crawl_settles(self):
+        monitor = QualityMonitor(0.5, check_after=2, settle_after=4)
+        for _ in range(4):
+            assert not monitor.record(GOOD)
+        assert not monitor.watching
+        assert not any(monitor.record(0) for _ in range(10))
+
+    def test_switch_done_restarts_stats(self):
+        monitor = QualityMonitor(0.5, check_after=2)
+        monitor.record(0)
+        assert monitor.record(0)
+        monitor.switch_done(True)
+        assert monitor.switched and monitor.stats().pages == 0
+        assert not monitor.record(0)
@@ -0,0 +1,56 @@
+"""Unit tests for scheduler.py — frontier scoring and best-first ordering."""
+from models import UrlRecord
+from scheduler import _relative_depth, _section, prioritize, score_url
+
+START = "https://example.com/docs/"
+
+
+def _rec(path, **kw):
+    return UrlRecord(url=f"https://example.com/docs/{path}", **kw)
+
+
+class TestScoreUrl:
+    def test_start_url_first(self):
+        assert score_url(UrlRecord(url="https://example.com/docs"), START) == float("inf")
+
+    def test_closer_link_scores_higher(self):
+        assert score_url(_rec("a", depth=1), START) > score_url(_rec("b", depth=3), START)
+
+    def test_inbound_links_raise_score(self):
+        assert score_url(_rec("a", depth=2, inbound_links=8), START) > score_url(_rec("b", depth=2), START)
+
+    def test_sitemap_priority_raises_score(self):
+        assert score_url(_rec("a", depth=-1, priority=0.9), START) > score_url(_rec("b", depth=-1, priority=0.1), START)
+
+    def test_deep_path_penalized(self):
+        assert score_url(_rec("guide", depth=1), START) > score_url(_rec("api/v2/x/y", depth=1), START)
+
+
+class TestPathHelpers:
+    def test_relative_depth(self):
+        assert _relative_depth("https://example.com/docs/intro", START) == 0
+        assert _relative_depth("https://example.com/docs/api/v2/users", START) == 2
+
+    def test_start_file_uses_its_directory(self):
+        assert _relative_depth("https://example.com/docs/a", "https://example.com/docs/index.html") == 0
+
+    def test_section(self):
+        assert _section("https://example.com/docs/api/users", START) == "api"
+        assert _section("https://example.com/docs/intro", START) == ""
+
+
+class TestPrioritize:
+    def test_keeps_all_records(self):
+        frontier = [_rec(f"p{i}") for i in range(10)]
+        assert sorted(r.url for r in prioritize(frontier, START)) == sorted(r.url for r in frontier)
+
+    def test_guides_before_deep_api_leaves(self):
+        frontier = [_rec(f"api/ref/leaf{i}", depth=-1) for i in range(20)]
+        frontier += [_rec("getting-started", depth=1, inbound_links=5)]
+        assert prioritize(frontier, START)[0].url.endswith("getting-started")
+
+    def test_sections_interleave(self):
+        frontier = [_rec(f"api/p{i}", depth=2) for i in range(10)]
+        frontier += [_rec(f"guide/p{i}", depth=2) for i in range(3)]
+        top = prioritize(frontier, START)[:6]
+        assert sum(1 for r in top if "/guide/" in r.url) == 3
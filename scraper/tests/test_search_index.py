@@ -0,0 +1,140 @@
+"""Unit tests for search_index.py — generator detection, index locations, parsers."""
+import json
+
+from search_index import (
+    SearchPage,
+    detect_generator,
+    has_full_text,
+    index_base,
+    index_locations,
+    parent_dirs,
+    parse_search_index,
+    vitepress_chunk_refs,
+    vitepress_script_urls,
+)
+
+TEXT = "Install the package with pip, then configure the project settings. " * 4
+
+
+class TestLocations:
+    def test_detect_generator(self):
+        assert detect_generator('<meta name="generator" content="mkdocs-1.5.3, mkdocs-material-9.5">') == "mkdocs"
+        assert detect_generator('<meta name="generator" content="Docusaurus v3.1.0">') == "docusaurus"
+        assert detect_generator('<meta name="generator" content="VitePress v1.0.0">') == "vitepress"
+        assert detect_generator('<script src="../_static/documentation_options.js?v=1"></script>') == "sphinx"
+        assert detect_generator("<html></html>") == ""
+
+    def test_parent_dirs(self):
+        assert parent_dirs("https://d.io/en/latest/guide/install.html") == [
+            "https://d.io/en/latest/guide/", "https://d.io/en/latest/", "https://d.io/en/", "https://d.io/"]
+
+    def test_sphinx_root_from_options_script(self):
+        html = '<script src="../_static/documentation_options.js?v=5929fcd5"></script>'
+        locations = index_locations("https://d.io/en/latest/guide/install.html", html)
+        assert locations[0] == ("sphinx", "https://d.io/en/latest/searchindex.js")
+        assert all(kind == "sphinx" for kind, _ in locations)
+
+    def test_mkdocs_base_url(self):
+        html = '<meta name="generator" content="mkdocs-1.5"><script>var base_url = "..";</script>'
+        locations = index_locations("https://d.io/docs/guide/", html)
+        assert locations[0] == ("mkdocs", "https://d.io/docs/search/search_index.json")
+
+    def test_unknown_generator_tries_all(self):
+        kinds = {kind for kind, _ in index_locations("https://d.io/", "<html></html>")}
+        assert kinds == {"mkdocs", "sphinx", "docusaurus"}
+
+    def test_index_base(self):
+        assert index_base("mkdocs", "https://d.io/docs/search/search_index.json") == "https://d.io/docs/"
+        assert index_base("sphinx", "https://d.io/en/latest/searchindex.js") == "https://d.io/en/latest/"
+        assert index_base("docusaurus", "https://d.io/docs/search-index.json") == "https://d.io/"
+
+
+class TestMkDocs:
+    def test_pages_and_sections(self):
+        data = {"docs": [
+            {"location": "", "title": "Home", "text": TEXT},
+            {"location": "guide/", "title": "Guide", "text": "<p>Intro to the guide.</p>"},
+            {"location": "guide/#install", "title": "Install", "text": "<p>Run <code>pip install x</code>.</p>"},
+            {"location": "guide/#home", "title": "Guide", "text": ""},
+        ]}
+        pages = parse_search_index("mkdocs", json.dumps(data), "https://d.io/docs/")
+        assert [(p.url, p.title) for p in pages] == [("https://d.io/docs/", "Home"), ("https://d.io/docs/guide/", "Guide")]
+        assert pages[1].markdown == "Intro to the guide.\n\n## Install\n\nRun `pip install x`."
+
+    def test_section_text_already_in_page_text(self):
+        data = {"docs": [
+            {"location": "a/", "title": "A", "text": f"{TEXT} Details here."},
+            {"location": "a/#details", "title": "Details", "text": "Details here."},
+        ]}
+        assert parse_search_index("mkdocs", json.dumps(data), "https://d.io/")[0].markdown == f"{TEXT} Details here."
+
+    def test_invalid_index(self):
+        assert parse_search_index("mkdocs", "<!DOCTYPE html>", "https://d.io/") == []
+
+
+class TestDocusaurus:
+    def test_titles_headings_contents(self):
+        data = [
+            {"documents": [{"i": 1, "t": "Intro", "u": "/docs/intro", "b": ["Docs"]}], "index": {}},
+            {"documents": [{"i": 2, "t": "Setup", "u": "/docs/intro", "h": "#setup", "p": 1}], "index": {}},
+            {"documents": [
+                {"i": 3, "t": "Welcome to the docs.", "s": "Intro", "u": "/docs/intro", "h": "", "p": 1},
+                {"i": 4, "t": "Run the installer.", "s": "Setup", "u": "/docs/intro", "h": "#setup", "p": 1},
+            ], "index": {}},
+        ]
+        pages = parse_search_index("docusaurus", json.dumps(data), "https://d.io/")
+        assert pages == [SearchPage("https://d.io/docs/intro", "Intro", "Welcome to the docs.\n\n## Setup\n\nRun the installer.")]
+
+
+class TestSphinx:
+    INDEX = 'Search.setIndex({"docnames": ["api/index", "index", "usage"], "titles": ["API", "Home", "Usage &amp; tips"], "terms": {}})'
+
+    def test_html_builder(self):
+        pages = parse_search_index("sphinx", self.INDEX, "https://d.io/en/latest/")
+        assert [p.url for p in pages] == [
+            "https://d.io/en/latest/api/index.html", "https://d.io/en/latest/index.html", "https://d.io/en/latest/usage.html"]
+        assert pages[2].title == "Usage & tips"
+        assert pages[0].markdown == ""
+
+    def test_dirhtml_builder(self):
+        options = "const DOCUMENTATION_OPTIONS = {\n    VERSION: '1.0',\n    BUILDER: 'dirhtml',\n    FILE_SUFFIX: '.html',\n};"
+        pages = parse_search_index("sphinx", self.INDEX, "https://d.io/", options)
+        assert [p.url for p in pages] == ["https://d.io/api/", "https://d.io/", "https://d.io/usage/"]
+
+    def test_bare_keys(self):
+        index = 'Search.setIndex({docnames:["index"],titles:["Home"],terms:{}})'
+        assert parse_search_index("sphinx", index, "https://d.io/")[0].url == "https://d.io/index.html"
+
+
+class TestVitePress:
+    def test_script_and_chunk_refs(self):
+        html = ('<script type="module" src="/assets/app.Ab1.js"></script>'
+                '<link rel="modulepreload" href="/assets/chunks/theme.Cd2.js">')
+        assert vitepress_script_urls(html, "https://d.io/guide/") == [
+            "https://d.io/assets/app.Ab1.js", "https://d.io/assets/chunks/theme.Cd2.js"]
+        js = 'import("./VPLocalSearchBox.Ef3.js");const m=["assets/chunks/@localSearchIndexroot.Gh4.js"]'
+        assert vitepress_chunk_refs(js, "https://d.io/assets/chunks/theme.Cd2.js") == (
+            "https://d.io/assets/chunks/@localSearchIndexroot.Gh4.js", "https://d.io/assets/chunks/VPLocalSearchBox.Ef3.js")
+
+    def test_minisearch_chunk(self):
+        data = {
+            "documentIds": {"0": "/guide/#getting-started", "1": "/guide/#install", "2": "/api/it's.html#api"},
+            "storedFields": {
+                "0": {"title": "Getting Started", "titles": []},
+                "1": {"title": "Install", "titles": ["Getting Started"]},
+                "2": {"title": "API \"v2\"", "titles": []},
+            },
+        }
+        literal = json.dumps(data).replace("\\", "\\\\").replace("'", "\\'")  # as a JS string
+        chunk = f"const e='{literal}';export{{e as default}};"
+        pages = parse_search_index("vitepress", chunk, "https://d.io/")
+        assert [(p.url, p.title) for p in pages] == [
+            ("https://d.io/guide/", "Getting Started"), ("https://d.io/api/it's.html", 'API "v2"')]
+
+
+class TestHasFullText:
+    def test_share_of_pages_with_text(self):
+        full = [SearchPage(f"https://d.io/{i}", "T", TEXT) for i in range(4)]
+        assert has_full_text(full + [SearchPage("https://d.io/x", "T", "")])
+        assert not has_full_text(full[:1] + [SearchPage("https://d.io/x", "T", "")])
+        assert not has_full_text([])
@@ -0,0 +1,96 @@
+"""Unit tests for selector_scoring.py — candidate scoring and winner choice."""
+from models import SelectorSpec
+from selector_scoring import MIN_IMPROVEMENT, pick_winner, score_candidates, stratified_pages
+
+
+def _page(title: str, body: str) -> str:
+    return f"""<html><body>
+<nav class="sidebar"><p>Install the package</p><p>Configure your project</p><p>Deploy to production</p></nav>
+<article class="markdown">
+  <h1>{title}</h1>
+  <p>{body}</p>
+  <div class="note">Note: {title} needs Python 3.10 or newer.</div>
+  <p>{body} This second paragraph explains {title.lower()} in more depth.</p>
+</article>
+<footer><p>Copyright 2026 Acme Inc. All rights reserved.</p></footer>
+</body></html>"""
+
+
+PAGES = [
+    _page("Install", "Run pip install acme to get the package and its command line tool."),
+    _page("Configure", "Settings live in acme.toml next to the project root; every key is optional."),
+    _page("Deploy", "Build the image with acme build, then push it to the registry of your choice."),
+]
+
+
+def _spec(selector: str) -> SelectorSpec:
+    return SelectorSpec(content_selector=selector, prune_selectors=[])
+
+
+class TestScoreCandidates:
+    def test_content_container_beats_body_and_narrow(self):
+        scores = score_candidates(
+            [("body", _spec("body")), ("note", _spec("div.note")),
+             ("article", _spec("article.markdown")), ("missing", _spec("#content"))],
+            PAGES,
+        )
+        by_source = {s.source: s for s in scores}
+        assert scores[0].source == "article"
+        assert by_source["body"].boilerplate > 0.2
+        assert by_source["note"].score < 0.5
+        assert by_source["missing"].match_rate == 0 and by_source["missing"].score == 0
+
+    def test_partial_match_rate(self):
+        pages = PAGES[:2] + [PAGES[2].replace('class="markdown"', 'class="prose"')]
+        (score,) = score_candidates([("article", _spec("article.markdown"))], pages)
+        assert round(score.match_rate, 2) == 0.67
+
+    def test_duplicate_candidates_collapsed(self):
+        scores = score_candidates([("a", _spec("article")), ("b", _spec("article"))], PAGES)
+        assert [s.source for s in scores] == ["a"]
+
+    def test_invalid_selector(self):
+        (score,) = score_candidates([("bad", _spec("div[["))], PAGES)
+        assert score.match_rate == 0
+
+
+class TestPickWinner:
+    def test_incumbent_kept_within_margin(self):
+        scores = score_candidates([("llm", _spec("article")), ("other", _spec("article.markdown"))], PAGES)
+        assert pick_winner(scores, "llm").source == "llm"
+
+    def test_challenger_wins_by_margin(self):
+        scores = score_candidates([("llm", _spec("body")), ("offline", _spec("article.markdown"))], PAGES)
+        winner = pick_winner(scores, "llm")
+        assert winner.source == "offline"
+        assert winner.score >= next(s for s in scores if s.source == "llm").score + MIN_IMPROVEMENT
+
+    def test_empty(self):
+        assert pick_winner([], "llm") is None
+
+
+class TestHydratedScoring:
+    def _shell(self, title: str, body: str) -> str:
+        import json
+        fragment = f"<article><h2>{title}</h2>" + f"<p>{body}</p>" * 4 + "</article>"
+        data = json.dumps({"props": {"pageProps": {"html": fragment}}}).replace("<", "\\u003c")
+        return (f'<html><body><div id="__next"><p>Loading...</p></div>'
+                f'<script id="__NEXT_DATA__" type="application/json">{data}</script></body></html>')
+
+    def test_selectors_matched_against_hydrated_document(self):
+        pages = [self._shell("Install", "Run pip install acme to get the package and its command line tool."),
+                 self._shell("Deploy", "Build the image with acme build, then push it to the registry you use.")]
+        scores = {s.source: s for s in score_candidates(
+            [("article", _spec("article")), ("shell", _spec("#__next"))], pages, hydrate=True)}
+        assert scores["article"].match_rate == 1.0
+        assert scores["shell"].match_rate == 0  # only in the raw shell, which is not what gets extracted
+
+
+class TestStratifiedPages:
+    def test_sections_interleaved_start_first(self):
+        pages = [(f"https://d.io/docs/api/{i}", f"api{i}") for i in range(4)]
+        pages += [(f"https://d.io/docs/guide/{i}", f"guide{i}") for i in range(2)]
+        pages.append(("https://d.io/docs/", "start"))
+        picked = stratified_pages(pages, "https://d.io/docs/", limit=3)
+        assert picked[0] == "start"
+        assert set(picked[1:]) == {"api0", "guide0"}
@@ -0,0 +1,67 @@
+"""Unit tests for site_profiles.py — generator fingerprinting and profile analysis."""
+from site_profiles import HIGH_CONFIDENCE, fingerprint, meta_generator, profile_analysis
+
+MATERIAL = """<html><head><meta name="generator" content="mkdocs-1.5.3, mkdocs-material-9.5.2">
+<link rel="stylesheet" href="../assets/stylesheets/main.50c56a3b.min.css"></head>
+<body><div data-md-component="container"><div class="md-sidebar"></div>
+<div class="md-content"><article class="md-content__inner md-typeset"><h1>Setup</h1></article></div></div>
+<script src="../assets/javascripts/bundle.e1c3ead8.min.js"></script></body></html>"""
+
+SPHINX = """<html><head><script src="_static/documentation_options.js?v=1"></script>
+<script src="_static/doctools.js?v=2"></script></head>
+<body><div class="sphinxsidebar"></div><div class="body" role="main"><h1>API</h1></div></body></html>"""
+
+DOCUSAURUS = """<html><head><meta name="generator" content="Docusaurus v3.1.1"></head>
+<body><div id="__docusaurus"><article><div class="theme-doc-markdown markdown"><h1>Intro</h1></div></article></div>
+<script src="/assets/js/runtime~main.5d0b2a.js"></script></body></html>"""
+
+
+class TestFingerprint:
+    def test_mkdocs_material(self):
+        match = fingerprint(MATERIAL)
+        assert match.profile.name == "mkdocs-material"
+        assert match.confidence >= HIGH_CONFIDENCE
+
+    def test_sphinx_without_generator_meta(self):
+        match = fingerprint(SPHINX)
+        assert match.profile.name == "sphinx"
+        assert match.confidence >= HIGH_CONFIDENCE
+
+    def test_docusaurus(self):
+        match = fingerprint(DOCUSAURUS)
+        assert match.profile.name == "docusaurus"
+        assert match.confidence >= HIGH_CONFIDENCE
+
+    def test_missing_content_selector_is_not_confident(self):
+        html = DOCUSAURUS.replace("theme-doc-markdown", "custom-body")
+        match = fingerprint(html)
+        assert match.profile.name == "docusaurus"
+        assert match.confidence < HIGH_CONFIDENCE
+
+    def test_unknown_site(self):
+        assert fingerprint("<html><body><main><h1>Docs</h1></main></body></html>") is None
+        assert fingerprint("") is None
+
+    def test_astro_alone_is_not_starlight(self):
+        html = '<meta name="generator" content="Astro v4.5"><script src="/_astro/hoisted.js"></script><main></main>'
+        match = fingerprint(html)
+        assert match is None or match.confidence < HIGH_CONFIDENCE
+
+    def test_all_generators_collected(self):
+        html = '<meta name="generator" content="Astro v4.5"><meta name="generator" content="Starlight v0.21">'
+        assert meta_generator(html) == "Astro v4.5, Starlight v0.21"
+
+
+class TestProfileAnalysis:
+    def test_scope_and_selectors(self):
+        analysis = profile_analysis(fingerprint(SPHINX), "https://d.io/en/latest/", "https://d.io")
+        assert analysis.selector_spec.content_selector == "[role='main']"
+        assert ".headerlink" in analysis.selector_spec.prune_selectors
+        assert analysis.scope_rules.include_patterns == ["/en/"]
+        assert analysis.scope_rules.url_matches("https://d.io/en/latest/usage.html")
+        assert not analysis.scope_rules.url_matches("https://d.io/en/latest/_sources/usage.rst.txt")
+        assert not analysis.scope_rules.url_matches("https://d.io/en/latest/genindex.html")
+
+    def test_start_page_file_not_used_as_scope(self):
+        analysis = profile_analysis(fingerprint(MATERIAL), "https://d.io/index.html", "https://d.io")
+        assert analysis.scope_rules.include_patterns == []